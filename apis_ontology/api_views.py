@@ -0,0 +1,13 @@
+from apis_core.generic.api_views import ModelViewSet
+
+from apis_ontology.pagination import KeysetPagination
+
+
+class EntityViewSet(ModelViewSet):
+    """
+    The generic API viewset for the OEAI entities, whose lists are paged
+    with cursors instead of offsets, see `KeysetPagination`. The lists of
+    all other models keep the default pagination.
+    """
+
+    pagination_class = KeysetPagination
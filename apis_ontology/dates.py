@@ -0,0 +1,29 @@
+from functools import lru_cache
+
+from django_interval.utils import defaultdateparser
+
+DATE_CACHE_SIZE = 20_000
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def cached_dateparser(date_string):
+    """
+    `defaultdateparser` with a bounded memo of the parsed strings.
+
+    Date strings repeat a lot, and a `FuzzyDateParserField` parses its
+    value on every save, once for each of the three dates it computes.
+    The parser returns a tuple of immutable values, so the result can be
+    shared.
+    """
+    return defaultdateparser(date_string)
+
+
+def date_cache_stats(since=None):
+    """
+    Return the hits and misses of `cached_dateparser`, counted from the
+    `cache_info()` taken at `since`, if given.
+    """
+    info = cached_dateparser.cache_info()
+    if since is None:
+        return info.hits, info.misses
+    return info.hits - since.hits, info.misses - since.misses
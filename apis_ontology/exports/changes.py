@@ -0,0 +1,128 @@
+import datetime
+import json
+import os
+
+from django.db import connections
+from django.utils import timezone
+
+from apis_ontology.imports.history import history_model
+from apis_ontology.models import (
+    Contains,
+    EngagedIn,
+    Includes,
+    Institution,
+    LocatedIn,
+    Person,
+    Place,
+)
+
+# the versioned models whose changes are exported, by vocabulary name
+ENTITIES = {"person": Person, "institution": Institution, "place": Place}
+RELATIONS = [EngagedIn, LocatedIn, Includes, Contains]
+
+ACTIONS = {"+": "created", "~": "updated", "-": "deleted"}
+
+
+class Change:
+    """
+    The net change of one object in a time window: `action` is
+    "deleted" if its latest history entry is a deletion, "created" if the
+    first entry in the window is its creation, "updated" otherwise.
+    `entry` is the latest history entry.
+    """
+
+    def __init__(self, pk, first, entry):
+        self.pk = pk
+        self.entry = entry
+        if entry.history_type == "-":
+            self.action = "deleted"
+        else:
+            self.action = ACTIONS[first]
+
+    @property
+    def deleted(self):
+        return self.action == "deleted"
+
+    def data(self):
+        """The tracked field values of the latest entry"""
+        history = type(self.entry)
+        return {
+            field.attname: getattr(self.entry, field.attname)
+            for field in history.tracked_fields
+        }
+
+
+def changes(model, since, until):
+    """
+    Return the `Change`s of the instances of `model` with history entries
+    in `(since, until]`, ordered by the time of their latest entry. Only
+    the entries of the window are read, using the index on `history_date`.
+    """
+    history = history_model(model)
+    if history is None:
+        return []
+    pk = model._meta.pk.attname
+    first, latest = {}, {}
+    entries = (
+        history.objects.filter(history_date__gt=since, history_date__lte=until)
+        .order_by("history_date", "history_id")
+        .iterator()
+    )
+    for entry in entries:
+        key = getattr(entry, pk)
+        first.setdefault(key, entry.history_type)
+        latest.pop(key, None)
+        latest[key] = entry
+    return [Change(key, first[key], entry) for key, entry in latest.items()]
+
+
+def settled_until(lag, using="default"):
+    """
+    Return the end of the window whose history entries are all committed.
+
+    `history_date` is the time an entry was written, not the time it
+    was committed, so an export up to `now()` would miss the entries of
+    transactions that are still open and never see them later. The
+    window therefore ends `lag` before now, and on PostgreSQL before
+    the start of the oldest open transaction of a client on this
+    database, as all its entries are younger than that. Autovacuum and
+    the other background workers write no history entries.
+    """
+    until = timezone.now() - lag
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT min(xact_start) FROM pg_stat_activity "
+                "WHERE backend_type = 'client backend' "
+                "AND datname = current_database() AND pid <> pg_backend_pid()"
+            )
+            (oldest,) = cursor.fetchone()
+        if oldest is not None:
+            until = min(until, oldest)
+    return until
+
+
+class Cursor:
+    """
+    The end of the window of the last incremental export, stored as a
+    JSON file. The next export continues from there.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return None
+        return datetime.datetime.fromisoformat(data["until"])
+
+    def save(self, until):
+        # replace the file in one step, so that it is never half written
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"until": until.isoformat()}, fh)
+        os.replace(tmp, self.path)
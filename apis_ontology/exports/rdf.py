@@ -0,0 +1,129 @@
+import re
+
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+SKOS = "http://www.w3.org/2004/02/skos/core#"
+PREFIXES = {"rdf": RDF, "skos": SKOS}
+
+# characters that must not appear unescaped in an IRI reference
+IRI_ESCAPE = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+LITERAL_ESCAPES = {
+    "\\": "\\\\",
+    '"': '\\"',
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+    "\b": "\\b",
+    "\f": "\\f",
+}
+LITERAL_ESCAPE = re.compile(r'[\\"\n\r\t\b\f]')
+LANGUAGE_TAG = re.compile(r"^[a-zA-Z]{1,8}(-[a-zA-Z0-9]{1,8})*$")
+
+
+def iri(value):
+    """Serialize an IRI, escaping the characters N-Triples does not allow"""
+    value = IRI_ESCAPE.sub(lambda m: f"\\u{ord(m.group()):04X}", str(value))
+    return f"<{value}>"
+
+
+def literal(value, lang=None):
+    """
+    Serialize a string literal, with a language tag if `lang` is a valid
+    one. The escaping is valid in N-Triples and in Turtle.
+    """
+    value = LITERAL_ESCAPE.sub(lambda m: LITERAL_ESCAPES[m.group()], str(value))
+    if lang and LANGUAGE_TAG.match(lang):
+        return f'"{value}"@{lang}'
+    return f'"{value}"'
+
+
+class NTriplesWriter:
+    """
+    Write RDF to a text stream, one resource at a time, without keeping
+    anything in memory. Predicates are full IRIs, objects are serialized
+    terms (see `iri` and `literal`).
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.triples = 0
+
+    def start(self):
+        pass
+
+    def resource(self, subject, statements):
+        """Write the `(predicate, object)` statements about `subject`"""
+        subject = iri(subject)
+        self.out.write(
+            "".join(
+                f"{subject} {iri(predicate)} {obj} .\n" for predicate, obj in statements
+            )
+        )
+        self.triples += len(statements)
+
+
+class TurtleWriter(NTriplesWriter):
+    """
+    Write RDF as Turtle: the statements about a resource are grouped in
+    one block, predicates in the `PREFIXES` namespaces are abbreviated.
+    """
+
+    def start(self):
+        for prefix, namespace in PREFIXES.items():
+            self.out.write(f"@prefix {prefix}: {iri(namespace)} .\n")
+        self.out.write("\n")
+
+    def name(self, value):
+        """Abbreviate an IRI in one of the `PREFIXES` namespaces, if possible"""
+        for prefix, namespace in PREFIXES.items():
+            local = value.removeprefix(namespace)
+            if local != value and re.fullmatch(r"[A-Za-z][\w-]*", local):
+                return f"{prefix}:{local}"
+        return None
+
+    def verb(self, predicate):
+        if predicate == RDF + "type":
+            return "a"
+        return self.name(predicate) or iri(predicate)
+
+    def term(self, obj):
+        if obj.startswith("<"):
+            return self.name(obj[1:-1]) or obj
+        return obj
+
+    def resource(self, subject, statements):
+        if not statements:
+            return
+        lines = " ;\n    ".join(
+            f"{self.verb(predicate)} {self.term(obj)}" for predicate, obj in statements
+        )
+        self.out.write(f"{iri(subject)} {lines} .\n\n")
+        self.triples += len(statements)
+
+
+class SparqlUpdateWriter(TurtleWriter):
+    """
+    Write RDF as a SPARQL Update request that replaces what a triple
+    store holds about each resource: the statements about it are deleted,
+    then the current ones are inserted. `delete` writes a tombstone.
+    """
+
+    def start(self):
+        for prefix, namespace in PREFIXES.items():
+            self.out.write(f"PREFIX {prefix}: {iri(namespace)}\n")
+        self.out.write("\n")
+
+    def delete(self, subject):
+        self.out.write(f"DELETE WHERE {{ {iri(subject)} ?p ?o }} ;\n")
+
+    def resource(self, subject, statements):
+        self.delete(subject)
+        if not statements:
+            return
+        lines = " ;\n    ".join(
+            f"{self.verb(predicate)} {self.term(obj)}" for predicate, obj in statements
+        )
+        self.out.write(f"INSERT DATA {{\n{iri(subject)} {lines} .\n}} ;\n\n")
+        self.triples += len(statements)
+
+
+WRITERS = {"turtle": TurtleWriter, "ntriples": NTriplesWriter}
@@ -0,0 +1,170 @@
+import itertools
+from collections import defaultdict
+
+from apis_core.uris.models import Uri
+from apis_core.utils.settings import apis_base_uri
+from django.contrib.contenttypes.models import ContentType
+
+from apis_ontology.exports.rdf import RDF, SKOS, LANGUAGE_TAG, iri, literal
+from apis_ontology.models import (
+    Contains,
+    Includes,
+    Institution,
+    LocatedIn,
+    Person,
+    Place,
+    Profession,
+)
+
+# the vocabularies and the language of the `label` of their concepts
+VOCABULARIES = {
+    "person": (Person, "de"),
+    "institution": (Institution, "de"),
+    "place": (Place, None),
+    "profession": (Profession, None),
+}
+
+# (relation, predicate of the subject, predicate of the object)
+HIERARCHY = [
+    (Includes, SKOS + "narrower", SKOS + "broader"),
+    (Contains, SKOS + "narrower", SKOS + "broader"),
+    # institutions and places are concepts of different schemes
+    (LocatedIn, SKOS + "broadMatch", SKOS + "narrowMatch"),
+]
+
+SENTINEL_PK = 987654321
+
+
+def uri_template(model):
+    """
+    Return a format string for the uris of the instances of `model`: the
+    default uri of entities, the detail view of other models. The route
+    is resolved once instead of for every instance.
+    """
+    obj = model(pk=SENTINEL_PK)
+    if hasattr(obj, "get_default_uri"):
+        uri = obj.get_default_uri()
+    else:
+        uri = apis_base_uri().strip("/") + obj.get_absolute_url()
+    uri = uri.replace("{", "{{").replace("}", "}}")
+    return uri.replace(str(SENTINEL_PK), "{pk}")
+
+
+class SkosExport:
+    """
+    Stream vocabularies as SKOS concept schemes to a writer of
+    `apis_ontology.exports.rdf`.
+
+    The concepts are read with a server-side cursor (`iterator`) and
+    handled in chunks of `chunk_size`: the uris and the hierarchy of a
+    chunk are fetched with one query per table, then the chunk is
+    written and dropped. Memory use therefore does not grow with the
+    size of a vocabulary.
+    """
+
+    def __init__(self, writer, chunk_size=2000):
+        self.writer = writer
+        self.chunk_size = chunk_size
+        self.templates = {}
+        self.concepts = 0
+
+    def template(self, model):
+        if model not in self.templates:
+            self.templates[model] = uri_template(model)
+        return self.templates[model]
+
+    def export(self, name):
+        """Write the concept scheme `name` with all its concepts"""
+        model = VOCABULARIES[name][0]
+        self.writer.resource(
+            model.get_namespace_uri(),
+            [
+                (RDF + "type", iri(SKOS + "ConceptScheme")),
+                (SKOS + "prefLabel", literal(model._meta.verbose_name_plural, "en")),
+            ],
+        )
+        self.write_concepts(name, model.objects.all())
+
+    def write_concepts(self, name, queryset):
+        """Write the concepts of the vocabulary `name` selected by `queryset`"""
+        model, label_lang = VOCABULARIES[name]
+        scheme = model.get_namespace_uri()
+        template = self.template(model)
+        content_type = ContentType.objects.get_for_model(model)
+        field_names = {f.name for f in model._meta.get_fields()}
+        fields = ["pk", "label"]
+        fields += [f for f in ["alternative_labels", "notes"] if f in field_names]
+        rows = (
+            queryset.order_by("pk")
+            .values_list(*fields, named=True)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        for chunk in itertools.batched(rows, self.chunk_size):
+            pks = [row.pk for row in chunk]
+            uris = defaultdict(list)
+            for object_id, uri in Uri.objects.filter(
+                content_type=content_type, object_id__in=pks
+            ).values_list("object_id", "uri"):
+                uris[object_id].append(uri)
+            related = self.hierarchy(model, content_type, pks)
+
+            for row in chunk:
+                subject = template.format(pk=row.pk)
+                statements = [
+                    (RDF + "type", iri(SKOS + "Concept")),
+                    (SKOS + "inScheme", iri(scheme)),
+                ]
+                statements += self.labels(row, label_lang)
+                if getattr(row, "notes", None):
+                    statements.append((SKOS + "note", literal(row.notes)))
+                statements += [
+                    (SKOS + "exactMatch", iri(uri))
+                    for uri in uris[row.pk]
+                    if uri != subject
+                ]
+                statements += related[row.pk]
+                self.writer.resource(subject, statements)
+            self.concepts += len(chunk)
+
+    def labels(self, row, label_lang):
+        """
+        Return the label statements of a concept. Alternative labels of
+        type "pref" become preferred labels unless there already is one in
+        their language, as SKOS allows only one per language.
+        """
+        statements = []
+        languages = set()
+        if row.label:
+            statements.append((SKOS + "prefLabel", literal(row.label, label_lang)))
+            languages.add(label_lang)
+        for entry in getattr(row, "alternative_labels", None) or []:
+            if not entry.get("label"):
+                continue
+            lang = entry.get("lang")
+            if not lang or not LANGUAGE_TAG.match(lang) or lang == "loc":
+                # "loc" marks local names, which have no language tag
+                lang = None
+            predicate = SKOS + "altLabel"
+            if entry.get("typ") == "pref" and lang and lang not in languages:
+                predicate = SKOS + "prefLabel"
+                languages.add(lang)
+            statements.append((predicate, literal(entry["label"], lang)))
+        return statements
+
+    def hierarchy(self, model, content_type, pks):
+        """Return the hierarchy statements of the concepts `pks`, by pk"""
+        related = defaultdict(list)
+        for relation, subj_predicate, obj_predicate in HIERARCHY:
+            if relation.subj_model is model:
+                template = self.template(relation.obj_model)
+                for subj, obj in relation.objects.filter(
+                    subj_content_type=content_type, subj_object_id__in=pks
+                ).values_list("subj_object_id", "obj_object_id"):
+                    related[subj].append((subj_predicate, iri(template.format(pk=obj))))
+            if relation.obj_model is model:
+                template = self.template(relation.subj_model)
+                for subj, obj in relation.objects.filter(
+                    obj_content_type=content_type, obj_object_id__in=pks
+                ).values_list("subj_object_id", "obj_object_id"):
+                    related[obj].append((obj_predicate, iri(template.format(pk=subj))))
+        return related
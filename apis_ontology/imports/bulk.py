@@ -0,0 +1,113 @@
+from apis_core.apis_metainfo.models import RootObject
+from apis_core.relations.models import Relation
+from apis_core.uris.models import Uri
+from AcdhArcheAssets.uri_norm_rules import get_normalized_uri
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import router, transaction
+
+from apis_ontology.uricache import is_internal, refresh_external_uris
+
+
+def chunked(objs, size):
+    for i in range(0, len(objs), size):
+        yield objs[i : i + size]
+
+
+def bulk_create_children(model, parent_model, objs, batch_size=None, using=None):
+    """
+    Insert a list of unsaved instances of a model that inherits from the
+    concrete `parent_model` in bulk.
+
+    `QuerySet.bulk_create` refuses multi-table inherited models. We
+    therefore do what `Model.save` does for a single instance, only
+    batched: first the parent rows are inserted (which gives us the
+    primary keys), then the rows of the child table are inserted with
+    their local fields. Signals are not sent.
+    """
+    using = using or router.db_for_write(model)
+    batch_size = batch_size or len(objs)
+    parent_link = model._meta.get_ancestor_link(parent_model)
+    parent_fields = [f for f in parent_model._meta.concrete_fields if not f.primary_key]
+    fields = [f for f in model._meta.local_concrete_fields if not f.generated]
+
+    parents = parent_model.objects.using(using).bulk_create(
+        [
+            parent_model(**{f.attname: getattr(obj, f.attname) for f in parent_fields})
+            for obj in objs
+        ],
+        batch_size=batch_size,
+    )
+    for obj, parent in zip(objs, parents):
+        setattr(obj, parent_link.attname, parent.pk)
+        setattr(obj, parent_model._meta.pk.attname, parent.pk)
+    # there is no public API for inserting the child rows only,
+    # `_insert` is what `Model._save_table` uses under the hood
+    for chunk in chunked(objs, batch_size):
+        model._base_manager._insert(chunk, fields=fields, using=using)
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+    return objs
+
+
+def bulk_create_entities(model, objs, batch_size=None):
+    """
+    Insert a list of unsaved entity instances in bulk. All APIS entities
+    inherit from the concrete `RootObject`, see `bulk_create_children`.
+
+    Signals are not sent, so the default Uri and the history entry the
+    `post_save` handlers would create are written in bulk as well.
+    """
+    if not objs:
+        return objs
+    using = router.db_for_write(model)
+    with transaction.atomic(using=using, savepoint=False):
+        bulk_create_children(model, RootObject, objs, batch_size, using=using)
+        if getattr(settings, "CREATE_DEFAULT_URI", True):
+            bulk_create_uris(
+                [(obj, obj.get_default_uri()) for obj in objs], batch_size=batch_size
+            )
+        if hasattr(model, "history"):
+            model.history.bulk_history_create(objs, batch_size=batch_size)
+    return objs
+
+
+def bulk_create_relations(model, objs, batch_size=None):
+    """
+    Insert a list of unsaved relation instances in bulk; relations
+    inherit from the concrete `Relation`, see `bulk_create_children`.
+    The history entries of versioned relations are written in bulk too.
+    """
+    if not objs:
+        return objs
+    using = router.db_for_write(model)
+    with transaction.atomic(using=using, savepoint=False):
+        bulk_create_children(model, Relation, objs, batch_size, using=using)
+        if hasattr(model, "history"):
+            model.history.bulk_history_create(objs, batch_size=batch_size)
+    return objs
+
+
+def bulk_create_uris(pairs, batch_size=None):
+    """
+    Create Uris for a list of `(instance, uri)` tuples. The Uris are
+    normalized the same way `Uri.save` would do it. Signals are not sent,
+    so the `ExternalUris` of the instances are updated here.
+    """
+    uris = [
+        Uri(
+            uri=get_normalized_uri(uri),
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.pk,
+        )
+        for obj, uri in pairs
+    ]
+    uris = Uri.objects.bulk_create(uris, batch_size=batch_size)
+    external = {}
+    for (obj, _), uri in zip(pairs, uris):
+        if not is_internal(uri.uri):
+            external.setdefault(type(obj), set()).add(obj.pk)
+    for model, pks in external.items():
+        refresh_external_uris(model, pks)
+    return uris
@@ -0,0 +1,153 @@
+import itertools
+from collections import OrderedDict
+
+# the number of labels looked up with one query
+BATCH_SIZE = 1000
+
+
+def normalize_label(label):
+    return " ".join(str(label).split()).casefold()
+
+
+class LookupCache:
+    """
+    An import scoped replacement for `get_or_create(label=...)`.
+
+    Existing rows are preloaded (up to `maxsize` of them) and keyed by
+    their normalized label, so lookups that hit are resolved in memory
+    and only misses touch the database. The least recently used entries
+    are evicted once `maxsize` is reached. As long as the whole table
+    fits into the cache, a miss means that the row does not exist and it
+    is created right away; after an eviction a miss has to ask the
+    database first.
+
+    Objects created since the last `commit` are remembered, so that they
+    can be dropped again by `rollback` if the surrounding transaction
+    or savepoint is rolled back.
+    """
+
+    def __init__(self, model, field="label", maxsize=100_000, shared=False):
+        self.model = model
+        self.field = field
+        self.maxsize = maxsize
+        self.shared = shared
+        self.entries = OrderedDict()
+        self.created = []
+        self.complete = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def preload(self):
+        qs = self.model.objects.only("pk", self.field).order_by("pk")
+        self.complete = not self.shared
+        for count, obj in enumerate(qs[: self.maxsize + 1].iterator(), start=1):
+            if count > self.maxsize:
+                self.complete = False
+                break
+            self.entries.setdefault(normalize_label(getattr(obj, self.field)), obj)
+        return self
+
+    def add(self, obj, created=False):
+        key = normalize_label(getattr(obj, self.field))
+        if created:
+            self.created.append(key)
+        self.entries[key] = obj
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+            self.complete = False
+
+    def get_or_create(self, label, defaults=None):
+        key = normalize_label(label)
+        if obj := self.entries.get(key):
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return obj, False
+        self.misses += 1
+        obj = None
+        if not self.complete:
+            obj = self.find([label]).get(key)
+        created = obj is None
+        if created:
+            obj = self.model.objects.create(**{self.field: label, **(defaults or {})})
+        self.add(obj, created=created)
+        return obj, created
+
+    def get_or_create_many(self, labels):
+        """
+        Resolve several labels at once and return the objects by label:
+        the misses are looked up with one query and the missing rows are
+        created with one bulk insert.
+        """
+        resolved = {}
+        missing = {}
+        for label in labels:
+            key = normalize_label(label)
+            if key in resolved or key in missing:
+                continue
+            if obj := self.entries.get(key):
+                self.hits += 1
+                self.entries.move_to_end(key)
+                resolved[key] = obj
+            else:
+                self.misses += 1
+                missing[key] = label
+        if missing and not self.complete:
+            resolved.update(self.find(missing.values()))
+        new = [
+            self.model(**{self.field: label})
+            for key, label in missing.items()
+            if key not in resolved
+        ]
+        created = {
+            normalize_label(getattr(obj, self.field)): obj
+            for obj in self.model.objects.bulk_create(new)
+        }
+        for key in missing:
+            if key in created:
+                resolved[key] = created[key]
+                self.add(created[key], created=True)
+            else:
+                self.add(resolved[key])
+        return {label: resolved[normalize_label(label)] for label in labels}
+
+    def find(self, labels):
+        """
+        Return the existing rows matching `labels`, the oldest one of each,
+        by normalized label. The labels are looked up as they are written
+        and with their whitespace collapsed, in batches of exact matches
+        that the index on the field answers; unlike the preloaded entries
+        a label in another case does not match.
+        """
+        keys = {normalize_label(label) for label in labels}
+        spellings = sorted(
+            {
+                spelling
+                for label in labels
+                for spelling in (label, " ".join(label.split()))
+            }
+            - {""}
+        )
+        found = {}
+        for batch in itertools.batched(spellings, BATCH_SIZE):
+            rows = self.model.objects.filter(**{f"{self.field}__in": batch}).only(
+                "pk", self.field
+            )
+            for obj in rows.iterator():
+                key = normalize_label(getattr(obj, self.field))
+                if key in keys and (key not in found or obj.pk < found[key].pk):
+                    found[key] = obj
+        return found
+
+    def commit(self):
+        self.created = []
+
+    def savepoint(self):
+        return len(self.created)
+
+    def rollback(self, savepoint=0):
+        for key in self.created[savepoint:]:
+            self.entries.pop(key, None)
+        del self.created[savepoint:]
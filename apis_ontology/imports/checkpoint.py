@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import time
+
+HEAD_SIZE = 1 << 16
+
+
+def file_identity(path):
+    """
+    Identify a version of a file without reading all of it: its size,
+    its modification time and the hash of its first 64 KiB.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as fh:
+        head = hashlib.sha256(fh.read(HEAD_SIZE)).hexdigest()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "head": head}
+
+
+class Checkpoint:
+    """
+    The position of the last committed row of an import, stored as a
+    JSON file: the identity of the imported file, the number of the row
+    and the byte offset right after it. Rows up to that position are in
+    the database, an interrupted import can continue reading at the
+    offset.
+
+    The file is written at most every `interval` seconds and when the
+    import ends or fails; rows committed after the last write of an
+    import that is killed are imported again when it is resumed.
+    """
+
+    def __init__(self, path, csv_path, interval=5.0):
+        self.path = path
+        self.csv_path = csv_path
+        self.identity = file_identity(csv_path)
+        self.interval = interval
+        self.written_at = time.monotonic()
+        self.dirty = False
+        self.row = 0
+        self.offset = 0
+
+    def load(self):
+        """
+        Read the checkpoint file, if there is one. Returns False if there
+        is none and raises a `ValueError` if it belongs to another file.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return False
+        if data.get("identity") != self.identity:
+            raise ValueError(
+                f"Checkpoint {self.path} was written for a different version of "
+                f"{self.csv_path}"
+            )
+        self.row = data["row"]
+        self.offset = data["offset"]
+        return True
+
+    def save(self, row, offset):
+        self.row = row
+        self.offset = offset
+        self.dirty = True
+        if time.monotonic() - self.written_at >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Write the last saved position, if it is not written yet"""
+        if not self.dirty:
+            return
+        data = {
+            "file": os.path.abspath(self.csv_path),
+            "identity": self.identity,
+            "row": self.row,
+            "offset": self.offset,
+        }
+        # replace the file in one step, so that it is never half written
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, self.path)
+        self.written_at = time.monotonic()
+        self.dirty = False
+
+    def clear(self):
+        self.dirty = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
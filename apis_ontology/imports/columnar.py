@@ -0,0 +1,230 @@
+import datetime
+import json
+import time
+
+# the control characters `json_strings` leaves to `json.dumps`
+CONTROL_CHARACTERS = r"[\x00-\x08\x0b\x0c\x0e-\x1f]"
+
+
+class ParquetStream:
+    """
+    Read a Parquet file batch by batch and yield its rows as dicts, like
+    `CsvStream` does for CSV files, so that the import commands can use
+    either. The columns of a batch are converted as a whole by Arrow:
+    every value is cast to a string and missing values become empty
+    strings, which is what the row mapping gets from a CSV file.
+
+    Positions are counted in rows instead of bytes: `offset` is the
+    number of rows returned so far, and with `start` reading begins
+    after that many rows. Row groups before `start` are not read at all.
+
+    `pyarrow` is an optional dependency, it is imported when the first
+    stream is created.
+    """
+
+    def __init__(self, path, batch_size=10_000, start=0, columns=None):
+        import pyarrow.parquet
+
+        self.path = path
+        self.batch_size = batch_size
+        self.columns = columns
+        self.file = pyarrow.parquet.ParquetFile(path)
+        self.size = self.file.metadata.num_rows
+        self.start = start
+        self.offset = 0
+        self.started = None
+
+    def _row_groups(self):
+        """Return the row groups to read and the rows to skip in the first"""
+        skip = self.start
+        groups = []
+        for i in range(self.file.num_row_groups):
+            rows = self.file.metadata.row_group(i).num_rows
+            if skip >= rows and not groups:
+                skip -= rows
+                self.offset += rows
+                continue
+            groups.append(i)
+        return groups, skip
+
+    def batches(self):
+        """Yield the record batches with all columns cast to strings"""
+        import pyarrow
+        import pyarrow.compute
+
+        self.started = time.monotonic()
+        groups, skip = self._row_groups()
+        if not groups:
+            return
+        for batch in self.file.iter_batches(
+            batch_size=self.batch_size, row_groups=groups, columns=self.columns
+        ):
+            if skip:
+                if skip >= batch.num_rows:
+                    skip -= batch.num_rows
+                    self.offset += batch.num_rows
+                    continue
+                self.offset += skip
+                batch = batch.slice(skip)
+                skip = 0
+            columns = [
+                pyarrow.compute.fill_null(
+                    pyarrow.compute.cast(column, pyarrow.string()), ""
+                )
+                for column in batch.columns
+            ]
+            yield pyarrow.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+    def __iter__(self):
+        for batch in self.batches():
+            names = batch.schema.names
+            # one conversion per column instead of one per value
+            columns = [column.to_pylist() for column in batch.columns]
+            for values in zip(*columns):
+                self.offset += 1
+                yield dict(zip(names, values))
+
+    @property
+    def progress(self):
+        return self.offset / self.size if self.size else 1.0
+
+    @property
+    def eta(self):
+        """Estimated remaining time, derived from the rows read so far"""
+        if not self.started or not self.offset:
+            return None
+        read = self.offset - self.start
+        if read <= 0:
+            return None
+        elapsed = time.monotonic() - self.started
+        remaining = elapsed * (self.size - self.offset) / read
+        return datetime.timedelta(seconds=round(remaining))
+
+
+def concat(*values):
+    """Concatenate string arrays and scalars element-wise"""
+    import pyarrow.compute
+
+    return pyarrow.compute.binary_join_element_wise(*values, "")
+
+
+def blank_to_null(array):
+    """Replace the empty strings of `array` with nulls"""
+    import pyarrow
+    import pyarrow.compute
+
+    return pyarrow.compute.if_else(
+        pyarrow.compute.equal(array, ""), pyarrow.scalar(None, array.type), array
+    )
+
+
+def sequence(start, length):
+    """Return the integers from `start` on as an array of `length`"""
+    import pyarrow
+    import pyarrow.compute
+
+    ones = pyarrow.repeat(pyarrow.scalar(1, pyarrow.int64()), length)
+    return pyarrow.compute.add(pyarrow.compute.cumulative_sum(ones), start - 1)
+
+
+def map_unique(array, function, type=None):
+    """
+    Apply `function` to every distinct value of `array` once and return
+    the array of the results; nulls stay null. This is for the Python
+    functions that have no Arrow counterpart, like the date parser,
+    on columns whose values repeat.
+    """
+    import pyarrow
+    import pyarrow.compute
+
+    encoded = pyarrow.compute.dictionary_encode(array)
+    results = [function(value) for value in encoded.dictionary.to_pylist()]
+    return pyarrow.compute.take(pyarrow.array(results, type=type), encoded.indices)
+
+
+def json_strings(array):
+    """Return the values of a string array as JSON string literals"""
+    import pyarrow
+    import pyarrow.compute
+
+    escaped = array
+    for old, new in [
+        ("\\", "\\\\"),
+        ('"', '\\"'),
+        ("\n", "\\n"),
+        ("\r", "\\r"),
+        ("\t", "\\t"),
+    ]:
+        escaped = pyarrow.compute.replace_substring(escaped, old, new)
+    # other control characters are rare, those values are escaped one by one
+    other = pyarrow.compute.fill_null(
+        pyarrow.compute.match_substring_regex(array, CONTROL_CHARACTERS), False
+    )
+    if pyarrow.compute.any(other).as_py():
+        values = [json.dumps(v)[1:-1] for v in array.filter(other).to_pylist()]
+        escaped = pyarrow.compute.replace_with_mask(
+            escaped, other, pyarrow.array(values, pyarrow.string())
+        )
+    return concat('"', escaped, '"')
+
+
+class BatchMapping:
+    """
+    A `RowMapping` applied to record batches of a columnar file with Arrow
+    compute functions: the counterpart of `CompiledMapping`, which maps
+    one row at a time. The batches are those of `ParquetStream.batches`,
+    with every column a string column without nulls.
+    """
+
+    def __init__(self, mapping, names):
+        self.compiled = mapping.compile(names)
+        self.names = names
+
+    def missing(self, batch):
+        """
+        Return a dict of the indices of the rows lacking a required value
+        and their errors, the errors `CompiledMapping.values` raises.
+        """
+        import pyarrow.compute
+
+        errors = {}
+        for column in self.compiled.required:
+            if column in self.names:
+                empty = pyarrow.compute.equal(batch.column(column), "")
+                indices = pyarrow.compute.indices_nonzero(empty).to_pylist()
+            else:
+                indices = range(batch.num_rows)
+            for i in indices:
+                errors.setdefault(i, ValueError(f"Missing required field: {column}"))
+        return errors
+
+    def values(self, batch):
+        return {field: batch.column(column) for field, column in self.compiled.fields}
+
+    def alternative_labels(self, batch):
+        """Return the `alternative_labels` of the rows as JSON arrays"""
+        import pyarrow
+        import pyarrow.compute
+
+        entries = pyarrow.repeat(pyarrow.scalar(""), batch.num_rows)
+        for column, lang, typ in self.compiled.labels:
+            values = batch.column(column)
+            entry = concat(
+                ', {"label": ',
+                json_strings(values),
+                f', "lang": {json.dumps(lang)}, "typ": {json.dumps(typ)}}}',
+            )
+            empty = pyarrow.compute.equal(values, "")
+            entries = concat(entries, pyarrow.compute.if_else(empty, "", entry))
+        entries = pyarrow.compute.replace_substring_regex(entries, "^, ", "")
+        return concat("[", entries, "]")
+
+    def external_uris(self, batch):
+        """Return the first external uri of every row, or null"""
+        import pyarrow
+        import pyarrow.compute
+
+        columns = [blank_to_null(batch.column(c)) for c in self.compiled.uris]
+        if not columns:
+            return pyarrow.nulls(batch.num_rows, pyarrow.string())
+        return pyarrow.compute.coalesce(*columns)
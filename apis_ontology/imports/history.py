@@ -0,0 +1,81 @@
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+
+
+def history_model(model):
+    """Return the history model of `model`, None if it is not tracked"""
+    if manager := getattr(model._meta, "simple_history_manager_attribute", None):
+        return getattr(model, manager).model
+    return None
+
+
+class DeferredHistory:
+    """
+    Collect the history entries of saved instances instead of writing
+    one per save, and write them with one bulk insert per history model.
+
+    While connected, saves of tracked models skip the `post_save` handler
+    of `simple_history`; the entry it would have written is built right
+    after the save, from the values the instance had at that time, and
+    kept until `flush`. Like the lookup caches, entries collected since
+    a `savepoint` can be dropped again by `rollback`.
+    """
+
+    def __init__(self):
+        self.pending = []
+        self.rows = 0
+        self.inserts = 0
+
+    def connect(self):
+        pre_save.connect(self.pre_save, dispatch_uid=f"defer_history_{id(self)}")
+        post_save.connect(self.post_save, dispatch_uid=f"defer_history_{id(self)}")
+
+    def disconnect(self):
+        pre_save.disconnect(dispatch_uid=f"defer_history_{id(self)}")
+        post_save.disconnect(dispatch_uid=f"defer_history_{id(self)}")
+
+    def pre_save(self, sender, instance, raw=False, **kwargs):
+        # instances saved with `save_without_historical_record` stay untouched
+        if raw or hasattr(instance, "skip_history_when_saving"):
+            return
+        if history_model(sender) is not None:
+            instance.skip_history_when_saving = True
+            instance._defer_history = True
+
+    def post_save(self, sender, instance, created, **kwargs):
+        if not getattr(instance, "_defer_history", False):
+            return
+        del instance.skip_history_when_saving
+        del instance._defer_history
+        history = history_model(sender)
+        row = history(
+            history_date=getattr(instance, "_history_date", timezone.now()),
+            history_user=getattr(
+                instance, "_history_user", history.get_default_history_user(instance)
+            ),
+            history_change_reason=getattr(instance, "_change_reason", None),
+            history_type="+" if created else "~",
+            **{
+                field.attname: getattr(instance, field.attname)
+                for field in history.tracked_fields
+            },
+        )
+        if hasattr(history, "history_relation"):
+            row.history_relation_id = instance.pk
+        self.pending.append(row)
+
+    def savepoint(self):
+        return len(self.pending)
+
+    def rollback(self, savepoint=0):
+        del self.pending[savepoint:]
+
+    def flush(self):
+        pending, self.pending = self.pending, []
+        rows = {}
+        for row in pending:
+            rows.setdefault(type(row), []).append(row)
+        for history, objs in rows.items():
+            history.objects.bulk_create(objs)
+            self.rows += len(objs)
+            self.inserts += 1
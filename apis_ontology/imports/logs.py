@@ -0,0 +1,42 @@
+import json
+import logging
+import re
+
+# the attributes every log record has, everything else was passed as `extra`
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def record_extra(record):
+    """Return the values passed to a log call with `extra`"""
+    return {k: v for k, v in vars(record).items() if k not in RECORD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as JSON objects, one per line, with the time, the
+    level, the message and the values that were passed with `extra`.
+    """
+
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            **record_extra(record),
+        }
+        if record.exc_info:
+            data["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def error_class(exc):
+    """
+    Group errors by the type of the exception and its message, with the
+    quoted values and numbers that differ from row to row masked. Errors
+    re-raised as another exception are grouped by their cause.
+    """
+    while exc.__cause__ is not None:
+        exc = exc.__cause__
+    message = re.sub(r"'[^']*'|\"[^\"]*\"", "'…'", str(exc))
+    message = re.sub(r"\d+", "N", message)
+    return f"{type(exc).__name__}: {message[:200]}"
@@ -0,0 +1,80 @@
+import json
+
+from django.apps import apps
+
+
+class RowMapping:
+    """
+    A declarative description of how the columns of a CSV file map to an
+    entity:
+
+    - `fields` maps model fields to the columns holding their values,
+    - `labels` lists `(column, lang, typ)` tuples of the columns that
+      become entries of `alternative_labels`,
+    - `uris` lists the columns holding external uris,
+    - `required` lists the columns that must not be empty.
+
+    Columns that are missing from a file are ignored. `compile` resolves
+    the mapping against the header of a file once, so the work per row
+    is reduced to looking up the columns that are actually there.
+    """
+
+    def __init__(self, fields=None, labels=None, uris=None, required=None, model=None):
+        self.model = model
+        self.fields = fields or {}
+        self.labels = [tuple(label) for label in labels or []]
+        self.uris = uris or []
+        self.required = required or []
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Read a mapping from a JSON file with the keys of the constructor;
+        `model` is the label of the model, e.g. `apis_ontology.institution`.
+        """
+        with open(path, encoding="utf-8") as fh:
+            spec = json.load(fh)
+        if model := spec.get("model"):
+            spec["model"] = apps.get_model(model)
+        return cls(**spec)
+
+    def compile(self, header):
+        return CompiledMapping(self, header)
+
+
+class CompiledMapping:
+    """A `RowMapping` resolved against the header of a CSV file"""
+
+    def __init__(self, mapping, header):
+        present = set(header)
+        self.required = list(mapping.required)
+        self.fields = [(f, c) for f, c in mapping.fields.items() if c in present]
+        self.labels = [label for label in mapping.labels if label[0] in present]
+        self.uris = [column for column in mapping.uris if column in present]
+
+    def field_names(self):
+        """The names of the fields the rows of the file set"""
+        names = [field for field, _ in self.fields]
+        if self.labels:
+            names.append("alternative_labels")
+        return names
+
+    def values(self, row):
+        """
+        Return the field values of a row; fields whose column is missing
+        from the file are left out, so they get their default.
+        """
+        for column in self.required:
+            if not row.get(column):
+                raise ValueError(f"Missing required field: {column}")
+        return {field: row[column] for field, column in self.fields}
+
+    def alternative_labels(self, row):
+        return [
+            {"label": value, "lang": lang, "typ": typ}
+            for column, lang, typ in self.labels
+            if (value := row[column])
+        ]
+
+    def external_uris(self, row):
+        return [value for column in self.uris if (value := row[column])]
@@ -0,0 +1,131 @@
+import io
+import logging
+import os
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from apis_ontology.dates import cached_dateparser, date_cache_stats
+from apis_ontology.imports.logs import record_extra
+
+# The command instance of a worker process, set up by `init_worker`
+command = None
+
+
+class RecordingHandler(logging.Handler):
+    """Keep log records in memory, so the main process can write them"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage(), record_extra(record)))
+
+
+def drain(output):
+    buffer = output._out
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+def init_worker(command_class, options, database):
+    """
+    Set up a spawned worker process for the import command with the
+    dotted path `command_class`: every worker gets its own database
+    connection to the `database` of the main process, which differs
+    from the configured one in tests, and its own instance of the
+    import command, whose output is buffered and handed back to the main
+    process with every result.
+    """
+    global command
+    django.setup()
+    settings.DATABASES["default"]["NAME"] = database
+    connections["default"].settings_dict["NAME"] = database
+    # the class is passed by name, its module needs the app registry
+    command_class = import_string(command_class)
+
+    command = command_class(stdout=io.StringIO(), stderr=io.StringIO())
+    command.setup(options)
+    command.reader = None
+    if command.profiler:
+        connections["default"].execute_wrappers.append(command.profiler)
+    command.logger = logging.getLogger(f"csv_import.worker{os.getpid()}")
+    command.logger.propagate = False
+    command.logger.setLevel(logging.INFO)
+    command.log_handler = RecordingHandler()
+    command.logger.addHandler(command.log_handler)
+
+
+def import_shard(shard, csv_file, csv_files):
+    """
+    Import a shard of `(number, row)` tuples of `csv_file` in the worker
+    process and return the counters, the statistics and the buffered
+    output. `csv_files` are all files of the run.
+    """
+    if csv_file != command.csv_file:
+        # the column mappings are compiled against the header of a file
+        command.csv_file = csv_file
+        command.csv_files = csv_files
+        command.mappings = {}
+    errors = command.errors
+    # this module is imported before the app registry is ready
+    from apis_ontology.uricache import deferred_refresh
+
+    with deferred_refresh():
+        command.import_chunk(shard)
+        command.flush()
+
+    records, command.log_handler.records = command.log_handler.records, []
+    result = {
+        "processed": len(shard),
+        "error_classes": command.error_classes,
+        "errors": command.errors - errors,
+        "stdout": drain(command.stdout),
+        "stderr": drain(command.stderr),
+        "records": records,
+        "commits": (command.commits, command.commit_time, command.commit_time_max),
+        "profile": (
+            (command.profiler.rows, command.profiler.sites)
+            if command.profiler
+            else ({}, {})
+        ),
+        "relations": (
+            (command.relations.created, command.relations.inserts)
+            if command.relations
+            else (0, 0)
+        ),
+        "history": (
+            (command.history.rows, command.history.inserts)
+            if command.history
+            else (0, 0)
+        ),
+        "dates": date_cache_stats(command.dates_since),
+        "upserts": {
+            str(model._meta.verbose_name_plural): (index.updated, index.unchanged)
+            for model, index in command.upserts.items()
+        },
+        "caches": {
+            str(model._meta.verbose_name): (cache.hits, cache.misses, cache.evictions)
+            for model, cache in command.caches.items()
+        },
+    }
+    # the statistics are reported per shard, the main process sums them up
+    command.error_classes = {}
+    command.commits, command.commit_time, command.commit_time_max = 0, 0.0, 0.0
+    for cache in command.caches.values():
+        cache.hits = cache.misses = cache.evictions = 0
+    if command.profiler:
+        command.profiler.rows, command.profiler.sites = {}, {}
+    if command.relations:
+        command.relations.created = command.relations.inserts = 0
+    if command.history:
+        command.history.rows = command.history.inserts = 0
+    command.dates_since = cached_dateparser.cache_info()
+    for index in command.upserts.values():
+        index.updated = index.unchanged = 0
+    return result
@@ -0,0 +1,401 @@
+import io
+import json
+
+from apis_core.apis_metainfo.models import RootObject
+from apis_core.relations.models import Relation
+from apis_core.uris.models import Uri
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, models
+from django_interval.fields import GenericDateIntervalField
+
+from apis_ontology.uricache import refresh_external_uris
+
+# a primary key that is replaced by the real one in the default uri template
+PK_PLACEHOLDER = 987654321
+
+
+def copy_value(value):
+    """Format a value for the text format of `COPY`"""
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class LineStream(io.RawIOBase):
+    """A readable file object over an iterator of lines, for `copy_expert`"""
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.buffer = bytearray()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while len(self.buffer) < len(b):
+            try:
+                self.buffer += next(self.lines).encode()
+            except StopIteration:
+                break
+        size = min(len(b), len(self.buffer))
+        b[:size] = self.buffer[:size]
+        del self.buffer[:size]
+        return size
+
+
+def copy(cursor, sql, lines):
+    # psycopg2 reads from a file object, psycopg 3 is written to
+    if hasattr(cursor, "copy_expert"):
+        cursor.copy_expert(sql, LineStream(lines))
+    else:
+        with cursor.copy(sql) as target:
+            for line in lines:
+                target.write(line)
+
+
+class CopyLoader:
+    """
+    Load entities of `model` through a temporary staging table that is
+    filled with `COPY FROM STDIN`.
+
+    The staging table has the columns of the entity table plus the
+    `extra_columns` (a mapping of column names to SQL types) the import
+    needs, for example labels that are resolved after the copy. `_row`
+    holds the number of the row in the import file. `uri_columns` are
+    extra columns holding external uris.
+
+    After `copy`, `allocate` assigns the primary keys from the
+    `RootObject` sequence and `insert` moves the rows into the
+    `RootObject` and entity tables and creates the history entries and
+    the uris with set-based SQL. Everything has to run in one
+    transaction, the staging table is dropped on commit.
+    """
+
+    def __init__(self, model, extra_columns=None, uri_columns=None):
+        self.model = model
+        self.table = model._meta.db_table
+        self.staging = f"staging_{self.table}"
+        self.ptr = model._meta.get_ancestor_link(RootObject)
+        self.pk = self.ptr.column
+        self.fields = [
+            f
+            for f in model._meta.local_concrete_fields
+            if not f.generated and f is not self.ptr
+        ]
+        self.uri_columns = uri_columns or []
+        self.extra_columns = {
+            "_row": "bigint",
+            **{column: "text" for column in self.uri_columns},
+            **(extra_columns or {}),
+        }
+
+    @property
+    def columns(self):
+        return [f.column for f in self.fields] + list(self.extra_columns)
+
+    def prepare(self, field, obj):
+        value = field.pre_save(obj, add=True)
+        if isinstance(field, models.JSONField):
+            return None if value is None else json.dumps(value, cls=field.encoder)
+        return field.get_db_prep_save(value, connection)
+
+    def line(self, obj, extra):
+        """Format an unsaved instance and its extra values as a `COPY` line"""
+        values = [self.prepare(f, obj) for f in self.fields]
+        values += [extra.get(column) for column in self.extra_columns]
+        return "\t".join(map(copy_value, values)) + "\n"
+
+    def batch(self, values, extra):
+        """
+        Build the record batch of the staging table from Arrow arrays, the
+        columnar counterpart of `line`: `values` maps field names to
+        string arrays, `extra` the extra columns. Fields without values
+        get their default, the dates of fuzzy date fields are computed
+        once per distinct date string.
+
+        Returns:
+            tuple: the batch and a dict of the indices of the rows whose
+                   dates could not be parsed and their errors.
+        """
+        import pyarrow
+        import pyarrow.compute
+
+        from apis_ontology.imports.columnar import map_unique
+
+        length = len(next(iter(extra.values())))
+        columns = {}
+        errors = {}
+        for field in self.fields:
+            if not isinstance(field, GenericDateIntervalField):
+                continue
+            if (array := values.get(field.name)) is None:
+                continue
+            failed = {}
+
+            def parse(value, field=field, failed=failed):
+                try:
+                    dates = field.calculate(value) if value else (None, None, None)
+                except Exception as e:
+                    failed[value] = e
+                    dates = (None, None, None)
+                return dict(zip(["sort", "from", "to"], dates))
+
+            dates = map_unique(array, parse)
+            for key in ["sort", "from", "to"]:
+                child = self.model._meta.get_field(f"{field.name}_date_{key}")
+                # the parser returns datetimes, the fields store dates
+                columns[child.column] = pyarrow.compute.cast(
+                    dates.field(key), pyarrow.date32(), safe=False
+                )
+            if failed:
+                for i, value in enumerate(array.to_pylist()):
+                    if value in failed:
+                        errors.setdefault(
+                            i, ValueError(f"Error parsing date string: {failed[value]}")
+                        )
+
+        defaults = self.model()
+        for field in self.fields:
+            if field.name in values:
+                columns[field.column] = values[field.name]
+            elif field.column not in columns:
+                value = self.prepare(field, defaults)
+                if isinstance(value, bool):
+                    value = "t" if value else "f"
+                columns[field.column] = pyarrow.repeat(
+                    pyarrow.scalar(None if value is None else str(value)), length
+                )
+        columns.update(extra)
+        batch = pyarrow.RecordBatch.from_arrays(
+            [columns[column] for column in self.columns], names=self.columns
+        )
+        return batch, errors
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TEMP TABLE "{self.staging}" ON COMMIT DROP AS '
+            f'SELECT * FROM "{self.table}" WITH NO DATA'
+        )
+        for column, sqltype in self.extra_columns.items():
+            cursor.execute(
+                f'ALTER TABLE "{self.staging}" ADD COLUMN "{column}" {sqltype}'
+            )
+
+    def copy(self, cursor, lines):
+        self.create(cursor)
+        columns = ", ".join(f'"{c}"' for c in self.columns)
+        copy(cursor, f'COPY "{self.staging}" ({columns}) FROM STDIN', lines)
+        cursor.execute(f'ANALYZE "{self.staging}"')
+
+    def copy_batches(self, cursor, batches):
+        """
+        Fill the staging table with the record batches `batches`, each
+        of which is written by Arrow as one block of CSV. Nulls are
+        written as unquoted empty values, which `COPY` reads as NULL,
+        and empty strings quoted.
+        """
+        import pyarrow.csv
+
+        options = pyarrow.csv.WriteOptions(include_header=False, quoting_style="needed")
+
+        def blocks():
+            for batch in batches:
+                output = io.BytesIO()
+                pyarrow.csv.write_csv(batch, output, options)
+                yield output.getvalue().decode()
+
+        self.create(cursor)
+        columns = ", ".join(f'"{c}"' for c in self.columns)
+        copy(
+            cursor,
+            f'COPY "{self.staging}" ({columns}) FROM STDIN WITH (FORMAT csv)',
+            blocks(),
+        )
+        cursor.execute(f'ANALYZE "{self.staging}"')
+
+    def resolve(self, cursor, column, target, resolve):
+        """
+        Set the `target` column of the staging table by passing the
+        distinct values of `column` to `resolve`, which returns an
+        instance. This is meant for the few distinct labels that are
+        shared by many rows, like places or professions.
+        """
+        cursor.execute(
+            f'SELECT DISTINCT "{column}" FROM "{self.staging}" '
+            f'WHERE "{column}" IS NOT NULL'
+        )
+        pairs = [(value, resolve(value).pk) for (value,) in cursor.fetchall()]
+        for i in range(0, len(pairs), 1000):
+            chunk = pairs[i : i + 1000]
+            values = ", ".join(["(%s, %s)"] * len(chunk))
+            cursor.execute(
+                f'UPDATE "{self.staging}" s SET "{target}" = v.pk '
+                f"FROM (VALUES {values}) AS v(value, pk) "
+                f'WHERE s."{column}" = v.value',
+                [param for pair in chunk for param in pair],
+            )
+
+    def duplicate_uris(self, cursor):
+        """
+        Return `(row, uri)` for the external uris that already exist or
+        that occur more than once in the file; those are not created.
+        """
+        duplicates = []
+        for column in self.uri_columns:
+            cursor.execute(
+                f'SELECT s._row, s."{column}" FROM "{self.staging}" s '
+                f'JOIN "{Uri._meta.db_table}" u ON u.uri = s."{column}" '
+                f"UNION ALL "
+                f'SELECT d._row, d."{column}" FROM ('
+                f'SELECT _row, "{column}", row_number() OVER '
+                f'(PARTITION BY "{column}" ORDER BY _row) AS n '
+                f'FROM "{self.staging}" WHERE "{column}" IS NOT NULL) d '
+                f"WHERE d.n > 1 ORDER BY 1"
+            )
+            duplicates += cursor.fetchall()
+        return duplicates
+
+    def allocate(self, cursor):
+        root = RootObject._meta
+        cursor.execute(
+            f'UPDATE "{self.staging}" SET "{self.pk}" = '
+            f"nextval(pg_get_serial_sequence(%s, %s))",
+            [root.db_table, root.pk.column],
+        )
+
+    def insert(self, cursor):
+        root = RootObject._meta
+        cursor.execute(
+            f'INSERT INTO "{root.db_table}" ("{root.pk.column}") '
+            f'SELECT "{self.pk}" FROM "{self.staging}"'
+        )
+        columns = ", ".join(
+            f'"{c}"' for c in [self.pk] + [f.column for f in self.fields]
+        )
+        cursor.execute(
+            f'INSERT INTO "{self.table}" ({columns}) '
+            f'SELECT {columns} FROM "{self.staging}"'
+        )
+        if hasattr(self.model, "history"):
+            self.insert_history(cursor)
+        self.insert_uris(cursor)
+
+    def insert_history(self, cursor):
+        history = self.model.history.model
+        targets, sources = [], []
+        for field in history.tracked_fields:
+            targets.append(f'"{field.column}"')
+            # the fields of `RootObject` are stored in the pointer column
+            column = self.pk if field.model is RootObject else field.column
+            sources.append(f'"{column}"')
+        cursor.execute(
+            f'INSERT INTO "{history._meta.db_table}" ({", ".join(targets)}, '
+            f"history_date, history_type, history_change_reason, history_user_id) "
+            f"SELECT {', '.join(sources)}, clock_timestamp(), '+', NULL, NULL "
+            f'FROM "{self.staging}"'
+        )
+
+    def insert_uris(self, cursor):
+        content_type = ContentType.objects.get_for_model(self.model)
+        uris = Uri._meta.db_table
+        if getattr(settings, "CREATE_DEFAULT_URI", True):
+            template = self.model(pk=PK_PLACEHOLDER).get_default_uri()
+            prefix, suffix = template.split(str(PK_PLACEHOLDER))
+            cursor.execute(
+                f'INSERT INTO "{uris}" (uri, content_type_id, object_id) '
+                f'SELECT %s || "{self.pk}" || %s, %s, "{self.pk}" '
+                f'FROM "{self.staging}"',
+                [prefix, suffix, content_type.pk],
+            )
+        for column in self.uri_columns:
+            cursor.execute(
+                f'INSERT INTO "{uris}" (uri, content_type_id, object_id) '
+                f'SELECT "{column}", %s, "{self.pk}" FROM "{self.staging}" '
+                f'WHERE "{column}" IS NOT NULL ON CONFLICT (uri) DO NOTHING',
+                [content_type.pk],
+            )
+        if self.uri_columns:
+            # `COPY` sends no signals, see `apis_ontology.signals`
+            condition = " OR ".join(f'"{c}" IS NOT NULL' for c in self.uri_columns)
+            cursor.execute(
+                f'SELECT "{self.pk}" FROM "{self.staging}" WHERE {condition}'
+            )
+            refresh_external_uris(self.model, [pk for (pk,) in cursor.fetchall()])
+
+
+def insert_relations(cursor, model, query, params=None):
+    """
+    Create relations of type `model` with set-based SQL. `query` selects
+    the primary keys of the subjects and objects as columns `subj` and
+    `obj`. Fields of the relation model get their default values.
+    Versioned relations get their history entries as well.
+    """
+    relation = Relation._meta
+    ptr = model._meta.get_ancestor_link(Relation)
+    fields = [
+        f for f in model._meta.local_concrete_fields if not f.generated and f is not ptr
+    ]
+    staging = f"staging_{model._meta.db_table}"
+    cursor.execute(
+        f'CREATE TEMP TABLE "{staging}" AS '
+        f"SELECT nextval(pg_get_serial_sequence(%s, %s)) AS id, q.subj, q.obj "
+        f"FROM ({query}) q",
+        [relation.db_table, relation.pk.column, *(params or [])],
+    )
+    columns = [
+        relation.pk.column,
+        relation.get_field("subj_content_type").column,
+        relation.get_field("subj_object_id").column,
+        relation.get_field("obj_content_type").column,
+        relation.get_field("obj_object_id").column,
+    ]
+    cursor.execute(
+        f'INSERT INTO "{relation.db_table}" ({", ".join(columns)}) '
+        f'SELECT id, %s, subj, %s, obj FROM "{staging}"',
+        [
+            ContentType.objects.get_for_model(model.subj_model).pk,
+            ContentType.objects.get_for_model(model.obj_model).pk,
+        ],
+    )
+    columns = ", ".join(f'"{c}"' for c in [ptr.column] + [f.column for f in fields])
+    placeholders = ", ".join(["%s"] * len(fields))
+    cursor.execute(
+        f'INSERT INTO "{model._meta.db_table}" ({columns}) '
+        f'SELECT id{", " if fields else ""}{placeholders} FROM "{staging}"',
+        [f.get_db_prep_save(f.get_default(), connection) for f in fields],
+    )
+    if hasattr(model, "history"):
+        insert_relation_history(cursor, model, staging)
+    cursor.execute(f'SELECT count(*) FROM "{staging}"')
+    (count,) = cursor.fetchone()
+    cursor.execute(f'DROP TABLE "{staging}"')
+    return count
+
+
+def insert_relation_history(cursor, model, staging):
+    """Create the history entries of the relations listed in `staging`"""
+    history = model.history.model
+    ptr = model._meta.get_ancestor_link(Relation)
+    targets, sources = [], []
+    for field in history.tracked_fields:
+        targets.append(f'"{field.column}"')
+        # the fields of `Relation` are in its table, the others in the child table
+        table = "r" if field.model is Relation else "c"
+        sources.append(f'{table}."{field.column}"')
+    cursor.execute(
+        f'INSERT INTO "{history._meta.db_table}" ({", ".join(targets)}, '
+        f"history_date, history_type, history_change_reason, history_user_id) "
+        f"SELECT {', '.join(sources)}, clock_timestamp(), '+', NULL, NULL "
+        f'FROM "{staging}" s '
+        f'JOIN "{Relation._meta.db_table}" r ON r."{Relation._meta.pk.column}" = s.id '
+        f'JOIN "{model._meta.db_table}" c ON c."{ptr.column}" = s.id'
+    )
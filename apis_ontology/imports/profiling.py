@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class QueryProfiler:
+    """
+    An execute wrapper (see `connection.execute_wrapper`) that counts the
+    queries and the time spent in the database, per row of the import
+    file and per call site. The call site is made of the innermost frames
+    in the code of this package, so queries issued deep inside Django are
+    attributed to the import code that caused them.
+    """
+
+    def __init__(self):
+        # the number of the row that is imported, None between rows
+        self.row = None
+        self.rows = {}
+        self.sites = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            for stats, key in [(self.rows, self.row), (self.sites, call_site())]:
+                entry = stats.setdefault(key, [0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def merge(self, rows, sites):
+        for stats, other in [(self.rows, rows), (self.sites, sites)]:
+            for key, (queries, seconds) in other.items():
+                entry = stats.setdefault(key, [0, 0.0])
+                entry[0] += queries
+                entry[1] += seconds
+
+    def report(self, top=20):
+        rows = {row: stats for row, stats in self.rows.items() if row is not None}
+        queries = sum(queries for queries, _ in self.rows.values())
+        seconds = sum(seconds for _, seconds in self.rows.values())
+        yield f"Queries: {queries} in {seconds:.2f} s"
+        if rows:
+            in_rows = sum(queries for queries, _ in rows.values())
+            yield (
+                f"Queries per row: avg {in_rows / len(rows):.2f}, "
+                f"max {max(queries for queries, _ in rows.values())}"
+            )
+        if between := self.rows.get(None):
+            yield f"Queries outside of rows (flushes, commits): {between[0]}"
+        yield f"Top {top} call sites by database time:"
+        ranked = sorted(self.sites.items(), key=lambda item: item[1][1], reverse=True)
+        for site, (queries, seconds) in ranked[:top]:
+            yield f"  {seconds * 1000:10.1f} ms {queries:8} queries  {site}"
+        yield f"Top {top} rows by number of queries:"
+        ranked = sorted(rows.items(), key=lambda item: item[1][0], reverse=True)
+        for row, (queries, seconds) in ranked[:top]:
+            yield f"  row {row}: {queries} queries, {seconds * 1000:.1f} ms"
+
+
+def call_site(depth=2):
+    """
+    Describe the innermost `depth` frames in the code of this package
+    that led to the current query, innermost first.
+    """
+    frames = []
+    frame = sys._getframe(2)
+    while frame and len(frames) < depth:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PACKAGE_DIR) and filename != __file__:
+            path = os.path.relpath(filename, PACKAGE_DIR)
+            frames.append(f"{path}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return " <- ".join(frames) or "<outside of apis_ontology>"
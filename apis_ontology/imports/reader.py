@@ -0,0 +1,61 @@
+import codecs
+import csv
+import datetime
+import os
+import time
+
+
+class CsvStream:
+    """
+    Read a CSV file in a single pass and keep track of how many bytes
+    were consumed. The file is read in binary mode and decoded line by
+    line, so `offset` always points to the end of the last row that
+    was returned, also when quoted fields contain newlines.
+
+    With `start`, the rows before that byte offset are skipped: only the
+    header is read, then reading continues at `start`, which has to be
+    an `offset` reported by an earlier pass.
+    """
+
+    def __init__(self, path, encoding="utf-8", delimiter=",", start=0):
+        self.path = path
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.size = os.path.getsize(path)
+        self.start = start
+        self.offset = 0
+        self.started = None
+
+    def _lines(self, fh):
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        for line in fh:
+            self.offset += len(line)
+            yield decoder.decode(line)
+
+    def __iter__(self):
+        self.started = time.monotonic()
+        with open(self.path, "rb") as fh:
+            lines = self._lines(fh)
+            fieldnames = next(csv.reader(lines, delimiter=self.delimiter), None)
+            if self.start > self.offset:
+                fh.seek(self.start)
+                self.offset = self.start
+            yield from csv.DictReader(
+                lines, fieldnames=fieldnames, delimiter=self.delimiter
+            )
+
+    @property
+    def progress(self):
+        return self.offset / self.size if self.size else 1.0
+
+    @property
+    def eta(self):
+        """Estimated remaining time, derived from the bytes read so far"""
+        if not self.started or not self.offset:
+            return None
+        read = self.offset - self.start
+        if read <= 0:
+            return None
+        elapsed = time.monotonic() - self.started
+        remaining = elapsed * (self.size - self.offset) / read
+        return datetime.timedelta(seconds=round(remaining))
@@ -0,0 +1,85 @@
+from django.contrib.contenttypes.models import ContentType
+
+from apis_ontology.imports.bulk import bulk_create_relations
+
+
+class RelationBuffer:
+    """
+    Collect the relations an import creates and insert them in bulk, one
+    batch per relation model, when the chunk is flushed.
+
+    Relations added with `unique=True` are created only once per pair of
+    subject and object: duplicates are dropped in memory while adding,
+    pairs that already exist in the database are dropped with one query
+    per model when flushing. Like the lookup caches, relations added
+    since a `savepoint` can be dropped again by `rollback`.
+    """
+
+    def __init__(self):
+        # relations as (model, subj content type, subj, obj content type, obj)
+        self.pending = []
+        self.seen = set()
+        self.content_types = {}
+        self.created = 0
+        self.inserts = 0
+
+    def content_type(self, obj):
+        model = type(obj)
+        if model not in self.content_types:
+            self.content_types[model] = ContentType.objects.get_for_model(model).pk
+        return self.content_types[model]
+
+    def add(self, model, subj, obj, unique=False):
+        key = (model, self.content_type(subj), subj.pk, self.content_type(obj), obj.pk)
+        if unique:
+            if key in self.seen:
+                return
+            self.seen.add(key)
+        self.pending.append((key, unique))
+
+    def savepoint(self):
+        return len(self.pending)
+
+    def rollback(self, savepoint=0):
+        for key, unique in self.pending[savepoint:]:
+            if unique:
+                self.seen.discard(key)
+        del self.pending[savepoint:]
+
+    def existing(self, model, keys):
+        """Return the keys of relations of `model` that are in the database"""
+        found = model.objects.filter(
+            subj_object_id__in={key[2] for key in keys},
+            obj_object_id__in={key[4] for key in keys},
+        ).values_list(
+            "subj_content_type_id",
+            "subj_object_id",
+            "obj_content_type_id",
+            "obj_object_id",
+        )
+        return {(model, *values) for values in found}
+
+    def flush(self):
+        pending, self.pending = self.pending, []
+        relations = {}
+        for key, unique in pending:
+            relations.setdefault(key[0], []).append((key, unique))
+        for model, entries in relations.items():
+            unique = [key for key, is_unique in entries if is_unique]
+            existing = self.existing(model, unique) if unique else set()
+            objs = []
+            for key, is_unique in entries:
+                if is_unique and key in existing:
+                    continue
+                _, subj_ct, subj, obj_ct, obj = key
+                objs.append(
+                    model(
+                        subj_content_type_id=subj_ct,
+                        subj_object_id=subj,
+                        obj_content_type_id=obj_ct,
+                        obj_object_id=obj,
+                    )
+                )
+            bulk_create_relations(model, objs)
+            self.created += len(objs)
+            self.inserts += 1
@@ -0,0 +1,227 @@
+import csv
+import random
+
+from apis_ontology.models import Person
+
+PERSON_HEADERS = [
+    "skos:prefLabel @de",
+    "skos:altLabel @de",
+    "skos:altLabel @de 2",
+    "skos:altLabel @de 3",
+    "skos:altLabel @de 4",
+    "skos:altLabel @de 5",
+    "skos:altLabel @en",
+    "skos:prefLabel @en",
+    "skos:broader",
+    "skos:broader occupation",
+    "skos:scope",
+    "skos:broader time",
+    "skos:broader time02",
+    "skos:exactMatch",
+]
+
+INSTITUTION_HEADERS = [
+    "skos:prefLabel @de",
+    "skos:altLabel @de",
+    "skos:altLabel @de 2",
+    "skos:altLabel @en",
+    "skos:prefLabel @en",
+    "skos:prefLabel @fr",
+    "skos:altLabel @fr",
+    "skos:prefLabel @esp",
+    "skos:prefLable@ita",
+    "skos:prefLabel@Local Language",
+    "skos:altLabel@Local Language",
+    "hierarchy",
+    "Land",
+    "skos:broader name1",
+    "skos:broader name2",
+    "Link-exact",
+    "Link-related",
+]
+
+FIRST_NAMES = [
+    "Anna",
+    "Franz",
+    "Maria",
+    "Josef",
+    "Karl",
+    "Johann",
+    "Elisabeth",
+    "Rudolf",
+    "Otto",
+    "Theodor",
+    "Hedwig",
+    "Wilhelm",
+    "Emil",
+    "Friedrich",
+    "Gustav",
+    "Ida",
+]
+LAST_NAMES = [
+    "Gruber",
+    "Huber",
+    "Bauer",
+    "Wagner",
+    "Müller",
+    "Pichler",
+    "Steiner",
+    "Moser",
+    "Mayer",
+    "Hofer",
+    "Leitner",
+    "Berger",
+    "Fuchs",
+    "Eder",
+    "Fischer",
+    "Schmid",
+]
+OCCUPATIONS = [
+    "Archäologe",
+    "Architekt",
+    "Epigraphiker",
+    "Fotograf",
+    "Grabungsarbeiter",
+    "Historiker",
+    "Kunsthändler",
+    "Maler",
+    "Numismatiker",
+    "Restaurator",
+    "Sammler",
+    "Zeichner",
+]
+COUNTRIES = [
+    "Österreich",
+    "Deutschland",
+    "Italien",
+    "Griechenland",
+    "Türkei",
+    "Frankreich",
+    "Ägypten",
+    "Kroatien",
+    "Slowenien",
+    "Ungarn",
+]
+CITIES = [
+    "Wien",
+    "Graz",
+    "Salzburg",
+    "Innsbruck",
+    "Berlin",
+    "München",
+    "Rom",
+    "Neapel",
+    "Athen",
+    "Thessaloniki",
+    "Istanbul",
+    "Ephesos",
+    "Paris",
+    "Lyon",
+    "Kairo",
+    "Alexandria",
+    "Split",
+    "Pula",
+    "Ljubljana",
+    "Budapest",
+]
+INSTITUTION_TYPES = [
+    "Museum",
+    "Universität",
+    "Institut",
+    "Akademie",
+    "Bibliothek",
+    "Archiv",
+    "Sammlung",
+    "Grabungshaus",
+]
+
+
+def identifier(seed, number, offset=0):
+    """A number for external uris that is unique per seed and row"""
+    return seed * 10_000_000 + offset + number + 1
+
+
+def person_rows(count, seed=0):
+    """
+    Yield `count` rows shaped like the OEAI person export: a few alt
+    labels, occupations and periods shared by many rows, a `birth-death`
+    scope and an exact match uri for most persons.
+    """
+    rnd = random.Random(seed)
+    types = [value for value, _ in Person.PERSON_TYPE]
+    periods = [value for value, _ in Person.PERIOD]
+    details = [value for value, _ in Person.PERIOD_DETAIL]
+    for number in range(count):
+        name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)} {number}"
+        row = dict.fromkeys(PERSON_HEADERS, "")
+        row["skos:prefLabel @de"] = name
+        for header in PERSON_HEADERS[1 : 1 + rnd.choice([0, 0, 1, 1, 2, 5])]:
+            row[header] = f"{name.split()[-2]}, {name.split()[0][0]}. ({header[-1]})"
+        if rnd.random() < 0.3:
+            row["skos:prefLabel @en"] = name
+        row["skos:broader"] = rnd.choice(types)
+        if rnd.random() < 0.8:
+            row["skos:broader occupation"] = rnd.choice(OCCUPATIONS)
+        if rnd.random() < 0.7:
+            birth = rnd.randint(100, 1950)
+            row["skos:scope"] = f"{birth}-{birth + rnd.randint(20, 90)}"
+        if row["skos:broader"] == "historical person":
+            row["skos:broader time"] = rnd.choice(periods)
+            if rnd.random() < 0.5:
+                row["skos:broader time02"] = rnd.choice(details)
+        if rnd.random() < 0.9:
+            row["skos:exactMatch"] = f"https://d-nb.info/gnd/{identifier(seed, number)}"
+        yield row
+
+
+def institution_rows(count, seed=0):
+    """
+    Yield `count` rows shaped like the OEAI institution export: labels
+    in several languages and a country, a city and sometimes a parent
+    institution (one of the earlier rows) per institution.
+    """
+    rnd = random.Random(seed)
+    labels = []
+    for number in range(count):
+        city = rnd.choice(CITIES)
+        label = f"{rnd.choice(INSTITUTION_TYPES)} {city} {number}"
+        row = dict.fromkeys(INSTITUTION_HEADERS, "")
+        row["skos:prefLabel @de"] = label
+        if rnd.random() < 0.5:
+            row["skos:altLabel @de"] = label.replace(city, f"in {city}")
+        for header in ["skos:prefLabel @en", "skos:prefLabel @fr"]:
+            if rnd.random() < 0.3:
+                row[header] = f"{label} ({header[-2:]})"
+        if rnd.random() < 0.1:
+            row["skos:prefLabel@Local Language"] = label.upper()
+        row["hierarchy"] = str(rnd.randint(1, 3))
+        row["Land"] = rnd.choice(COUNTRIES)
+        if labels and rnd.random() < 0.3:
+            row["skos:broader name1"] = rnd.choice(labels)
+            row["skos:broader name2"] = city
+        else:
+            row["skos:broader name1"] = row["skos:broader name2"] = city
+        if rnd.random() < 0.8:
+            row["Link-exact"] = (
+                f"https://www.wikidata.org/entity/Q{identifier(seed, number)}"
+            )
+        if rnd.random() < 0.2:
+            row["Link-related"] = (
+                f"https://d-nb.info/gnd/{identifier(seed, number, 5_000_000)}"
+            )
+        labels.append(label)
+        yield row
+
+
+GENERATORS = {
+    "persons": (PERSON_HEADERS, person_rows),
+    "institutions": (INSTITUTION_HEADERS, institution_rows),
+}
+
+
+def write_csv(path, kind, count, seed=0):
+    headers, rows = GENERATORS[kind]
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=headers)
+        writer.writeheader()
+        writer.writerows(rows(count, seed))
@@ -0,0 +1,100 @@
+from AcdhArcheAssets.uri_norm_rules import get_normalized_uri
+from apis_core.uris.models import Uri
+from django.contrib.contenttypes.models import ContentType
+from simple_history.utils import bulk_update_with_history
+
+
+class UpsertIndex:
+    """
+    Match rows to existing entities of `model` by an external uri and
+    update those entities in bulk.
+
+    The uris of all entities of the model are loaded once and mapped to
+    the primary keys. Matched rows are queued with `queue`, together with
+    the names of the fields the row sets; `flush` loads the queued
+    entities with one query, compares those fields and writes only the
+    entities that changed, with a single bulk update and their history
+    entries. Fields the row does not set, like curated notes or columns
+    missing from the file, are left as they are.
+    """
+
+    def __init__(self, model, batch_size=1000):
+        self.model = model
+        self.batch_size = batch_size
+        self.fields = [
+            f
+            for f in model._meta.local_concrete_fields
+            if not f.primary_key and not f.generated
+        ]
+        # the fields to compare by the names a row sets, see `compared`
+        self.compared_fields = {}
+        self.index = {}
+        self.pending = []
+        self.updated = 0
+        self.unchanged = 0
+
+    def load(self):
+        content_type = ContentType.objects.get_for_model(self.model)
+        uris = Uri.objects.filter(content_type=content_type)
+        self.index = dict(uris.values_list("uri", "object_id"))
+        return self
+
+    def get(self, uri):
+        return self.index.get(get_normalized_uri(uri))
+
+    def add(self, uri, obj):
+        self.index[get_normalized_uri(uri)] = obj.pk
+
+    def compared(self, names):
+        """
+        Return the fields named in `names` and the date fields derived
+        from them, in the order of the table.
+        """
+        names = frozenset(names)
+        if (fields := self.compared_fields.get(names)) is None:
+            fields = self.compared_fields[names] = [
+                f
+                for f in self.fields
+                if f.name in names or getattr(f, "parent_name", None) in names
+            ]
+        return fields
+
+    def queue(self, pk, obj, fields):
+        """Queue `obj` to update the entity `pk` with its `fields`"""
+        self.pending.append((pk, obj, self.compared(fields)))
+
+    def flush(self):
+        """
+        Update the queued entities that differ from the database.
+
+        Returns:
+            tuple: the number of updated and of unchanged entities.
+        """
+        pending, self.pending = self.pending, []
+        if not pending:
+            return 0, 0
+        existing = self.model.objects.in_bulk([pk for pk, _, _ in pending])
+        changed, names = {}, set()
+        for pk, obj, fields in pending:
+            if (current := existing.get(pk)) is None:
+                continue
+            current = changed.get(pk, current)
+            for field in fields:
+                # pre_save computes the fields derived from others, like
+                # fuzzy dates, to_python makes the values comparable
+                value = field.to_python(field.pre_save(obj, add=False))
+                if value != getattr(current, field.attname):
+                    setattr(current, field.attname, value)
+                    names.add(field.name)
+                    changed[pk] = current
+        if changed:
+            bulk_update_with_history(
+                list(changed.values()),
+                self.model,
+                sorted(names),
+                batch_size=self.batch_size,
+            )
+        updated, unchanged = len(changed), len(pending) - len(changed)
+        self.updated += updated
+        self.unchanged += unchanged
+        return updated, unchanged
@@ -0,0 +1,58 @@
+import contextlib
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django_interval.fields import GenericDateIntervalField
+
+validate_url = URLValidator()
+
+
+def validate_instance(obj):
+    """
+    Validate an unsaved instance without touching the database: the
+    field validation of Django (required fields, choices, lengths, the
+    schema of JSON fields) and the parsing of fuzzy date fields.
+    Relations are not validated, because that needs database queries.
+
+    Returns:
+        list: `(field, message)` tuples, empty if the instance is valid.
+    """
+    errors = []
+    relations = [f.name for f in obj._meta.concrete_fields if f.is_relation]
+    try:
+        obj.clean_fields(exclude=relations)
+    except ValidationError as e:
+        for field, messages in e.message_dict.items():
+            errors += [(field, message) for message in messages]
+    for field in obj._meta.concrete_fields:
+        if isinstance(field, GenericDateIntervalField):
+            if value := getattr(obj, field.attname):
+                errors += validate_date(field, value)
+    return errors
+
+
+def validate_date(field, value):
+    """
+    Validate the date string of a fuzzy date field. The default parser
+    does not raise: it returns no dates and prints why, which is kept
+    out of stdout, where a report may be written.
+    """
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            dates = field.calculate(value)
+    except Exception as e:
+        return [(field.name, f"Error parsing date string: {e}")]
+    if not any(dates):
+        return [(field.name, f"Could not parse date string: {value}")]
+    return []
+
+
+def validate_uris(field, uris):
+    errors = []
+    for uri in uris:
+        try:
+            validate_url(uri)
+        except ValidationError:
+            errors.append((field, f"Not a valid uri: {uri}"))
+    return errors
@@ -0,0 +1,175 @@
+import io
+import json
+import os
+import resource
+import shlex
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apis_ontology.imports.synthetic import write_csv
+
+COMMANDS = {
+    "persons": "import_persons",
+    "institutions": "import_institutions",
+}
+
+
+class QueryCounter:
+    """
+    Count the queries of this process; with `--workers` the queries of
+    the worker processes are not included.
+    """
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the throughput of the import commands with synthetic CSV files. "
+        "Every run imports into an empty test database that is created from the "
+        "configured one and destroyed afterwards; run it against PostgreSQL to get "
+        "numbers that compare to production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kinds",
+            nargs="+",
+            choices=list(COMMANDS),
+            default=list(COMMANDS),
+            help="Import commands to benchmark (default: all)",
+        )
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[1_000, 10_000, 100_000],
+            help="Numbers of rows (default: 1000 10000 100000)",
+        )
+        parser.add_argument(
+            "--import-options",
+            type=str,
+            default="",
+            help='Options passed to the import commands, e.g. "--chunk-size 500"',
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Append the results as JSON lines to this file",
+        )
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Import every file a second time with tracemalloc to measure "
+            "the peak of the Python allocations",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the test database instead of creating it",
+        )
+
+    def handle(self, *args, **options):
+        import_options = shlex.split(options["import_options"])
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                for kind in options["kinds"]:
+                    for size in options["sizes"]:
+                        result = self.run(
+                            tmp, kind, size, import_options, options["trace_memory"]
+                        )
+                        self.report(result, options.get("output"))
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+
+    def run(self, tmp, kind, size, import_options, trace_memory=False):
+        """
+        Import `size` synthetic rows of `kind` into an empty database.
+
+        The timed run does not trace allocations, tracemalloc slows the
+        import down several times; the maximum resident set size of the
+        process is reported instead, a high-water mark over all runs so
+        far. With `trace_memory` the file is imported again with
+        tracemalloc for the peak of this import alone.
+        """
+        csv_file = os.path.join(tmp, f"{kind}_{size}.csv")
+        write_csv(csv_file, kind, size)
+
+        call_command("flush", interactive=False, verbosity=0)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            self.import_file(kind, csv_file, import_options)
+        seconds = time.perf_counter() - started
+        result = {
+            "kind": kind,
+            "rows": size,
+            "options": " ".join(import_options),
+            "database": connection.vendor,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(size / seconds, 1),
+            "queries": counter.queries,
+            "queries_per_row": round(counter.queries / size, 2),
+            "max_rss_mb": round(max_rss() / 2**20, 1),
+        }
+        if trace_memory:
+            call_command("flush", interactive=False, verbosity=0)
+            tracemalloc.start()
+            try:
+                self.import_file(kind, csv_file, import_options)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            result["peak_memory_mb"] = round(peak / 2**20, 1)
+        return result
+
+    def import_file(self, kind, csv_file, import_options):
+        """Import `csv_file` with the import command of `kind`"""
+        call_command(
+            COMMANDS[kind],
+            csv_file,
+            *import_options,
+            log_file=os.path.splitext(csv_file)[0] + ".log",
+            stdout=io.StringIO(),
+            stderr=io.StringIO(),
+        )
+
+    def report(self, result, output):
+        self.stdout.write(
+            f"{result['kind']:<12} {result['rows']:>8} rows: "
+            f"{result['rows_per_second']:>9.1f} rows/s, "
+            f"{result['queries_per_row']:>6.2f} queries/row, "
+            f"max RSS {result['max_rss_mb']:.1f} MB"
+            + (
+                f", peak {result['peak_memory_mb']:.1f} MB traced"
+                if "peak_memory_mb" in result
+                else ""
+            )
+        )
+        if output:
+            with open(output, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(result) + "\n")
+
+
+def max_rss():
+    """The maximum resident set size of this process in bytes"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return rss if sys.platform == "darwin" else rss * 1024
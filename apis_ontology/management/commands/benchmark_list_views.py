@@ -0,0 +1,187 @@
+import json
+import statistics
+import time
+
+from apis_core.uris.models import Uri
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min, OuterRef
+
+from apis_ontology.imports.bulk import bulk_create_entities, bulk_create_uris
+from apis_ontology.models import Person, Profession
+from apis_ontology.querysets import INTERNAL_URIS, OeaiBaseEntityListViewQueryset
+
+
+def legacy_queryset(queryset):
+    """The uri annotation of the list views before it was content type aware"""
+    uris = (
+        Uri.objects.filter(object_id=OuterRef("pk"))
+        .exclude(uri__contains="vocabs-oeai")
+        .values_list("uri", flat=True)
+    )
+    return queryset.annotate(uris=ArraySubquery(uris))
+
+
+def subquery_queryset(queryset):
+    """The content type aware subquery the `ExternalUris` cache replaces"""
+    uris = (
+        Uri.objects.filter(
+            content_type=ContentType.objects.get_for_model(queryset.model),
+            object_id=OuterRef("pk"),
+        )
+        .exclude(INTERNAL_URIS)
+        .values_list("uri", flat=True)
+    )
+    return queryset.annotate(uris=ArraySubquery(uris))
+
+
+VARIANTS = {
+    "legacy": legacy_queryset,
+    "subquery": subquery_queryset,
+    "current": OeaiBaseEntityListViewQueryset,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the latency of the uri annotation of the entity list views with "
+        "a large Uri table. Runs in an empty test database that is created from "
+        "the configured one and destroyed afterwards (PostgreSQL only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entities",
+            type=int,
+            default=100_000,
+            help="Number of persons, each with a default and an external uri "
+            "(default: 100000)",
+        )
+        parser.add_argument(
+            "--uris",
+            type=int,
+            default=1_000_000,
+            help="Total number of Uri rows; the ones the persons do not use "
+            "belong to professions with the same primary keys (default: 1000000)",
+        )
+        parser.add_argument(
+            "--page-size", type=int, default=50, help="Rows per page (default: 50)"
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of timed requests per page (default: 20)",
+        )
+        parser.add_argument(
+            "--variants",
+            nargs="+",
+            choices=VARIANTS,
+            default=list(VARIANTS),
+            help="The annotations to measure (default: all). The deep pages of "
+            "the legacy one take hours with a million uris.",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Append the results as JSON lines to this file",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the test database instead of creating it",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The list views need PostgreSQL")
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            call_command("flush", interactive=False, verbosity=0)
+            self.populate(options["entities"], options["uris"])
+            for variant in options["variants"]:
+                queryset = VARIANTS[variant]
+                for page in ["first", "middle", "last"]:
+                    result = self.run(variant, queryset, page, options)
+                    self.report(result, options.get("output"))
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+
+    def populate(self, entities, total):
+        """
+        Create the persons with their uris, then fill the Uri table up to
+        `total` rows with uris of professions that share the primary keys
+        of the persons.
+        """
+        self.stdout.write(f"Creating {entities} persons and {total} uris...")
+        for start in range(0, entities, 10_000):
+            persons = bulk_create_entities(
+                Person,
+                [
+                    Person(label=f"Person {i}")
+                    for i in range(start, min(start + 10_000, entities))
+                ],
+            )
+            bulk_create_uris(
+                [(p, f"https://www.wikidata.org/entity/Q{p.pk}") for p in persons]
+            )
+        filler = total - Uri.objects.count()
+        if filler > 0:
+            pks = Person.objects.aggregate(first=Min("pk"), last=Max("pk"))
+            first, last = pks["first"], pks["last"]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO "{Uri._meta.db_table}" (uri, content_type_id, object_id) '
+                    "SELECT 'https://example.org/profession/' || g, %s, %s + g %% %s "
+                    "FROM generate_series(1, %s) g",
+                    [
+                        ContentType.objects.get_for_model(Profession).pk,
+                        first,
+                        last - first + 1,
+                        filler,
+                    ],
+                )
+                cursor.execute(f'ANALYZE "{Uri._meta.db_table}"')
+
+    def run(self, variant, queryset, page, options):
+        """Time the evaluation of one page of the person list"""
+        size = options["page_size"]
+        count = Person.objects.count()
+        offset = {"first": 0, "middle": count // 2, "last": max(count - size, 0)}[page]
+        rows = queryset(Person.objects.order_by("pk"))[offset : offset + size]
+        list(rows)  # warm up the caches
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            result = list(rows.all())
+            timings.append(time.perf_counter() - started)
+        return {
+            "variant": variant,
+            "page": page,
+            "entities": count,
+            "uris": Uri.objects.count(),
+            "page_size": size,
+            "uris_per_row": round(
+                sum(len(p.uris or []) for p in result) / len(result), 2
+            ),
+            "median_ms": round(statistics.median(timings) * 1000, 2),
+            "max_ms": round(max(timings) * 1000, 2),
+        }
+
+    def report(self, result, output):
+        self.stdout.write(
+            f"{result['variant']:<9} {result['page']:<6} page: "
+            f"median {result['median_ms']:>8.2f} ms, max {result['max_ms']:>8.2f} ms, "
+            f"{result['uris_per_row']:.2f} uris/row"
+        )
+        if output:
+            with open(output, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(result) + "\n")
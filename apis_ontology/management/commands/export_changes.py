@@ -0,0 +1,163 @@
+import contextlib
+import datetime
+import itertools
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apis_ontology.exports.changes import (
+    ENTITIES,
+    RELATIONS,
+    Cursor,
+    changes,
+    settled_until,
+)
+from apis_ontology.exports.rdf import SparqlUpdateWriter
+from apis_ontology.exports.skos import SkosExport, uri_template
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the entities and relations that were created, changed or deleted "
+        "since a point in time, read from their history tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=str,
+            help="Export the changes after this ISO 8601 timestamp",
+        )
+        parser.add_argument(
+            "--cursor",
+            type=str,
+            help="Path of a JSON file that records the end of the exported window; "
+            "without --since the export continues where the last one ended",
+        )
+        parser.add_argument(
+            "--lag",
+            type=float,
+            default=10.0,
+            help="End the window this many seconds before now, so that changes "
+            "that are being committed are left to the next export; open "
+            "transactions hold it back as well on PostgreSQL (default: 10)",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "sparql"],
+            default="jsonl",
+            help="jsonl writes one JSON object per changed object, deletions as "
+            "tombstones; sparql writes a SPARQL Update that replaces the SKOS "
+            "concepts of the changed entities (default: jsonl)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default="-",
+            help="Path of the file to write, - for stdout (default: -)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of concepts fetched and written at a time (default: 2000)",
+        )
+
+    def handle(self, *args, **options):
+        cursor = Cursor(options["cursor"]) if options.get("cursor") else None
+        if options.get("since"):
+            try:
+                since = datetime.datetime.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError(f"Invalid timestamp: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        else:
+            since = cursor.load() if cursor else None
+            if since is None:
+                raise CommandError("Pass --since or the --cursor of an earlier export")
+        # entries that may not be committed yet belong to the next window
+        until = max(settled_until(datetime.timedelta(seconds=options["lag"])), since)
+
+        output = options["output"]
+        with (
+            open(output, "w", encoding="utf-8")
+            if output != "-"
+            else contextlib.nullcontext(self.stdout._out)
+        ) as out:
+            if options["format"] == "sparql":
+                counts = self.write_sparql(out, since, until, options["chunk_size"])
+            else:
+                counts = self.write_jsonl(out, since, until)
+
+        if cursor:
+            cursor.save(until)
+        # keep stdout clean when the export is written there
+        log = self.stdout if output != "-" else self.stderr
+        log.write(
+            self.style.SUCCESS(
+                f"Exported the changes from {since.isoformat()} to "
+                f"{until.isoformat()}: "
+                + ", ".join(f"{count} {action}" for action, count in counts.items())
+            )
+        )
+
+    def write_jsonl(self, out, since, until):
+        counts = {"created": 0, "updated": 0, "deleted": 0}
+        for model in [*ENTITIES.values(), *RELATIONS]:
+            template = uri_template(model) if model in ENTITIES.values() else None
+            for change in changes(model, since, until):
+                record = {
+                    "model": model._meta.label_lower,
+                    "id": change.pk,
+                    "action": change.action,
+                    "history_date": change.entry.history_date.isoformat(),
+                }
+                if template:
+                    record["uri"] = template.format(pk=change.pk)
+                if not change.deleted:
+                    record["data"] = change.data()
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                counts[change.action] += 1
+        return counts
+
+    def write_sparql(self, out, since, until, chunk_size):
+        """
+        Delete the concepts of deleted entities and replace those of the
+        entities that changed. A changed relation changes the hierarchy
+        of both its ends, so they are replaced as well.
+        """
+        writer = SparqlUpdateWriter(out)
+        export = SkosExport(writer, chunk_size=chunk_size)
+        writer.start()
+        names = {model: name for name, model in ENTITIES.items()}
+        affected = {name: set() for name in ENTITIES}
+        counts = {"created": 0, "updated": 0, "deleted": 0}
+
+        for relation in RELATIONS:
+            for change in changes(relation, since, until):
+                data = change.data()
+                for model, key in [
+                    (relation.subj_model, "subj_object_id"),
+                    (relation.obj_model, "obj_object_id"),
+                ]:
+                    if model in names and data[key] is not None:
+                        affected[names[model]].add(data[key])
+                counts[change.action] += 1
+
+        for name, model in ENTITIES.items():
+            template = export.template(model)
+            for change in changes(model, since, until):
+                if change.deleted:
+                    writer.delete(template.format(pk=change.pk))
+                else:
+                    affected[name].add(change.pk)
+                counts[change.action] += 1
+
+        for name, pks in affected.items():
+            model = ENTITIES[name]
+            # entities that no longer exist are simply not found
+            for chunk in itertools.batched(sorted(pks), chunk_size):
+                export.write_concepts(name, model.objects.filter(pk__in=chunk))
+        return counts
@@ -0,0 +1,61 @@
+import contextlib
+import time
+
+from django.core.management.base import BaseCommand
+
+from apis_ontology.exports.rdf import WRITERS
+from apis_ontology.exports.skos import VOCABULARIES, SkosExport
+
+
+class Command(BaseCommand):
+    help = "Export the OEAI vocabularies as SKOS concept schemes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "vocabularies",
+            nargs="*",
+            choices=list(VOCABULARIES),
+            help="Vocabularies to export (default: all)",
+        )
+        parser.add_argument(
+            "--format",
+            choices=list(WRITERS),
+            default="turtle",
+            help="RDF serialization (default: turtle)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default="-",
+            help="Path of the file to write, - for stdout (default: -)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of concepts fetched and written at a time (default: 2000)",
+        )
+
+    def handle(self, *args, **options):
+        vocabularies = options["vocabularies"] or list(VOCABULARIES)
+        output = options["output"]
+        started = time.monotonic()
+        with (
+            open(output, "w", encoding="utf-8")
+            if output != "-"
+            else contextlib.nullcontext(self.stdout._out)
+        ) as out:
+            writer = WRITERS[options["format"]](out)
+            export = SkosExport(writer, chunk_size=options["chunk_size"])
+            writer.start()
+            for name in vocabularies:
+                export.export(name)
+
+        # keep stdout clean when the export is written there
+        log = self.stdout if output != "-" else self.stderr
+        log.write(
+            self.style.SUCCESS(
+                f"Exported {export.concepts} concepts of {', '.join(vocabularies)} "
+                f"as {writer.triples} triples in {time.monotonic() - started:.1f} s"
+            )
+        )
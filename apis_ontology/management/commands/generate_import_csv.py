@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apis_ontology.imports.synthetic import GENERATORS, write_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a synthetic CSV file shaped like the OEAI person or institution export"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=list(GENERATORS), help="Kind of rows")
+        parser.add_argument("rows", type=int, help="Number of rows")
+        parser.add_argument("csv_file", type=str, help="Path of the CSV file to write")
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the random generator, files with different seeds "
+            "do not share external uris (default: 0)",
+        )
+
+    def handle(self, *args, **options):
+        write_csv(
+            options["csv_file"], options["kind"], options["rows"], options["seed"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['rows']} {options['kind']} to {options['csv_file']}"
+            )
+        )
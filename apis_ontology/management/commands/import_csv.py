@@ -1,15 +1,51 @@
-import csv
 import os
 import logging
+import contextlib
 import datetime
+import glob
+import itertools
+import json
+import multiprocessing
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from apis_ontology.dates import cached_dateparser, date_cache_stats
+from apis_ontology.imports import parallel
+from apis_ontology.imports.cache import LookupCache
+from apis_ontology.imports.checkpoint import Checkpoint
+from apis_ontology.imports.columnar import BatchMapping, ParquetStream, sequence
+from apis_ontology.imports.history import DeferredHistory
+from apis_ontology.imports.logs import JsonFormatter, error_class
+from apis_ontology.imports.profiling import QueryProfiler
+from apis_ontology.imports.relations import RelationBuffer
+from apis_ontology.imports.reader import CsvStream
+from apis_ontology.imports.upsert import UpsertIndex
+from apis_ontology.uricache import deferred_refresh, refresh_deferred
 
 
 class Command(BaseCommand):
     help = "Import data from a CSV file"
+    # whether `copy_batch` maps whole batches of columnar files for --copy
+    vectorized = False
 
     def add_arguments(self, parser):
-        parser.add_argument("csv_file", type=str, help="Path to the CSV file to import")
+        parser.add_argument(
+            "csv_files",
+            nargs="+",
+            type=str,
+            help="Paths of the CSV files to import; directories are expanded to "
+            "the files matching --pattern",
+        )
+        parser.add_argument(
+            "--pattern",
+            type=str,
+            help='Glob pattern of the files to import from a directory, "**" '
+            'matches subdirectories (default: "*.csv", "*.parquet" with --format '
+            "parquet)",
+        )
         parser.add_argument(
             "--delimiter", type=str, default=",", help='CSV delimiter (default: ",")'
         )
@@ -19,24 +55,126 @@ class Command(BaseCommand):
             default="utf-8",
             help="File encoding (default: utf-8)",
         )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "parquet"],
+            help="Format of the input files, Parquet needs pyarrow (default: "
+            "parquet for .parquet files, csv otherwise)",
+        )
         parser.add_argument(
             "--log-file",
             type=str,
             help="Path to the log file (default: import_<timestamp>.log in the same directory as the CSV)",
         )
+        parser.add_argument(
+            "--cache-size",
+            type=int,
+            default=100_000,
+            help="Maximum number of entries per lookup cache, 0 disables the cache (default: 100000)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=0,
+            help="Commit every N rows and wrap each row in a savepoint (default: 0, autocommit every row)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Import shards of the file in N processes (default: 1)",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Load all rows with COPY into a staging table and move them "
+            "with set-based SQL in one transaction (PostgreSQL only); the rows "
+            "of Parquet files are mapped in whole batches where the command "
+            "supports it, the others one by one",
+        )
+        parser.add_argument(
+            "--validate-only",
+            action="store_true",
+            help="Only validate the rows, without accessing the database",
+        )
+        parser.add_argument(
+            "--report",
+            type=str,
+            help="Path of the JSON lines error report of --validate-only, - for stdout "
+            "(default: validate_<timestamp>.jsonl in the same directory as the CSV)",
+        )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Update the entities that already have the external uri of a row, "
+            "instead of creating new ones; only the fields of the mapped columns "
+            "are updated, unchanged entities are not written and rows without an "
+            "external uri are reported as errors",
+        )
+        parser.add_argument(
+            "--defer-history",
+            action="store_true",
+            help="Collect the history entries of a chunk and write them with one "
+            "insert per model when the chunk is committed (needs --chunk-size)",
+        )
+        parser.add_argument(
+            "--profile-queries",
+            type=int,
+            nargs="?",
+            const=20,
+            default=0,
+            metavar="N",
+            help="Record the queries and the database time per row and per call "
+            "site and report the top N hot spots (default N: 20)",
+        )
+        parser.add_argument(
+            "--log-format",
+            choices=["text", "json"],
+            default="text",
+            help="Format of the log file, json writes one JSON object per line "
+            "(default: text)",
+        )
+        parser.add_argument(
+            "--progress-interval",
+            type=float,
+            default=5.0,
+            help="Report the progress at most every N seconds (default: 5)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=str,
+            help="Record the last committed row in this checkpoint file, so that an "
+            "interrupted import can be resumed; only with a single file",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted import after the last committed row, and "
+            "keep recording it (default checkpoint file: <csv file>.checkpoint.json "
+            "in the same directory as the CSV)",
+        )
+        parser.add_argument(
+            "--checkpoint-interval",
+            type=float,
+            default=5.0,
+            help="Write the checkpoint at most every N seconds (default: 5)",
+        )
 
     def handle(self, *args, **options):
-        csv_file_path = options["csv_file"]
-        delimiter = options["delimiter"]
-        encoding = options["encoding"]
+        self.setup(options)
 
-        # Setup logging
+        # Setup logging, named after the first input of the run
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        first_path = os.path.normpath(options["csv_files"][0])
+        csv_dir = (
+            first_path
+            if os.path.isdir(first_path)
+            else os.path.dirname(os.path.abspath(first_path))
+        )
+        csv_filename = os.path.basename(os.path.abspath(first_path))
         log_file = options.get("log_file")
         if not log_file:
             # Default log file in the same directory as the CSV
-            csv_dir = os.path.dirname(os.path.abspath(csv_file_path))
-            csv_filename = os.path.basename(csv_file_path)
             log_file = os.path.join(
                 csv_dir, f"import_{os.path.splitext(csv_filename)[0]}_{timestamp}.log"
             )
@@ -50,78 +188,856 @@ class Command(BaseCommand):
         file_handler.setLevel(logging.INFO)
 
         # Formatter
-        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        if options.get("log_format") == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
         file_handler.setFormatter(formatter)
 
         # Add handler to logger
         self.logger.addHandler(file_handler)
 
-        self.logger.info(f"Starting import of {csv_file_path}")
+        self.logger.info(
+            f"Starting import of {', '.join(options['csv_files'])}",
+            extra={"event": "start", "file": options["csv_files"]},
+        )
         self.stdout.write(f"Logging to {log_file}")
 
-        if not os.path.exists(csv_file_path):
-            error_msg = f"File does not exist: {csv_file_path}"
+        try:
+            pattern = options.get("pattern") or (
+                "*.parquet" if options.get("format") == "parquet" else "*.csv"
+            )
+            self.csv_files = self.input_files(options["csv_files"], pattern)
+            if self.history and not self.chunk_size:
+                raise CommandError("--defer-history needs --chunk-size")
+            if options.get("checkpoint") and len(self.csv_files) > 1:
+                raise CommandError("--checkpoint can only be used with a single file")
+
+            if options.get("validate_only"):
+                report = options.get("report") or os.path.join(
+                    csv_dir,
+                    f"validate_{os.path.splitext(csv_filename)[0]}_{timestamp}.jsonl",
+                )
+                return self.validate(report, options)
+
+            with (
+                connection.execute_wrapper(self.profiler)
+                if self.profiler
+                else contextlib.nullcontext()
+            ):
+                for csv_file in self.csv_files:
+                    self.import_file(csv_file, options)
+
+            success = self.processed - self.errors
+            summary_msg = f"Import completed. Processed: {self.processed}, Success: {success}, Errors: {self.errors}"
+            if len(self.csv_files) > 1:
+                summary_msg += f", Files: {len(self.csv_files)}"
+            self.stdout.write(self.style.SUCCESS(summary_msg))
+            self.logger.info(
+                summary_msg,
+                extra={
+                    "event": "summary",
+                    "processed": self.processed,
+                    "errors": self.errors,
+                    "files": len(self.csv_files),
+                    "seconds": round(time.monotonic() - self.started, 3),
+                },
+            )
+            for msg in self.statistics():
+                self.stdout.write(msg)
+                self.logger.info(msg)
+            # the checkpoints of completed files are kept until the whole
+            # run is done, so that --resume skips them
+            for checkpoint in self.checkpoints:
+                checkpoint.clear()
+
+        except CommandError as e:
+            self.logger.error(str(e))
+            raise
+        except Exception as e:
+            error_msg = f"Error reading CSV file: {str(e)}"
             self.logger.error(error_msg)
+            self.logger.error(f"Traceback: {traceback.format_exc()}")
             raise CommandError(error_msg)
+        finally:
+            # an interrupted import keeps the position of its last commit
+            for checkpoint in self.checkpoints:
+                checkpoint.flush()
+            if self.executor:
+                self.executor.shutdown()
+            if self.history:
+                self.history.disconnect()
+            # Close all handlers to ensure log file is properly saved
+            for handler in self.logger.handlers:
+                handler.close()
+                self.logger.removeHandler(handler)
 
-        try:
-            with open(csv_file_path, "r", encoding=encoding) as csv_file:
-                reader = csv.DictReader(csv_file, delimiter=delimiter)
+    def input_files(self, paths, pattern):
+        """
+        Return the files to import: files are taken as they are,
+        directories are expanded to the files matching `pattern`, sorted
+        by name.
+        """
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                matches = glob.glob(os.path.join(path, pattern), recursive=True)
+                files += sorted(f for f in matches if os.path.isfile(f))
+            elif os.path.exists(path):
+                files.append(path)
+            else:
+                raise CommandError(f"File does not exist: {path}")
+        if not files:
+            raise CommandError(f"No files matching {pattern} found")
+        return files
 
-                # Get total number of rows for progress reporting
-                total_rows = (
-                    sum(1 for _ in open(csv_file_path, "r", encoding=encoding)) - 1
+    def open_reader(self, path, options, start=0):
+        """
+        Return the stream of row dicts of an input file. Parquet files are
+        read in batches of `--chunk-size` rows; their checkpoints count
+        rows instead of bytes.
+        """
+        file_format = options.get("format") or (
+            "parquet" if path.endswith(".parquet") else "csv"
+        )
+        if file_format == "parquet":
+            try:
+                return ParquetStream(
+                    path, batch_size=self.chunk_size or 10_000, start=start
                 )
+            except ImportError:
+                raise CommandError("Reading Parquet files needs pyarrow")
+        # The file is streamed once, progress is derived from the byte offset
+        return CsvStream(
+            path,
+            encoding=options["encoding"],
+            delimiter=options["delimiter"],
+            start=start,
+        )
+
+    def import_file(self, csv_file, options):
+        """
+        Import one file of the run. The lookup caches, the database
+        connection, the worker processes and the statistics are shared by
+        all files; the column mappings and the checkpoint are per file.
+        """
+        self.csv_file = csv_file
+        self.mappings = {}
+        processed, errors = self.processed, self.errors
+        if len(self.csv_files) > 1:
+            msg = f"Importing {csv_file}"
+            self.stdout.write(msg)
+            self.logger.info(msg, extra={"event": "file", "file": csv_file})
 
-                # Reset file pointer
-                csv_file.seek(0)
-                next(reader)  # Skip header row
+        start, first_row = 0, 1
+        if options.get("checkpoint") or options.get("resume"):
+            self.checkpoint = Checkpoint(
+                options.get("checkpoint") or f"{csv_file}.checkpoint.json",
+                csv_file,
+                interval=options.get("checkpoint_interval", 5.0),
+            )
+            self.checkpoints.append(self.checkpoint)
+            start, first_row = self.resume_position(options.get("resume"))
+
+        self.reader = self.open_reader(csv_file, options, start)
 
-                processed = 0
-                success = 0
-                errors = 0
+        rows = enumerate(self.reader, start=first_row)
+        if options.get("copy"):
+            if self.upsert:
+                raise CommandError("--upsert is not supported with --copy")
+            self.import_copy(rows)
+        elif self.workers > 1:
+            self.import_parallel(rows, options)
+        else:
+            # the cached uris of the rows are refreshed in batches
+            with deferred_refresh():
+                while chunk := list(itertools.islice(rows, self.chunk_size or 1)):
+                    self.import_chunk(chunk)
+                    refresh_deferred()
+                    self.save_checkpoint(chunk[-1][0])
+                # Write whatever the subclass still holds back
+                self.flush()
+        if self.history:
+            self.history.flush()
+        # mark the file as done, every row read from it was handled
+        self.save_checkpoint(first_row - 1 + self.processed - processed)
+        if self.checkpoint:
+            self.checkpoint.flush()
 
-                for row in reader:
-                    processed += 1
+        if len(self.csv_files) > 1:
+            processed = self.processed - processed
+            errors = self.errors - errors
+            msg = f"Completed {csv_file}. Processed: {processed}, Success: {processed - errors}, Errors: {errors}"
+            self.stdout.write(msg)
+            self.logger.info(
+                msg,
+                extra={
+                    "event": "file_summary",
+                    "file": csv_file,
+                    "processed": processed,
+                    "errors": errors,
+                },
+            )
 
-                    # Show progress
-                    if processed % 100 == 0 or processed == total_rows:
-                        progress_msg = f"Processing row {processed}/{total_rows}..."
-                        self.stdout.write(progress_msg)
-                        self.logger.info(progress_msg)
+    def setup(self, options):
+        """
+        Initialize the state of an import run. This is also called in
+        every worker process of a parallel import.
+        """
+        self.cache_size = options.get("cache_size", 100_000)
+        self.caches = {}
+        self.chunk_size = options.get("chunk_size", 0)
+        self.workers = options.get("workers", 1)
+        self.verbosity = options.get("verbosity", 1)
+        self.progress_interval = options.get("progress_interval", 5.0)
+        self.started = time.monotonic()
+        self.progress_at = self.started
+        self.processed = 0
+        self.errors = 0
+        # error class: [number of errors, first row]
+        self.error_classes = {}
+        self.commits = 0
+        self.commit_time = 0.0
+        self.commit_time_max = 0.0
+        # lookup cache and upsert statistics reported by worker processes
+        self.worker_caches = {}
+        self.worker_upserts = {}
+        self.worker_history = [0, 0]
+        self.worker_relations = [0, 0]
+        self.worker_dates = [0, 0]
+        # the date parser cache outlives the run, its statistics are counted from here
+        self.dates_since = cached_dateparser.cache_info()
+        self.checkpoint = None
+        self.checkpoints = []
+        self.csv_files = []
+        self.csv_file = None
+        # the worker processes live as long as the run, see `import_parallel`
+        self.executor = None
+        # compiled column mappings, see `compile_mapping`
+        self.mappings = {}
+        self.upsert = options.get("upsert", False)
+        self.upserts = {}
+        self.profile_top = options.get("profile_queries") or 0
+        self.profiler = QueryProfiler() if self.profile_top else None
+        # relations are inserted in bulk when a chunk is committed
+        self.relations = RelationBuffer() if self.chunk_size else None
+        self.history = None
+        if options.get("defer_history"):
+            self.history = DeferredHistory()
+            self.history.connect()
 
+    def resume_position(self, resume):
+        """
+        Return the byte offset and the number of the row the import
+        starts at. An existing checkpoint means that an earlier import of
+        the file was interrupted; starting over would import its rows a
+        second time, so that needs `--resume` or deleting the checkpoint.
+        """
+        try:
+            found = self.checkpoint.load()
+        except ValueError as e:
+            raise CommandError(f"{e}, delete it to start over")
+        if found and not resume:
+            raise CommandError(
+                f"Found checkpoint {self.checkpoint.path} of an interrupted import, "
+                "use --resume to continue or delete it to start over"
+            )
+        if not found:
+            if resume:
+                msg = "No checkpoint found, starting at the first row"
+                self.stdout.write(msg)
+                self.logger.warning(msg)
+            return 0, 1
+        msg = (
+            f"Resuming after row {self.checkpoint.row} (byte {self.checkpoint.offset})"
+        )
+        self.stdout.write(msg)
+        self.logger.info(msg)
+        return self.checkpoint.offset, self.checkpoint.row + 1
+
+    def save_checkpoint(self, number, offset=None):
+        """
+        Record that all rows up to `number` are committed. This is skipped
+        while the subclass still holds back rows that are not written yet.
+        """
+        if self.checkpoint and not self.deferred():
+            self.checkpoint.save(
+                number, self.reader.offset if offset is None else offset
+            )
+
+    def import_parallel(self, rows, options):
+        """
+        Hand shards of rows to a pool of worker processes. Entities that
+        rows share (like places) are resolved here, in the order of the
+        file, before a shard is handed out; workers therefore find them
+        instead of creating them concurrently.
+
+        Shards finish out of order, the checkpoint only advances over the
+        shards whose predecessors are all done. The pool is started with
+        the first file and reused for the following ones.
+        """
+        shard_size = self.chunk_size or 100
+        worker_options = {
+            key: value
+            for key, value in options.items()
+            if key not in ["stdout", "stderr"]
+        }
+        if self.executor is None:
+            # Spawned workers start without the database connection of the
+            # main process. Forked ones would inherit its socket, and
+            # closing it in the worker ends the session of the main
+            # process, which keeps using it for `prepare_row`.
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=parallel.init_worker,
+                initargs=(
+                    f"{type(self).__module__}.{type(self).__qualname__}",
+                    worker_options,
+                    connections["default"].settings_dict["NAME"],
+                ),
+            )
+        running = set()
+        # submitted shards as (future, last row, byte offset after it)
+        submitted = deque()
+
+        def collect(done):
+            for future in done:
+                self.merge_result(future.result())
+            while submitted and submitted[0][0] not in running:
+                future, number, offset = submitted.popleft()
+                self.save_checkpoint(number, offset)
+
+        while shard := list(itertools.islice(rows, shard_size)):
+            prepared = []
+            for number, row in shard:
+                try:
+                    self.prepare_row(row)
+                except Exception as e:
+                    # the row is reported here and not handed to a worker
+                    self.processed += 1
+                    self.report_error(number, row, e)
+                else:
+                    prepared.append((number, row))
+            self.commit_caches()
+            if self.history:
+                self.history.flush()
+            future = self.executor.submit(
+                parallel.import_shard, prepared, self.csv_file, self.csv_files
+            )
+            running.add(future)
+            submitted.append((future, shard[-1][0], self.reader.offset))
+            # limit the number of shards held in memory
+            if len(running) >= 2 * self.workers:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                collect(done)
+        done, running = wait(running)
+        collect(done)
+
+    def validate(self, report, options):
+        """
+        Validate all rows of all files with `validate_row` and write every
+        error as a JSON object to the `report` file. Nothing is written to
+        the database; the command fails if any row is invalid.
+        """
+        with (
+            open(report, "w", encoding="utf-8")
+            if report != "-"
+            else contextlib.nullcontext(self.stdout)
+        ) as out:
+            for csv_file in self.csv_files:
+                self.csv_file = csv_file
+                self.mappings = {}
+                self.reader = self.open_reader(csv_file, options)
+                for number, row in enumerate(self.reader, start=1):
+                    self.processed += 1
                     try:
-                        # Call the import_row function with the current row
-                        self.import_row(row)
-                        success += 1
+                        errors = self.validate_row(row)
                     except Exception as e:
-                        errors += 1
-                        error_msg = f"Error processing row {processed}: {str(e)}"
-                        self.stderr.write(self.style.ERROR(error_msg))
+                        errors = [(None, str(e))]
+                    if errors:
+                        self.errors += 1
+                    for field, message in errors:
+                        entry = {"row": number, "field": field, "message": message}
+                        if len(self.csv_files) > 1:
+                            entry["file"] = csv_file
+                        out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        summary_msg = f"Validation completed. Processed: {self.processed}, Valid: {self.processed - self.errors}, Invalid: {self.errors}"
+        if report != "-":
+            summary_msg += f", report: {report}"
+        self.logger.info(summary_msg)
+        if self.errors:
+            raise CommandError(summary_msg)
+        self.stdout.write(self.style.SUCCESS(summary_msg))
+
+    def validate_row(self, row):
+        """
+        Check a row without touching the database and return a list of
+        `(field, message)` tuples. Override this method in a subclass
+        to support `--validate-only`.
+        """
+        raise CommandError(f"{self.__module__} does not support --validate-only")
 
-                        # Log detailed error information
-                        self.logger.error(error_msg)
-                        self.logger.error(f"Row data: {row}")
+    def import_copy(self, rows):
+        """
+        Stream all rows into a staging table with `COPY FROM STDIN` and
+        let the subclass move them into the entity tables with set-based
+        SQL. Mapping errors are reported per row, errors of the set-based
+        part abort the whole import.
+        """
+        if connection.vendor != "postgresql":
+            raise CommandError("--copy is only supported with PostgreSQL")
+        loader = self.copy_loader()
+
+        def lines():
+            for number, row in rows:
+                self.processed += 1
+                self.report_progress(number, "Copying")
+                try:
+                    obj, extra = self.copy_row(row)
+                    yield loader.line(obj, {"_row": number, **extra})
+                except Exception as e:
+                    self.report_error(number, row, e)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if self.vectorized and isinstance(self.reader, ParquetStream):
+                loader.copy_batches(cursor, self.copy_batches(loader))
+            else:
+                loader.copy(cursor, lines())
+            for number, uri in loader.duplicate_uris(cursor):
+                self.report_error(number, {"uri": uri}, ValueError("Uri exists"))
+            self.load_copy(cursor, loader)
+            if self.history:
+                self.history.flush()
+
+    def copy_batches(self, loader):
+        """
+        Yield the record batches of the staging table for a columnar
+        file: every batch is mapped with `copy_batch` as a whole, only the
+        rows that fail are turned into dicts, for reporting them.
+        """
+        import pyarrow
+        import pyarrow.compute
+
+        for batch in self.reader.batches():
+            first = self.reader.offset + 1
+            self.reader.offset += batch.num_rows
+            self.processed += batch.num_rows
+            self.report_progress(self.reader.offset, "Copying")
+            values, extra, errors = self.copy_batch(batch)
+            extra["_row"] = sequence(first, batch.num_rows)
+            staged, failed = loader.batch(values, extra)
+            errors = failed | errors
+            if errors:
+                for i in sorted(errors):
+                    row = batch.slice(i, 1).to_pylist()[0]
+                    self.report_error(first + i, row, errors[i])
+                failed = pyarrow.compute.is_in(
+                    sequence(0, batch.num_rows),
+                    value_set=pyarrow.array(list(errors), pyarrow.int64()),
+                )
+                staged = staged.filter(pyarrow.compute.invert(failed))
+            yield staged
+
+    def copy_batch(self, batch):
+        """
+        Map a record batch of a columnar file to Arrow arrays, the
+        counterpart of `copy_row` for subclasses that set `vectorized`.
+
+        Returns:
+            tuple: a dict of arrays of field values by field name, a dict
+                   of arrays for the extra columns of the staging table
+                   and a dict of the indices of failed rows and their
+                   errors.
+        """
+        raise NotImplementedError
+
+    def batch_mapping(self, mapping, batch):
+        """Return the `BatchMapping` of `mapping` for the columns of the file"""
+        key = (mapping, BatchMapping)
+        if (compiled := self.mappings.get(key)) is None:
+            compiled = self.mappings[key] = BatchMapping(mapping, batch.schema.names)
+        return compiled
+
+    def copy_loader(self):
+        """
+        Return the `CopyLoader` used by `--copy`. Override this method,
+        `copy_row` and `load_copy` in a subclass to support `--copy`.
+        """
+        raise CommandError(f"{self.__module__} does not support --copy")
+
+    def copy_row(self, row):
+        """
+        Map a row to an unsaved instance and a dict of values for the
+        extra columns of the staging table.
+        """
+        raise NotImplementedError
+
+    def load_copy(self, cursor, loader):
+        """Move the staged rows into the entity tables"""
+        loader.allocate(cursor)
+        loader.insert(cursor)
+
+    def merge_result(self, result):
+        self.processed += result["processed"]
+        self.errors += result["errors"]
+        self.stdout.write(result["stdout"], ending="")
+        self.stderr.write(result["stderr"], ending="")
+        for level, msg, extra in result["records"]:
+            self.logger.log(level, msg, extra=extra)
+        commits, commit_time, commit_time_max = result["commits"]
+        self.commits += commits
+        self.commit_time += commit_time
+        self.commit_time_max = max(self.commit_time_max, commit_time_max)
+        for name, (updated, unchanged) in result["upserts"].items():
+            totals = self.worker_upserts.setdefault(name, [0, 0])
+            totals[0] += updated
+            totals[1] += unchanged
+        if self.profiler:
+            self.profiler.merge(*result["profile"])
+        for i, value in enumerate(result["history"]):
+            self.worker_history[i] += value
+        for i, value in enumerate(result["relations"]):
+            self.worker_relations[i] += value
+        for i, value in enumerate(result["dates"]):
+            self.worker_dates[i] += value
+        for name, stats in result["caches"].items():
+            totals = self.worker_caches.setdefault(name, [0, 0, 0])
+            for i, value in enumerate(stats):
+                totals[i] += value
+
+        for key, (count, first) in result["error_classes"].items():
+            entry = self.error_classes.setdefault(key, [0, first])
+            entry[0] += count
+            entry[1] = min(entry[1], first)
+
+        self.report_progress(self.processed, "Processed")
 
-                        # Optionally log the full traceback for debugging
-                        import traceback
+    def statistics(self):
+        """
+        Summarize commit latencies and lookup cache usage, including
+        the numbers reported by worker processes.
+        """
+        caches = {name: list(stats) for name, stats in self.worker_caches.items()}
+        for model, cache in self.caches.items():
+            totals = caches.setdefault(str(model._meta.verbose_name), [0, 0, 0])
+            totals[0] += cache.hits
+            totals[1] += cache.misses
+            totals[2] += cache.evictions
+
+        if self.commits:
+            yield (
+                f"Commits: {self.commits}, "
+                f"avg {self.commit_time / self.commits * 1000:.1f} ms, "
+                f"max {self.commit_time_max * 1000:.1f} ms"
+            )
+        for name, (hits, misses, evictions) in caches.items():
+            yield f"Lookup cache {name}: {hits} hits, {misses} misses, {evictions} evictions"
+        hits, misses = date_cache_stats(self.dates_since)
+        hits += self.worker_dates[0]
+        misses += self.worker_dates[1]
+        if hits or misses:
+            yield f"Date parser cache: {hits} hits, {misses} misses"
+
+        upserts = {name: list(stats) for name, stats in self.worker_upserts.items()}
+        for model, index in self.upserts.items():
+            totals = upserts.setdefault(str(model._meta.verbose_name_plural), [0, 0])
+            totals[0] += index.updated
+            totals[1] += index.unchanged
+        for name, (updated, unchanged) in upserts.items():
+            yield f"Upsert {name}: {updated} updated, {unchanged} unchanged"
+
+        if self.relations:
+            created, inserts = self.worker_relations
+            created += self.relations.created
+            inserts += self.relations.inserts
+            yield f"Relations: {created} created in {inserts} bulk inserts"
 
-                        self.logger.error(f"Traceback: {traceback.format_exc()}")
+        if self.history:
+            rows, inserts = self.worker_history
+            rows += self.history.rows
+            inserts += self.history.inserts
+            yield f"Deferred history: {rows} entries in {inserts} bulk inserts"
 
-                summary_msg = f"Import completed. Processed: {processed}, Success: {success}, Errors: {errors}"
-                self.stdout.write(self.style.SUCCESS(summary_msg))
-                self.logger.info(summary_msg)
+        if self.error_classes:
+            yield "Errors by class:"
+            ranked = sorted(self.error_classes.items(), key=lambda item: -item[1][0])
+            for key, (count, first) in ranked:
+                yield f"  {count:8} (first in row {first})  {key}"
 
+        if self.profiler:
+            yield from self.profiler.report(self.profile_top)
+
+    def import_chunk(self, chunk):
+        """
+        Import a list of `(number, row)` tuples. Without `--chunk-size`
+        the chunk is a single row that is written in autocommit mode.
+        Otherwise the chunk is one transaction and every row gets a
+        savepoint, so a failing row only rolls back itself.
+        """
+        if not self.chunk_size:
+            for number, row in chunk:
+                self.process_row(number, row)
+            # Every row is committed on its own
+            self.commit_caches()
+            return
+
+        savepoint = self.cache_savepoint()
+        failed = set()
+        try:
+            with transaction.atomic():
+                for number, row in chunk:
+                    if not self.process_row(number, row):
+                        failed.add(number)
+                # Rows held back by the subclass belong to this chunk
+                self.flush()
+                if self.history:
+                    self.history.flush()
+                commit_started = time.monotonic()
+            commit_time = time.monotonic() - commit_started
+            self.commits += 1
+            self.commit_time += commit_time
+            self.commit_time_max = max(self.commit_time_max, commit_time)
+            self.commit_caches()
         except Exception as e:
-            error_msg = f"Error reading CSV file: {str(e)}"
-            self.logger.error(error_msg)
-            self.logger.error(f"Traceback: {traceback.format_exc()}")
-            raise CommandError(error_msg)
+            self.rollback_caches(savepoint)
+            for number, row in chunk:
+                if number not in failed:
+                    self.report_error(number, row, e)
+
+    def process_row(self, number, row):
+        self.processed += 1
+        self.current_row = number
+        if self.profiler:
+            self.profiler.row = number
+
+        # Show progress, worker processes leave that to the main process
+        if self.reader:
+            self.report_progress(number)
+
+        savepoint = self.cache_savepoint()
+        try:
+            # Call the import_row function with the current row
+            if self.chunk_size:
+                with transaction.atomic():
+                    self.import_row(row)
+            else:
+                self.import_row(row)
+        except Exception as e:
+            if self.chunk_size:
+                self.rollback_caches(savepoint)
+            self.report_error(number, row, e)
+            return False
         finally:
-            # Close all handlers to ensure log file is properly saved
-            for handler in self.logger.handlers:
-                handler.close()
-                self.logger.removeHandler(handler)
+            if self.profiler:
+                self.profiler.row = None
+        return True
+
+    def report_error(self, number, row, exc):
+        """
+        Report a failed row. This is also used by subclasses that defer
+        writing rows and only learn about errors when flushing.
+        """
+        self.errors += 1
+        key = error_class(exc)
+        entry = self.error_classes.setdefault(key, [0, number])
+        entry[0] += 1
+        error_msg = f"Error processing row {number}{self.file_suffix()}: {str(exc)}"
+        self.stderr.write(self.style.ERROR(error_msg))
+        self.logger.error(
+            error_msg,
+            extra={
+                "event": "row_error",
+                "file": self.csv_file,
+                "row": number,
+                "error_class": key,
+            },
+        )
+
+        # Log detailed error information only when asked for, formatting
+        # the traceback and the row is expensive on large files
+        if self.verbosity >= 2:
+            self.logger.error(f"Row data: {row}")
+            self.logger.error(f"Traceback: {traceback.format_exc()}")
+
+    def file_suffix(self):
+        """Name the current file in messages about rows, if there are several"""
+        if len(self.csv_files) > 1:
+            return f" of {os.path.basename(self.csv_file)}"
+        return ""
+
+    def report_progress(self, number, action="Processing"):
+        """
+        Report the progress, the throughput and the remaining time, at
+        most every `--progress-interval` seconds.
+        """
+        now = time.monotonic()
+        if now - self.progress_at < self.progress_interval:
+            return
+        self.progress_at = now
+        rate = self.processed / (now - self.started)
+        eta = self.reader.eta
+        progress_msg = f"{action} row {number}{self.file_suffix()} ({self.reader.progress:.1%}, {rate:.0f} rows/s, ETA {eta})..."
+        self.stdout.write(progress_msg)
+        self.logger.info(
+            progress_msg,
+            extra={
+                "event": "progress",
+                "file": self.csv_file,
+                "row": number,
+                "progress": round(self.reader.progress, 4),
+                "rows_per_second": round(rate, 1),
+                "eta_seconds": eta.total_seconds() if eta else None,
+            },
+        )
+
+    def log_entity(self, msg, obj=None):
+        """
+        Report a created or updated entity. This per entity output is
+        only written with a verbosity of 2 or more.
+        """
+        if self.verbosity >= 2:
+            self.stdout.write(msg)
+            self.logger.info(
+                msg, extra={"event": "entity", "pk": getattr(obj, "pk", None)}
+            )
+
+    def prepare_row(self, row):
+        """
+        Resolve the entities a row shares with other rows, using `lookup`.
+        In a parallel import this is called in the main process before the
+        row is handed to a worker. Override this method in a subclass.
+        """
+        pass
+
+    def lookup(self, model, label, defaults=None):
+        """
+        `get_or_create` a `model` instance by its label, using an import
+        scoped cache that is preloaded on first use.
+        """
+        if not self.cache_size:
+            return model.objects.get_or_create(label=label, defaults=defaults)
+        return self.lookup_cache(model).get_or_create(label, defaults)
+
+    def lookup_many(self, model, labels):
+        """
+        Resolve several labels like `lookup` and return the instances by
+        label, with one query for the misses and one bulk insert for the
+        rows that do not exist yet.
+        """
+        labels = list(labels)
+        if not self.cache_size:
+            # a throwaway cache that is never preloaded
+            return LookupCache(model, maxsize=len(labels)).get_or_create_many(labels)
+        return self.lookup_cache(model).get_or_create_many(labels)
+
+    def lookup_cache(self, model):
+        if model not in self.caches:
+            # with several processes, rows may be created by someone else
+            cache = LookupCache(model, maxsize=self.cache_size, shared=self.workers > 1)
+            self.caches[model] = cache.preload()
+        return self.caches[model]
+
+    def remember(self, obj):
+        """
+        Add an instance that was created outside of `lookup` to the cache
+        of its model, so that later lookups find it.
+        """
+        if cache := self.caches.get(type(obj)):
+            cache.add(obj, created=True)
+
+    def cache_savepoint(self):
+        savepoint = {model: cache.savepoint() for model, cache in self.caches.items()}
+        if self.relations:
+            savepoint[RelationBuffer] = self.relations.savepoint()
+        if self.history:
+            savepoint[DeferredHistory] = self.history.savepoint()
+        return savepoint
+
+    def commit_caches(self):
+        for cache in self.caches.values():
+            cache.commit()
+
+    def rollback_caches(self, savepoint):
+        """
+        Forget the cached objects, the buffered relations and the deferred
+        history entries that were created after `savepoint` was taken,
+        because the transaction creating them was rolled back.
+        """
+        for model, cache in self.caches.items():
+            cache.rollback(savepoint.get(model, 0))
+        if self.relations:
+            self.relations.rollback(savepoint.get(RelationBuffer, 0))
+        if self.history:
+            self.history.rollback(savepoint.get(DeferredHistory, 0))
+
+    def compile_mapping(self, mapping, row):
+        """
+        Return the `RowMapping` compiled against the header of the file,
+        which is taken from the keys of its first row.
+        """
+        if (compiled := self.mappings.get(mapping)) is None:
+            compiled = self.mappings[mapping] = mapping.compile(row.keys())
+        return compiled
+
+    def update_existing(self, obj, uri, fields):
+        """
+        With `--upsert`, look up the entity that has the external `uri`.
+        If there is one, `obj` is queued to update its `fields`, the names
+        of the fields the row sets, and True is returned; otherwise the
+        row has to be created. Rows matched by an earlier row of the
+        import (see `remember_uri`) are updated too. A row without a uri
+        cannot be matched, it is refused instead of being created again
+        on every run.
+        """
+        if not self.upsert:
+            return False
+        if not uri:
+            raise ValueError("The row has no external uri to match it on")
+        model = type(obj)
+        if model not in self.upserts:
+            self.upserts[model] = UpsertIndex(model).load()
+        index = self.upserts[model]
+        if (pk := index.get(uri)) is None:
+            return False
+        index.queue(pk, obj, fields)
+        if len(index.pending) >= index.batch_size:
+            self.flush_upserts()
+        return True
+
+    def remember_uri(self, obj, uri):
+        """Make an entity created by this import known to `update_existing`"""
+        if index := self.upserts.get(type(obj)):
+            index.add(uri, obj)
+
+    def flush_upserts(self):
+        for model, index in self.upserts.items():
+            updated, unchanged = index.flush()
+            if updated or unchanged:
+                msg = f"Updated {updated} {model._meta.verbose_name_plural}, {unchanged} unchanged"
+                self.stdout.write(msg)
+                self.logger.info(msg)
+
+    def deferred(self):
+        """
+        Return the number of rows that `import_row` held back and `flush`
+        did not write yet. Subclasses that collect rows override it.
+        """
+        deferred = sum(len(index.pending) for index in self.upserts.values())
+        if self.relations:
+            deferred += len(self.relations.pending)
+        return deferred
+
+    def flush(self):
+        """
+        Write rows that were held back by `import_row`. This is called
+        once after the last row and at the end of every chunk; subclasses
+        that collect rows in batches extend it.
+        """
+        self.flush_upserts()
+        if self.relations:
+            self.relations.flush()
 
     def import_row(self, row):
         """
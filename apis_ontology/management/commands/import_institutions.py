@@ -1,5 +1,12 @@
-from apis_core.apis_entities.models import Uri
+from AcdhArcheAssets.uri_norm_rules import get_normalized_uri
+from apis_core.relations.models import Relation
+from apis_core.uris.models import Uri
+from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import CommandError
+from apis_ontology.imports.columnar import blank_to_null, map_unique
+from apis_ontology.imports.mapping import RowMapping
+from apis_ontology.imports.pgcopy import CopyLoader, insert_relations
+from apis_ontology.imports.validation import validate_instance, validate_uris
 from apis_ontology.management.commands.import_csv import Command as ImportCsvCommand
 from apis_ontology.models import (
     Contains,
@@ -10,49 +17,95 @@ from apis_ontology.models import (
 )
 
 
-def get_lang(col):
-    match col:
-        case col if "@de" in col:
-            return "de"
-        case col if "@en" in col:
-            return col
-        case col if "@fr" in col:
-            return "fr"
-        case col if "@esp" in col:
-            return "es"
-        case col if "@ita" in col:
-            return "it"
-        case col if "@Local" in col:
-            return "loc"
-    return None
-
-
-def proc_places(row, inst):
-    land = False
-    if row.get("Land", None):
-        land, c = Place.objects.get_or_create(
-            label=row.get("Land"), defaults={"feature_code": "PCL"}
-        )
+INSTITUTION_MAPPING = RowMapping(
+    required=["skos:prefLabel @de"],
+    fields={"label": "skos:prefLabel @de", "hierarchy": "hierarchy"},
+    labels=[
+        ("skos:altLabel @de", "de", "alt"),
+        ("skos:altLabel @de 2", "de", "alt"),
+        ("skos:altLabel @en", "en", "alt"),
+        ("skos:prefLabel @en", "en", "pref"),
+        ("skos:prefLabel @fr", "fr", "pref"),
+        ("skos:altLabel @fr", "fr", "alt"),
+        ("skos:prefLabel @esp", "es", "pref"),
+        ("skos:prefLable@ita", "it", "pref"),
+        ("skos:prefLabel@Local Language", "loc", "pref"),
+        ("skos:altLabel@Local Language", "loc", "alt"),
+    ],
+    uris=["Link-exact", "Link-related"],
+)
+
+
+def get_or_create(model, label, defaults=None):
+    return model.objects.get_or_create(label=label, defaults=defaults)
+
+
+def place_labels(row):
+    """
+    Return the labels of the country, the city and the parent institution
+    referenced by a row, None if not set.
+    """
+    land = row.get("Land", None) or None
     lev1 = row.get("skos:broader name1", None)
     lev2 = row.get("skos:broader name2", None)
-    city = False
-    inst1 = False
+    city = None
+    inst1 = None
     if lev1.strip().lower() == lev2.strip().lower():
-        city, c = Place.objects.get_or_create(label=lev1.strip())
+        city = lev1.strip()
     elif lev1 and lev2:
-        inst1, c = Institution.objects.get_or_create(label=lev1.strip())
-        city, c = Place.objects.get_or_create(label=lev2.strip())
-        Contains.objects.create(subj=inst1, obj=inst)
-        LocatedIn.objects.create(subj=inst1, obj=city)
+        inst1 = lev1.strip()
+        city = lev2.strip()
     elif lev1 and not lev2:
-        city, c = Place.objects.get_or_create(label=lev1.strip())
+        city = lev1.strip()
     elif lev2 and not lev1:
-        city, c = Place.objects.get_or_create(label=lev2.strip())
+        city = lev2.strip()
+    return land, city, inst1
+
+
+def resolve_places(row, lookup=get_or_create):
+    """
+    Resolve the country, the city and the parent institution referenced
+    by a row. `lookup` resolves instances by their label, the import
+    command passes its cached lookup.
+
+    Returns:
+        tuple: land, city and parent institution, False if not set.
+    """
+    land_label, city_label, inst1_label = place_labels(row)
+    land = False
+    if land_label is not None:
+        land, c = lookup(Place, land_label, defaults={"feature_code": "PCL"})
+    city = False
+    if city_label is not None:
+        city, c = lookup(Place, city_label)
+    inst1 = False
+    if inst1_label is not None:
+        inst1, c = lookup(Institution, inst1_label)
+    return land, city, inst1
+
+
+def proc_places(row, inst, lookup=get_or_create, relations=None):
+    """
+    Create the places and the parent institution referenced by a row and
+    relate them to `inst`. With a `RelationBuffer` as `relations`, the
+    relations are only added to it and created when it is flushed.
+    """
+    land, city, inst1 = resolve_places(row, lookup)
+    if relations is not None:
+        if inst1:
+            relations.add(Contains, inst1, inst)
+            relations.add(LocatedIn, inst1, city)
+        if not inst1 and city:
+            relations.add(LocatedIn, inst, city)
+        if land and city:
+            relations.add(Includes, land, city, unique=True)
+        return True
+    if inst1:
+        Contains.objects.create(subj=inst1, obj=inst)
+        LocatedIn.objects.create(subj=inst1, obj=city)
     if not inst1 and city:
         LocatedIn.objects.create(subj=inst, obj=city)
     if land and city:
-        from django.contrib.contenttypes.models import ContentType
-
         place_ct = ContentType.objects.get_for_model(Place)
         Includes.objects.get_or_create(
             subj_object_id=land.pk,
@@ -65,6 +118,29 @@ def proc_places(row, inst):
 
 class Command(ImportCsvCommand):
     help = "Import person data from a CSV file"
+    vectorized = True
+
+    def prepare_row(self, row):
+        resolve_places(row, lookup=self.lookup)
+
+    def build_institution(self, row):
+        """
+        Map a row from the CSV file to an unsaved institution.
+
+        Returns:
+            tuple: the institution and the list of its external uris.
+        """
+        mapping = self.compile_mapping(INSTITUTION_MAPPING, row)
+        inst = Institution(
+            **mapping.values(row),
+            alternative_labels=mapping.alternative_labels(row),
+        )
+        return inst, mapping.external_uris(row)
+
+    def validate_row(self, row):
+        inst, uris = self.build_institution(row)
+        place_labels(row)
+        return validate_instance(inst) + validate_uris("Link-exact/Link-related", uris)
 
     def import_row(self, row):
         """
@@ -75,58 +151,143 @@ class Command(ImportCsvCommand):
                         with column names as keys.
         """
         try:
-            # Example implementation - replace with your actual model and field mapping
-
-            # Check for required fields
-            required_fields = ["skos:prefLabel @de"]
-            for field in required_fields:
-                if field not in row or not row[field]:
-                    raise ValueError(f"Missing required field: {field}")
-            alt_label = []
-            for alt in [
-                "skos:altLabel @de",
-                "skos:altLabel @de 2",
-                "skos:altLabel @en",
-                "skos:prefLabel @en",
-                "skos:prefLabel @fr",
-                "skos:altLabel @fr",
-                "skos:prefLabel @esp",
-                "skos:prefLable@ita",
-                "skos:prefLabel@Local Language",
-                "skos:altLabel@Local Language",
-            ]:
-                if alt in row.keys():
-                    if len(row[alt]) > 0:
-                        alt_label.append(
-                            {
-                                "label": row[alt],
-                                "lang": get_lang(alt),
-                                "typ": "alt" if "altLabel" in alt else "pref",
-                            }
-                        )
-
-            # Create a new person for each row
-            inst = Institution.objects.create(
-                label=row["skos:prefLabel @de"],
-                alternative_labels=alt_label,
-                abbreviation=row.get("Abkürzen", None),
-                easydb4_reference=row.get("easydb4_reference", None),
-                hierarchy=row.get("hierarchy", None),
-                system_object_id=row.get("_system_object_id", None),
-                # Add more fields as needed
-            )
-            for header in ["Link-exact", "Link-related"]:
-                if header in row.keys():
-                    if len(row.get(header)) > 0:
-                        Uri.objects.create(content_object=inst, uri=row.get(header))
-            proc_places(row, inst)
-
-            self.stdout.write(f"Created institution: {inst.label}")
-            self.logger.info(f"Created institution: {inst.label}")
+            inst, uris = self.build_institution(row)
+            # relations of existing institutions are left as they are
+            fields = self.compile_mapping(INSTITUTION_MAPPING, row).field_names()
+            if self.update_existing(inst, row.get("Link-exact"), fields):
+                return inst
+            inst.save()
+            for uri in uris:
+                Uri.objects.create(content_object=inst, uri=uri)
+                self.remember_uri(inst, uri)
+            self.remember(inst)
+            proc_places(row, inst, lookup=self.lookup, relations=self.relations)
+
+            self.log_entity(f"Created institution: {inst.label}", inst)
 
             return inst
 
         except Exception as e:
             # Re-raise the exception to be caught by the parent command
-            self.logger.error(f"Error importing institution: {str(e)}")
-            raise CommandError(f"Error importing person: {str(e)}")
+            raise CommandError(f"Error importing institution: {str(e)}") from e
+
+    def copy_loader(self):
+        return CopyLoader(
+            Institution,
+            extra_columns={
+                "_land": "text",
+                "_city": "text",
+                "_parent": "text",
+                "_land_id": "bigint",
+                "_city_id": "bigint",
+                "_parent_id": "bigint",
+            },
+            uri_columns=["_uri_exact", "_uri_related"],
+        )
+
+    def copy_row(self, row):
+        inst, uris = self.build_institution(row)
+        land, city, parent = place_labels(row)
+        extra = {"_land": land, "_city": city, "_parent": parent}
+        for column, header in [
+            ("_uri_exact", "Link-exact"),
+            ("_uri_related", "Link-related"),
+        ]:
+            if row.get(header):
+                extra[column] = get_normalized_uri(row[header])
+        return inst, extra
+
+    def copy_batch(self, batch):
+        import pyarrow
+        import pyarrow.compute as pc
+
+        mapping = self.batch_mapping(INSTITUTION_MAPPING, batch)
+        errors = mapping.missing(batch)
+        values = mapping.values(batch)
+        values["alternative_labels"] = mapping.alternative_labels(batch)
+        blank = pyarrow.repeat(pyarrow.scalar(""), batch.num_rows)
+
+        def column(name):
+            return batch.column(name) if name in batch.schema.names else blank
+
+        # the columnar counterpart of `place_labels`
+        lev1, lev2 = column("skos:broader name1"), column("skos:broader name2")
+        name1, name2 = pc.utf8_trim_whitespace(lev1), pc.utf8_trim_whitespace(lev2)
+        same = pc.equal(pc.utf8_lower(name1), pc.utf8_lower(name2))
+        both = pc.and_(pc.not_equal(lev1, ""), pc.not_equal(lev2, ""))
+        city = pc.if_else(
+            same,
+            name1,
+            pc.if_else(both, name2, pc.if_else(pc.not_equal(lev1, ""), name1, name2)),
+        )
+        parent = pc.if_else(
+            pc.and_(pc.invert(same), both),
+            name1,
+            pyarrow.scalar(None, pyarrow.string()),
+        )
+        ids = pyarrow.nulls(batch.num_rows, pyarrow.int64())
+        extra = {
+            "_land": blank_to_null(column("Land")),
+            "_city": city,
+            "_parent": parent,
+            "_land_id": ids,
+            "_city_id": ids,
+            "_parent_id": ids,
+        }
+        for name, header in [
+            ("_uri_exact", "Link-exact"),
+            ("_uri_related", "Link-related"),
+        ]:
+            extra[name] = map_unique(blank_to_null(column(header)), get_normalized_uri)
+        return values, extra, errors
+
+    def load_copy(self, cursor, loader):
+        """
+        Resolve the places and parent institutions through the lookup
+        cache, move the institutions into their tables and create the
+        relations `proc_places` would create with set-based SQL.
+        """
+        loader.resolve(
+            cursor,
+            "_land",
+            "_land_id",
+            lambda label: self.lookup(Place, label, {"feature_code": "PCL"})[0],
+        )
+        loader.resolve(
+            cursor, "_city", "_city_id", lambda label: self.lookup(Place, label)[0]
+        )
+        loader.resolve(
+            cursor,
+            "_parent",
+            "_parent_id",
+            lambda label: self.lookup(Institution, label)[0],
+        )
+        super().load_copy(cursor, loader)
+
+        staging, pk = loader.staging, loader.pk
+        insert_relations(
+            cursor,
+            Contains,
+            f'SELECT _parent_id AS subj, "{pk}" AS obj FROM "{staging}" '
+            f"WHERE _parent_id IS NOT NULL",
+        )
+        insert_relations(
+            cursor,
+            LocatedIn,
+            f'SELECT _parent_id AS subj, _city_id AS obj FROM "{staging}" '
+            f"WHERE _parent_id IS NOT NULL "
+            f'UNION ALL SELECT "{pk}", _city_id FROM "{staging}" '
+            f"WHERE _parent_id IS NULL AND _city_id IS NOT NULL",
+        )
+        place_ct = ContentType.objects.get_for_model(Place)
+        insert_relations(
+            cursor,
+            Includes,
+            f'SELECT DISTINCT _land_id AS subj, _city_id AS obj FROM "{staging}" s '
+            f"WHERE _land_id IS NOT NULL AND _city_id IS NOT NULL AND NOT EXISTS ("
+            f'SELECT 1 FROM "{Includes._meta.db_table}" i '
+            f'JOIN "{Relation._meta.db_table}" r ON r.id = i.relation_ptr_id '
+            f"WHERE r.subj_object_id = s._land_id AND r.obj_object_id = s._city_id "
+            f"AND r.subj_content_type_id = %s AND r.obj_content_type_id = %s)",
+            [place_ct.pk, place_ct.pk],
+        )
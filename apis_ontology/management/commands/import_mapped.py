@@ -0,0 +1,67 @@
+from apis_core.uris.models import Uri
+from django.core.management.base import CommandError
+
+from apis_ontology.imports.mapping import RowMapping
+from apis_ontology.imports.validation import validate_instance, validate_uris
+from apis_ontology.management.commands.import_csv import Command as ImportCsvCommand
+
+
+class Command(ImportCsvCommand):
+    help = (
+        "Import entities from a CSV file, mapping its columns as described by a "
+        "JSON mapping file"
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--mapping",
+            type=str,
+            required=True,
+            help='Path of a JSON file with the keys "model" (e.g. '
+            '"apis_ontology.institution"), "fields" (field to column), "labels" '
+            '([column, lang, typ] lists), "uris" and "required" (lists of columns)',
+        )
+
+    def setup(self, options):
+        super().setup(options)
+        self.mapping = RowMapping.from_file(options["mapping"])
+        if self.mapping.model is None:
+            raise CommandError("The mapping does not name a model")
+
+    def build_entity(self, row):
+        """
+        Map a row from the CSV file to an unsaved entity.
+
+        Returns:
+            tuple: the entity and the list of its external uris.
+        """
+        mapping = self.compile_mapping(self.mapping, row)
+        obj = self.mapping.model(**mapping.values(row))
+        if mapping.labels:
+            obj.alternative_labels = mapping.alternative_labels(row)
+        return obj, mapping.external_uris(row)
+
+    def validate_row(self, row):
+        obj, uris = self.build_entity(row)
+        return validate_instance(obj) + validate_uris("uris", uris)
+
+    def import_row(self, row):
+        try:
+            obj, uris = self.build_entity(row)
+            fields = self.compile_mapping(self.mapping, row).field_names()
+            if self.update_existing(obj, uris[0] if uris else None, fields):
+                return obj
+            obj.save()
+            for uri in uris:
+                Uri.objects.create(content_object=obj, uri=uri)
+                self.remember_uri(obj, uri)
+            self.remember(obj)
+
+            self.log_entity(f"Created {obj._meta.verbose_name}: {obj}", obj)
+
+            return obj
+
+        except Exception as e:
+            # Re-raise the exception to be caught by the parent command
+            raise CommandError(f"Error importing row: {str(e)}") from e
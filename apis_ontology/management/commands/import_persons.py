@@ -1,85 +1,256 @@
-from apis_core.apis_entities.models import Uri
+from AcdhArcheAssets.uri_norm_rules import get_normalized_uri
+from apis_core.uris.models import Uri
 from django.core.management.base import CommandError
+from django.db import transaction
+from apis_ontology.imports.bulk import bulk_create_entities, bulk_create_uris
+from apis_ontology.imports.columnar import blank_to_null, map_unique
+from apis_ontology.imports.mapping import RowMapping
+from apis_ontology.imports.pgcopy import CopyLoader
+from apis_ontology.imports.validation import validate_instance, validate_uris
 from apis_ontology.management.commands.import_csv import Command as ImportCsvCommand
-from apis_ontology.models import Profession
+from apis_ontology.models import Person, Profession
+
+PERSON_MAPPING = RowMapping(
+    required=["skos:prefLabel @de"],
+    fields={
+        "label": "skos:prefLabel @de",
+        "person_type": "skos:broader",
+        "period": "skos:broader time",
+        "period_detail": "skos:broader time02",
+    },
+    labels=[
+        ("skos:altLabel @de", "de", "alt"),
+        ("skos:altLabel @de 2", "de", "alt"),
+        ("skos:altLabel @de 3", "de", "alt"),
+        ("skos:altLabel @de 4", "de", "alt"),
+        ("skos:altLabel @de 5", "de", "alt"),
+        ("skos:altLabel @en", "en", "alt"),
+        ("skos:prefLabel @en", "en", "pref"),
+    ],
+    uris=["skos:exactMatch"],
+)
 
 
 class Command(ImportCsvCommand):
     help = "Import person data from a CSV file"
+    vectorized = True
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=0,
+            help="Collect this many rows and write them with bulk inserts "
+            "(default: 0, every row is saved on its own)",
+        )
+
+    def setup(self, options):
+        super().setup(options)
+        self.batch_size = options.get("batch_size") or 0
+        # pending rows as (row number, row, person, occupation label, uri)
+        self.pending = []
+
+    def prepare_row(self, row):
+        if occ := row.get("skos:broader occupation"):
+            self.lookup(Profession, occ)
+
+    def build_person(self, row):
+        """
+        Map a row from the CSV file to an unsaved person.
+
+        Returns:
+            tuple: the person, the label of its occupation and the
+                   external uri, both of the latter may be None.
+        """
+        mapping = self.compile_mapping(PERSON_MAPPING, row)
+        values = mapping.values(row)
+        occ = row.get("skos:broader occupation") or None
+
+        date_of_birth = None
+        date_of_death = None
+        if scope := row.get("skos:scope"):
+            date_of_birth, date_of_death = scope.split("-")
+        person = Person(
+            **values,
+            date_of_death=date_of_death,
+            date_of_birth=date_of_birth,
+            historical=values.get("person_type") == "historical person",
+            alternative_labels=mapping.alternative_labels(row),
+        )
+        uris = mapping.external_uris(row)
+        return person, occ, uris[0] if uris else None
+
+    def upsert_fields(self, row):
+        """The names of the fields the rows of the file set, see `update_existing`"""
+        fields = self.compile_mapping(PERSON_MAPPING, row).field_names()
+        if "skos:scope" in row:
+            fields += ["date_of_birth", "date_of_death"]
+        if "person_type" in fields:
+            fields.append("historical")
+        if "skos:broader occupation" in row:
+            fields.append("profession")
+        return fields
+
+    def validate_row(self, row):
+        scope = row.get("skos:scope")
+        if scope and len(scope.split("-")) != 2:
+            return [("skos:scope", f"Expected 'birth-death', got: {scope}")]
+        person, occ, uri = self.build_person(row)
+        return validate_instance(person) + validate_uris(
+            "skos:exactMatch", [uri] if uri else []
+        )
+
+    def save_person(self, person, occ, uri):
+        if occ:
+            person.profession, c = self.lookup(Profession, occ)
+        person.save()
+        if uri:
+            Uri.objects.create(content_object=person, uri=uri)
+            self.remember_uri(person, uri)
+        return person
 
     def import_row(self, row):
         """
         Process a single row from the CSV file to import a person.
+        With `--batch-size` the person is only queued and written by `flush`.
 
         Args:
             row (dict): A dictionary representing a row from the CSV file,
                         with column names as keys.
         """
         try:
-            # Example implementation - replace with your actual model and field mapping
-            from apis_ontology.models import Person
-
-            # Check for required fields
-            required_fields = ["skos:prefLabel @de"]
-            for field in required_fields:
-                if field not in row or not row[field]:
-                    raise ValueError(f"Missing required field: {field}")
-            occ = None
-            if "skos:broader occupation" in row.keys():
-                if len(row.get("skos:broader occupation")) > 0:
-                    occ, c = Profession.objects.get_or_create(
-                        label=row.get("skos:broader occupation")
-                    )
-            alt_label = []
-            for alt in [
-                "skos:altLabel @de",
-                "skos:altLabel @de 2",
-                "skos:altLabel @de 3",
-                "skos:altLabel @de 4",
-                "skos:altLabel @de 5",
-                "skos:altLabel @en",
-                "skos:prefLabel @en",
-            ]:
-                if alt in row.keys():
-                    if len(row[alt]) > 0:
-                        alt_label.append(
-                            {
-                                "label": row[alt],
-                                "lang": "de" if "@de" in row[alt] else "en",
-                                "typ": "alt" if "altLabel" in row[alt] else "pref",
-                            }
-                        )
-
-            # Create a new person for each row
-            date_of_birth = None
-            date_of_death = None
-            if "skos:scope" in row.keys():
-                if len(row["skos:scope"]) > 0:
-                    date_of_birth, date_of_death = row["skos:scope"].split("-")
-            person = Person.objects.create(
-                label=row["skos:prefLabel @de"],
-                person_type=row.get("skos:broader", ""),
-                profession=occ,
-                date_of_death=date_of_death,
-                date_of_birth=date_of_birth,
-                historical=row["skos:broader"] == "historical person",
-                alternative_labels=alt_label,
-                period=row.get("skos:broader time", None),
-                period_detail=row.get("skos:broader time02", None),
-                # Add more fields as needed
-            )
-            if "skos:exactMatch" in row.keys():
-                if len(row.get("skos:exactMatch")) > 0:
-                    Uri.objects.create(
-                        content_object=person, uri=row.get("skos:exactMatch")
-                    )
+            person, occ, uri = self.build_person(row)
+            if self.upsert:
+                person.profession = self.lookup(Profession, occ)[0] if occ else None
+                if self.update_existing(person, uri, self.upsert_fields(row)):
+                    return person
+            if self.batch_size:
+                self.pending.append((self.current_row, row, person, occ, uri))
+                if len(self.pending) >= self.batch_size:
+                    self.flush()
+                return person
+
+            self.save_person(person, occ, uri)
 
-            self.stdout.write(f"Created person: {person.label}")
-            self.logger.info(f"Created person: {person.label}")
+            self.log_entity(f"Created person: {person.label}", person)
 
             return person
 
         except Exception as e:
             # Re-raise the exception to be caught by the parent command
-            self.logger.error(f"Error importing person: {str(e)}")
-            raise CommandError(f"Error importing person: {str(e)}")
+            raise CommandError(f"Error importing person: {str(e)}") from e
+
+    def deferred(self):
+        return len(self.pending) + super().deferred()
+
+    def flush(self):
+        """
+        Write the queued persons, their professions and uris with bulk
+        inserts. If the batch fails as a whole, it is rolled back and the
+        rows are saved one by one, so that errors are still reported for
+        the row that caused them.
+        """
+        super().flush()
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        savepoint = self.cache_savepoint()
+        try:
+            with transaction.atomic():
+                self.bulk_save(pending)
+        except Exception as e:
+            self.rollback_caches(savepoint)
+            self.logger.warning(f"Batch insert failed, retrying row by row: {e}")
+            for number, row, person, occ, uri in pending:
+                savepoint = self.cache_savepoint()
+                try:
+                    # the failed batch may already have set primary keys
+                    person.pk = None
+                    person.rootobject_ptr_id = None
+                    person._state.adding = True
+                    with transaction.atomic():
+                        self.save_person(person, occ, uri)
+                except Exception as e:
+                    self.rollback_caches(savepoint)
+                    self.report_error(number, row, e)
+            return
+        self.stdout.write(f"Created {len(pending)} persons")
+        self.logger.info(f"Created {len(pending)} persons")
+
+    def bulk_save(self, pending):
+        labels = {occ for _, _, _, occ, _ in pending if occ}
+        professions = self.lookup_many(Profession, labels)
+
+        persons = []
+        for _, _, person, occ, _ in pending:
+            person.profession = professions.get(occ)
+            persons.append(person)
+        bulk_create_entities(Person, persons, batch_size=self.batch_size)
+        uris = [(person, uri) for _, _, person, _, uri in pending if uri]
+        bulk_create_uris(uris, batch_size=self.batch_size)
+        for person, uri in uris:
+            self.remember_uri(person, uri)
+
+    def copy_loader(self):
+        return CopyLoader(
+            Person,
+            extra_columns={"_profession": "text"},
+            uri_columns=["_uri"],
+        )
+
+    def copy_row(self, row):
+        person, occ, uri = self.build_person(row)
+        return person, {
+            "_profession": occ,
+            "_uri": get_normalized_uri(uri) if uri else None,
+        }
+
+    def copy_batch(self, batch):
+        import pyarrow
+        import pyarrow.compute as pc
+
+        mapping = self.batch_mapping(PERSON_MAPPING, batch)
+        errors = mapping.missing(batch)
+        values = mapping.values(batch)
+        blank = pyarrow.repeat(pyarrow.scalar(""), batch.num_rows)
+
+        def column(name):
+            return batch.column(name) if name in batch.schema.names else blank
+
+        scope = column("skos:scope")
+        empty = pc.equal(scope, "")
+        malformed = pc.and_(
+            pc.invert(empty), pc.not_equal(pc.count_substring(scope, "-"), 1)
+        )
+        for i in pc.indices_nonzero(malformed).to_pylist():
+            errors.setdefault(
+                i, ValueError(f"Expected 'birth-death', got: {scope[i].as_py()}")
+            )
+        # rows without dates are split as "-", which has two parts
+        no_dates = pc.or_(empty, malformed)
+        parts = pc.split_pattern(pc.if_else(no_dates, "-", scope), "-")
+        for i, field in enumerate(["date_of_birth", "date_of_death"]):
+            values[field] = pc.if_else(
+                no_dates,
+                pyarrow.scalar(None, pyarrow.string()),
+                pc.list_element(parts, i),
+            )
+        values["historical"] = pc.equal(
+            values.get("person_type", blank), "historical person"
+        )
+        values["alternative_labels"] = mapping.alternative_labels(batch)
+        extra = {
+            "_profession": blank_to_null(column("skos:broader occupation")),
+            "_uri": map_unique(mapping.external_uris(batch), get_normalized_uri),
+        }
+        return values, extra, errors
+
+    def load_copy(self, cursor, loader):
+        loader.resolve(
+            cursor,
+            "_profession",
+            Person._meta.get_field("profession").column,
+            lambda label: self.lookup(Profession, label)[0],
+        )
+        super().load_copy(cursor, loader)
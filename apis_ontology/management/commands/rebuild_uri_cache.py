@@ -0,0 +1,49 @@
+import itertools
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apis_ontology.models import ExternalUris
+from apis_ontology.uricache import BATCH_SIZE, is_cached, refresh_external_uris
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the cached external uris of all entities, e.g. after uris were "
+        "changed without sending signals"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Number of entities refreshed at a time (default: {BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        models = [
+            model
+            for model in apps.get_app_config("apis_ontology").get_models()
+            if is_cached(model)
+        ]
+        total = 0
+        with transaction.atomic():
+            # start from scratch, every entity gets its row again
+            ExternalUris.objects.all().delete()
+            for model in models:
+                pks = model.objects.order_by("pk").values_list("pk", flat=True)
+                for batch in itertools.batched(
+                    pks.iterator(chunk_size=options["batch_size"]),
+                    options["batch_size"],
+                ):
+                    refresh_external_uris(model, batch)
+                    total += len(batch)
+                self.stdout.write(f"Refreshed {model._meta.verbose_name_plural}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt the uri cache of {total} entities, "
+                f"{ExternalUris.objects.exclude(uris=[]).count()} have external uris"
+            )
+        )
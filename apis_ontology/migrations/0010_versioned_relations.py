@@ -0,0 +1,476 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:02
+
+import django.db.models.deletion
+import django_interval.fields
+import simple_history.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apis_ontology", "0009_institution_notes_person_notes_and_more"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionContains",
+            fields=[
+                (
+                    "relation_ptr",
+                    models.ForeignKey(
+                        auto_created=True,
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        parent_link=True,
+                        related_name="+",
+                        to="relations.relation",
+                    ),
+                ),
+                (
+                    "end_date_to",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "end_date_from",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "end_date_sort",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_to",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_from",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_sort",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "id",
+                    models.IntegerField(
+                        auto_created=True, blank=True, db_index=True, verbose_name="ID"
+                    ),
+                ),
+                ("subj_object_id", models.PositiveIntegerField(null=True)),
+                ("obj_object_id", models.PositiveIntegerField(null=True)),
+                ("begin", django_interval.fields.FuzzyDateParserField(blank=True)),
+                ("end", django_interval.fields.FuzzyDateParserField(blank=True)),
+                ("history_id", models.AutoField(primary_key=True, serialize=False)),
+                ("history_date", models.DateTimeField(db_index=True)),
+                ("history_change_reason", models.CharField(max_length=100, null=True)),
+                (
+                    "history_type",
+                    models.CharField(
+                        choices=[("+", "Created"), ("~", "Changed"), ("-", "Deleted")],
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "history_user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "obj_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+                (
+                    "subj_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "historical contains",
+                "verbose_name_plural": "historical contain",
+                "ordering": ("-history_date", "-history_id"),
+                "get_latest_by": ("history_date", "history_id"),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name="VersionEngagedIn",
+            fields=[
+                (
+                    "relation_ptr",
+                    models.ForeignKey(
+                        auto_created=True,
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        parent_link=True,
+                        related_name="+",
+                        to="relations.relation",
+                    ),
+                ),
+                (
+                    "end_date_to",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "end_date_from",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "end_date_sort",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_to",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_from",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_sort",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "id",
+                    models.IntegerField(
+                        auto_created=True, blank=True, db_index=True, verbose_name="ID"
+                    ),
+                ),
+                ("subj_object_id", models.PositiveIntegerField(null=True)),
+                ("obj_object_id", models.PositiveIntegerField(null=True)),
+                (
+                    "typen",
+                    models.CharField(
+                        choices=[
+                            ("employed", "employed"),
+                            ("hired", "hired"),
+                            ("leading", "leading"),
+                        ]
+                    ),
+                ),
+                ("begin", django_interval.fields.FuzzyDateParserField(blank=True)),
+                ("end", django_interval.fields.FuzzyDateParserField(blank=True)),
+                ("history_id", models.AutoField(primary_key=True, serialize=False)),
+                ("history_date", models.DateTimeField(db_index=True)),
+                ("history_change_reason", models.CharField(max_length=100, null=True)),
+                (
+                    "history_type",
+                    models.CharField(
+                        choices=[("+", "Created"), ("~", "Changed"), ("-", "Deleted")],
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "history_user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "obj_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+                (
+                    "subj_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "historical engaged in",
+                "verbose_name_plural": "historical engaged in",
+                "ordering": ("-history_date", "-history_id"),
+                "get_latest_by": ("history_date", "history_id"),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name="VersionIncludes",
+            fields=[
+                (
+                    "relation_ptr",
+                    models.ForeignKey(
+                        auto_created=True,
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        parent_link=True,
+                        related_name="+",
+                        to="relations.relation",
+                    ),
+                ),
+                (
+                    "end_date_to",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "end_date_from",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "end_date_sort",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_to",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_from",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_sort",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "id",
+                    models.IntegerField(
+                        auto_created=True, blank=True, db_index=True, verbose_name="ID"
+                    ),
+                ),
+                ("subj_object_id", models.PositiveIntegerField(null=True)),
+                ("obj_object_id", models.PositiveIntegerField(null=True)),
+                ("begin", django_interval.fields.FuzzyDateParserField(blank=True)),
+                ("end", django_interval.fields.FuzzyDateParserField(blank=True)),
+                ("history_id", models.AutoField(primary_key=True, serialize=False)),
+                ("history_date", models.DateTimeField(db_index=True)),
+                ("history_change_reason", models.CharField(max_length=100, null=True)),
+                (
+                    "history_type",
+                    models.CharField(
+                        choices=[("+", "Created"), ("~", "Changed"), ("-", "Deleted")],
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "history_user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "obj_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+                (
+                    "subj_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "historical includes",
+                "verbose_name_plural": "historical include",
+                "ordering": ("-history_date", "-history_id"),
+                "get_latest_by": ("history_date", "history_id"),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name="VersionLocatedIn",
+            fields=[
+                (
+                    "relation_ptr",
+                    models.ForeignKey(
+                        auto_created=True,
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        parent_link=True,
+                        related_name="+",
+                        to="relations.relation",
+                    ),
+                ),
+                (
+                    "end_date_to",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "end_date_from",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "end_date_sort",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_to",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_from",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "begin_date_sort",
+                    models.DateField(
+                        auto_created=True, blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "id",
+                    models.IntegerField(
+                        auto_created=True, blank=True, db_index=True, verbose_name="ID"
+                    ),
+                ),
+                ("subj_object_id", models.PositiveIntegerField(null=True)),
+                ("obj_object_id", models.PositiveIntegerField(null=True)),
+                ("begin", django_interval.fields.FuzzyDateParserField(blank=True)),
+                ("end", django_interval.fields.FuzzyDateParserField(blank=True)),
+                ("history_id", models.AutoField(primary_key=True, serialize=False)),
+                ("history_date", models.DateTimeField(db_index=True)),
+                ("history_change_reason", models.CharField(max_length=100, null=True)),
+                (
+                    "history_type",
+                    models.CharField(
+                        choices=[("+", "Created"), ("~", "Changed"), ("-", "Deleted")],
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "history_user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "obj_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+                (
+                    "subj_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "historical located in",
+                "verbose_name_plural": "historical located in",
+                "ordering": ("-history_date", "-history_id"),
+                "get_latest_by": ("history_date", "history_id"),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+    ]
@@ -0,0 +1,87 @@
+from django.db import migrations
+
+INDEX = "oeai_uri_content_type_object_idx"
+PATTERN_INDEX = "oeai_uri_uri_pattern_idx"
+
+
+def build_concurrently(schema_editor, name, definition):
+    """
+    A concurrent build that failed leaves an invalid index behind, which is
+    dropped and built again.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+            [name],
+        )
+        invalid = cursor.fetchone()
+    if invalid and invalid[0]:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"
+    )
+
+
+def has_pattern_index(schema_editor, table, column):
+    """
+    Django backs unique varchar columns with a varchar_pattern_ops index of
+    its own on PostgreSQL, so there is usually one for the uri already.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_index i "
+            "JOIN pg_opclass o ON o.oid = i.indclass[0] "
+            "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] "
+            "WHERE i.indrelid = to_regclass(%s) AND i.indnatts = 1 AND i.indisvalid "
+            "AND a.attname = %s AND o.opcname = 'varchar_pattern_ops' "
+            "AND i.indexrelid <> coalesce(to_regclass(%s), 0)",
+            [table, column, PATTERN_INDEX],
+        )
+        return cursor.fetchone() is not None
+
+
+def create_index(apps, schema_editor):
+    """
+    The Uri model belongs to apis_core, so the indexes are created with SQL.
+    On PostgreSQL they are built concurrently, which does not block writes
+    to the large Uri table. The first one includes the uri, which makes the
+    lookups of the entity list views index-only scans. The prefix filters
+    on our own vocabulary uris need a varchar_pattern_ops index, which is
+    only built if the table does not have one yet.
+    """
+    Uri = apps.get_model("uris", "Uri")
+    table = schema_editor.quote_name(Uri._meta.db_table)
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {INDEX} ON {table} (content_type_id, object_id)"
+        )
+        return
+    build_concurrently(
+        schema_editor, INDEX, f"ON {table} (content_type_id, object_id) INCLUDE (uri)"
+    )
+    if not has_pattern_index(schema_editor, Uri._meta.db_table, "uri"):
+        build_concurrently(
+            schema_editor, PATTERN_INDEX, f"ON {table} (uri varchar_pattern_ops)"
+        )
+
+
+def drop_index(apps, schema_editor):
+    concurrently = (
+        " CONCURRENTLY" if schema_editor.connection.vendor == "postgresql" else ""
+    )
+    for name in [PATTERN_INDEX, INDEX]:
+        schema_editor.execute(f"DROP INDEX{concurrently} IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("apis_ontology", "0010_versioned_relations"),
+        ("uris", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
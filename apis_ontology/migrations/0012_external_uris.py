@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apis_metainfo", "0017_delete_uri"),
+        ("apis_ontology", "0011_uri_content_type_object_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExternalUris",
+            fields=[
+                (
+                    "entity",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="external_uris",
+                        serialize=False,
+                        to="apis_metainfo.rootobject",
+                    ),
+                ),
+                ("uris", models.JSONField(default=list)),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apis_metainfo", "0017_delete_uri"),
+        ("apis_ontology", "0012_external_uris"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="institution",
+            index=models.Index(
+                fields=["label", "rootobject_ptr"], name="apis_ontolo_label_f92c2d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                fields=["label", "rootobject_ptr"], name="apis_ontolo_label_423bc6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                fields=["date_of_birth_date_sort", "rootobject_ptr"],
+                name="apis_ontolo_date_of_4bb3b9_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                fields=["date_of_death_date_sort", "rootobject_ptr"],
+                name="apis_ontolo_date_of_44e3df_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="place",
+            index=models.Index(
+                fields=["label", "rootobject_ptr"], name="apis_ontolo_label_2eadf0_idx"
+            ),
+        ),
+    ]
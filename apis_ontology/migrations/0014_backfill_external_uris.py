@@ -0,0 +1,73 @@
+import functools
+import itertools
+import operator
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Q
+
+ENTITIES = ["Person", "Institution", "Place"]
+BATCH_SIZE = 1000
+
+
+def internal_uris():
+    """The uris of our own vocabulary, as `apis_ontology.querysets` had them"""
+    base_uris = [getattr(settings, "APIS_BASE_URI", "https://example.org")]
+    base_uris += getattr(settings, "APIS_FORMER_BASE_URIS", [])
+    hosts = sorted({urlsplit(uri).netloc for uri in base_uris})
+    return functools.reduce(
+        operator.or_,
+        (
+            Q(uri__startswith=f"{scheme}://{host}/")
+            for host in hosts
+            for scheme in ("https", "http")
+        ),
+    )
+
+
+def backfill_external_uris(apps, schema_editor):
+    """
+    Fill the `ExternalUris` of the existing entities, like the
+    `rebuild_uri_cache` command does. Entities without a content type
+    have no uris yet, their rows are created with an empty list.
+    """
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Uri = apps.get_model("uris", "Uri")
+    ExternalUris = apps.get_model("apis_ontology", "ExternalUris")
+    internal = internal_uris()
+    for name in ENTITIES:
+        model = apps.get_model("apis_ontology", name)
+        content_type = ContentType.objects.filter(
+            app_label="apis_ontology", model=name.lower()
+        ).first()
+        pks = model.objects.order_by("pk").values_list("pk", flat=True)
+        for batch in itertools.batched(pks.iterator(chunk_size=BATCH_SIZE), BATCH_SIZE):
+            uris = defaultdict(list)
+            if content_type is not None:
+                for object_id, uri in (
+                    Uri.objects.filter(content_type=content_type, object_id__in=batch)
+                    .exclude(internal)
+                    .order_by("pk")
+                    .values_list("object_id", "uri")
+                ):
+                    uris[object_id].append(uri)
+            ExternalUris.objects.bulk_create(
+                [ExternalUris(entity_id=pk, uris=uris[pk]) for pk in batch],
+                update_conflicts=True,
+                unique_fields=["entity"],
+                update_fields=["uris"],
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apis_ontology", "0013_list_view_keyset_indexes"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("uris", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_external_uris, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from apis_core.apis_entities.models import AbstractEntity
+from apis_core.apis_metainfo.models import RootObject
 from django.utils.translation import gettext_lazy as _
 
 from apis_core.generic.abc import GenericModel
@@ -8,6 +9,7 @@ from apis_core.apis_entities.abc import E53_Place
 from django.db import models
 from django_interval.fields import FuzzyDateParserField
 from django_json_editor_field.fields import JSONEditorField
+from apis_ontology.dates import cached_dateparser
 
 
 class Profession(GenericModel, models.Model):
@@ -18,7 +20,10 @@ class Profession(GenericModel, models.Model):
 
 
 class OeaiBaseEntity:
-    pass
+    # the list views and the API count the rows of a filtered list up to
+    # this number and show "10,000+" beyond it, None counts all of them;
+    # override it in a model to change it for that model
+    count_limit = 10_000
 
 
 class Person(OeaiBaseEntity, VersionMixin, AbstractEntity):
@@ -88,8 +93,12 @@ class Person(OeaiBaseEntity, VersionMixin, AbstractEntity):
     person_type = models.CharField(
         max_length=255, choices=PERSON_TYPE, blank=True, null=True
     )
-    date_of_birth = FuzzyDateParserField(blank=True, null=True)
-    date_of_death = FuzzyDateParserField(blank=True, null=True)
+    date_of_birth = FuzzyDateParserField(
+        parser=cached_dateparser, blank=True, null=True
+    )
+    date_of_death = FuzzyDateParserField(
+        parser=cached_dateparser, blank=True, null=True
+    )
     schema = {
         "title": "Alternative Labels",
         "type": "array",
@@ -157,6 +166,12 @@ class Person(OeaiBaseEntity, VersionMixin, AbstractEntity):
     class Meta(VersionMixin.Meta, AbstractEntity.Meta):
         verbose_name = "Person"
         verbose_name_plural = "Persons"
+        # the orderings the list view pages are seeked on
+        indexes = [
+            models.Index(fields=["label", "rootobject_ptr"]),
+            models.Index(fields=["date_of_birth_date_sort", "rootobject_ptr"]),
+            models.Index(fields=["date_of_death_date_sort", "rootobject_ptr"]),
+        ]
 
     def __str__(self):
         return str(self.label)
@@ -237,6 +252,7 @@ class Institution(
     class Meta(VersionMixin.Meta, AbstractEntity.Meta):
         verbose_name = "Institution"
         verbose_name_plural = "Institutions"
+        indexes = [models.Index(fields=["label", "rootobject_ptr"])]
 
     def __str__(self):
         return str(self.label)
@@ -246,6 +262,25 @@ class Place(OeaiBaseEntity, VersionMixin, E53_Place, AbstractEntity):
     class Meta(VersionMixin.Meta, E53_Place.Meta, AbstractEntity.Meta):
         verbose_name = "Place"
         verbose_name_plural = "Places"
+        indexes = [models.Index(fields=["label", "rootobject_ptr"])]
+
+
+class ExternalUris(models.Model):
+    """
+    The external uris of an entity, denormalized so that list views can
+    read them with a join instead of a subquery per row. The rows are
+    kept up to date by the `Uri` signal handlers in `signals` and can be
+    recreated with the `rebuild_uri_cache` command. Entities without a
+    row have no external uris.
+    """
+
+    entity = models.OneToOneField(
+        RootObject,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="external_uris",
+    )
+    uris = models.JSONField(default=list)
 
 
 ##################
@@ -255,14 +290,14 @@ class Place(OeaiBaseEntity, VersionMixin, E53_Place, AbstractEntity):
 #################
 
 
-class EngagedIn(Relation):
+class EngagedIn(VersionMixin, Relation):
     TYPE = [("employed", "employed"), ("hired", "hired"), ("leading", "leading")]
 
     subj_model = Person
     obj_model = Institution
     typen = models.CharField(choices=TYPE)
-    begin = FuzzyDateParserField(blank=True)
-    end = FuzzyDateParserField(blank=True)
+    begin = FuzzyDateParserField(parser=cached_dateparser, blank=True)
+    end = FuzzyDateParserField(parser=cached_dateparser, blank=True)
 
     @classmethod
     def name(cls) -> str:
@@ -277,11 +312,11 @@ class EngagedIn(Relation):
         verbose_name_plural = _("engaged in")
 
 
-class LocatedIn(Relation):
+class LocatedIn(VersionMixin, Relation):
     subj_model = Institution
     obj_model = Place
-    begin = FuzzyDateParserField(blank=True)
-    end = FuzzyDateParserField(blank=True)
+    begin = FuzzyDateParserField(parser=cached_dateparser, blank=True)
+    end = FuzzyDateParserField(parser=cached_dateparser, blank=True)
 
     @classmethod
     def name(cls) -> str:
@@ -296,11 +331,11 @@ class LocatedIn(Relation):
         verbose_name_plural = _("located in")
 
 
-class Includes(Relation):
+class Includes(VersionMixin, Relation):
     subj_model = Place
     obj_model = Place
-    begin = FuzzyDateParserField(blank=True)
-    end = FuzzyDateParserField(blank=True)
+    begin = FuzzyDateParserField(parser=cached_dateparser, blank=True)
+    end = FuzzyDateParserField(parser=cached_dateparser, blank=True)
 
     @classmethod
     def name(cls) -> str:
@@ -315,11 +350,11 @@ class Includes(Relation):
         verbose_name_plural = _("include")
 
 
-class Contains(Relation):
+class Contains(VersionMixin, Relation):
     subj_model = Institution
     obj_model = Institution
-    begin = FuzzyDateParserField(blank=True)
-    end = FuzzyDateParserField(blank=True)
+    begin = FuzzyDateParserField(parser=cached_dateparser, blank=True)
+    end = FuzzyDateParserField(parser=cached_dateparser, blank=True)
 
     @classmethod
     def name(cls) -> str:
@@ -0,0 +1,449 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.template import loader
+from django.utils.functional import cached_property
+from django_tables2.data import TableQuerysetData
+from django_tables2.paginators import LazyPaginator
+from django_tables2.rows import BoundRow
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class EstimatedCount(int):
+    """
+    A number of rows that is not exact: the estimate of the planner,
+    shown as "~300,000", or a lower bound, shown as "10,000+".
+    """
+
+    def __new__(cls, value, capped=False):
+        count = super().__new__(cls, value)
+        count.capped = capped
+        return count
+
+    def __str__(self):
+        return f"{self:,}+" if self.capped else f"~{self:,}"
+
+
+def planner_estimate(queryset):
+    """
+    Return the number of rows the PostgreSQL statistics record for the
+    table of `queryset`, or None if there are none.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # the table was never analyzed
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def estimated_count(queryset):
+    """
+    Count the rows of `queryset` without scanning all of them when its
+    model has a `count_limit`: an unfiltered list is estimated from the
+    planner statistics, a filtered list is counted up to the limit.
+    Small lists are counted exactly.
+    """
+    limit = getattr(queryset.model, "count_limit", None)
+    if limit is None:
+        return queryset.count()
+    if not queryset.query.where and not queryset.query.distinct:
+        estimate = planner_estimate(queryset)
+        if estimate is not None and estimate > limit:
+            return EstimatedCount(estimate)
+    count = queryset.order_by().values("pk")[: limit + 1].count()
+    if count > limit:
+        return EstimatedCount(limit, capped=True)
+    return count
+
+
+def is_seekable(model, name):
+    """The columns a page can be seeked on: the label and the sort dates"""
+    if name == "pk":
+        return True
+    if name != "label" and not name.endswith("_date_sort"):
+        return False
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return field.concrete and not field.is_relation
+
+
+def keyset(queryset):
+    """
+    Return the ordering of `queryset` as a list of (column, descending)
+    tuples ending with the primary key, which makes it unique. Returns
+    None if the queryset is ordered by anything else.
+    """
+    model = queryset.model
+    keys = []
+    for entry in queryset.query.order_by or model._meta.ordering:
+        if not isinstance(entry, str):
+            return None
+        name = entry.lstrip("-")
+        if name in ["id", model._meta.pk.name]:
+            name = "pk"
+        if not is_seekable(model, name):
+            return None
+        keys.append((name, entry.startswith("-")))
+        if name == "pk":
+            return keys
+    return keys + [("pk", False)]
+
+
+def key_fields(model, keys):
+    """Return the fields of the `keys` of `model` by name"""
+    opts = model._meta
+    return {name: opts.pk if name == "pk" else opts.get_field(name) for name, _ in keys}
+
+
+def order_by_keys(queryset, keys, reverse=False):
+    """Order `queryset` by `keys`, or the opposite way, with nulls last"""
+    ordering = []
+    for name, descending in keys:
+        expression = F(name).desc if descending != reverse else F(name).asc
+        if reverse:
+            ordering.append(expression(nulls_first=True))
+        else:
+            ordering.append(expression(nulls_last=True))
+    return queryset.order_by(*ordering)
+
+
+def seek(keys, fields, values, reverse=False):
+    """
+    Return the condition for the rows that follow the row with the key
+    `values` in the order of `keys`, or precede it if `reverse`.
+    """
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(keys, values):
+        if value is None:
+            # nulls come last, so only the other values precede them
+            if reverse:
+                condition |= equal & Q(**{f"{name}__isnull": False})
+            equal &= Q(**{f"{name}__isnull": True})
+            continue
+        lookup = "lt" if descending != reverse else "gt"
+        following = Q(**{f"{name}__{lookup}": value})
+        if not reverse and fields[name].null:
+            following |= Q(**{f"{name}__isnull": True})
+        condition |= equal & following
+        equal &= Q(**{name: value})
+    name, descending = keys[0]
+    if values[0] is not None:
+        # redundant, but it lets the index scan start at the cursor
+        lookup = "lte" if descending != reverse else "gte"
+        bound = Q(**{f"{name}__{lookup}": values[0]})
+        if not reverse and fields[name].null:
+            bound |= Q(**{f"{name}__isnull": True})
+        condition &= bound
+    return condition
+
+
+def ordering_key(keys):
+    return [("-" if descending else "") + name for name, descending in keys]
+
+
+def encode_cursor(keys, direction, obj, **data):
+    """
+    Encode a cursor pointing `direction` ("after" or "before") of `obj`
+    in the order of `keys`, with additional `data`.
+    """
+    values = [getattr(obj, name) for name, _ in keys]
+    data = {**data, "k": ordering_key(keys), direction: values}
+    token = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(token.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, keys, fields):
+    """
+    Return the data, the direction and the key values of a cursor made
+    by `encode_cursor`. Raises a `ValueError` if it is not valid.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if data["k"] != ordering_key(keys):
+            raise ValueError("The cursor belongs to another ordering")
+        direction = "before" if "before" in data else "after"
+        values = [
+            None if value is None else field.to_python(value)
+            for field, value in zip(fields.values(), data[direction], strict=True)
+        ]
+    except (binascii.Error, TypeError, KeyError, ValidationError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    return data, direction, values
+
+
+class KeysetPage(Page):
+    """
+    A page of a `KeysetPaginator`. The neighbouring pages are addressed
+    by cursors instead of numbers, except the first one.
+    """
+
+    def next_page_number(self):
+        return self.paginator.cursor(self.number + 1, "after", self.object_list[-1])
+
+    def previous_page_number(self):
+        if self.number == 2:
+            return 1
+        return self.paginator.cursor(self.number - 1, "before", self.object_list[0])
+
+
+class KeysetPaginator(LazyPaginator):
+    """
+    Paginate the rows of a table with keyset (seek) pagination, so that
+    every page costs the same however deep it is: instead of skipping
+    the rows of the previous pages with an OFFSET, a page starts after
+    the last row of the page before it. That row is encoded in the
+    cursor the "next" link carries as page parameter, "previous" works
+    the same way backwards. The cursor also keeps the page number for
+    display.
+
+    Only tables of querysets ordered by the label, the primary key or
+    `*_date_sort` columns can be seeked; the primary key is always
+    added to the ordering so it is unique and nulls sort last. Page
+    numbers in the url and tables with other orderings are paginated
+    like the `LazyPaginator`, without counting the rows.
+    """
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        data = getattr(object_list, "data", None)
+        self.queryset = data.data if isinstance(data, TableQuerysetData) else None
+        self.keys = keyset(self.queryset) if self.queryset is not None else None
+        self.token = self.requested_cursor()
+        if self.keys is not None:
+            self.fields = key_fields(self.queryset.model, self.keys)
+
+    def requested_cursor(self):
+        """
+        `RequestConfig` passes on page numbers only, so the cursor is read
+        from the request of the table.
+        """
+        table = getattr(self.object_list, "table", None)
+        request = getattr(table, "request", None)
+        if request is None:
+            return None
+        value = request.GET.get(table.prefixed_page_field, "")
+        return None if value.isdigit() else value or None
+
+    @cached_property
+    def count(self):
+        if self.queryset is None:
+            return len(self.object_list)
+        return estimated_count(self.queryset)
+
+    def cursor(self, number, direction, row):
+        """Encode the cursor of page `number` next to the table row `row`"""
+        return encode_cursor(self.keys, direction, row.record, n=number)
+
+    def decode(self, token):
+        """Return the page number, the direction and the key of a cursor"""
+        try:
+            data, direction, values = decode_cursor(token, self.keys, self.fields)
+            number = self.validate_number(data["n"])
+        except (ValueError, KeyError):
+            raise PageNotAnInteger("That page cursor is not valid")
+        return number, direction, values
+
+    def page(self, number):
+        # the cursor is used once: if it is not valid, `RequestConfig`
+        # asks for a page by number instead
+        token, self.token = self.token, None
+        if self.keys is None:
+            return super().page(number)
+        if token is None:
+            number = self.validate_number(number or 1)
+            bottom = (number - 1) * self.per_page
+            rows = order_by_keys(self.queryset, self.keys)
+            rows = rows[bottom : bottom + self.per_page + self.orphans + 1]
+            return self.build(number, list(rows))
+
+        number, direction, values = self.decode(token)
+        if direction == "before":
+            rows = order_by_keys(self.queryset, self.keys, reverse=True)
+            rows = rows.filter(seek(self.keys, self.fields, values, reverse=True))
+            rows = list(rows[: self.per_page])[::-1]
+            if not rows:
+                raise EmptyPage("That page contains no results")
+            # the page the cursor came from follows
+            self._num_pages = number + 1
+            return KeysetPage(self.bind(rows), number, self)
+        rows = order_by_keys(self.queryset, self.keys)
+        rows = rows.filter(seek(self.keys, self.fields, values))
+        return self.build(number, list(rows[: self.per_page + self.orphans + 1]))
+
+    def build(self, number, rows):
+        """Return page `number` of the rows fetched from its start on"""
+        if len(rows) > self.per_page + self.orphans:
+            self._num_pages = number + 1
+            rows = rows[: self.per_page]
+        elif number != 1 and len(rows) <= self.orphans:
+            raise EmptyPage("That page contains no results")
+        else:
+            self._num_pages = self._final_num_pages = number
+        return KeysetPage(self.bind(rows), number, self)
+
+    def bind(self, records):
+        return [BoundRow(record, table=self.object_list.table) for record in records]
+
+
+class EstimatedCountPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination of the API with the count of
+    `estimated_count`. Whether there is a next page is found out by
+    fetching one row more than the page holds, so it does not depend on
+    the count.
+    """
+
+    def get_count(self, queryset):
+        try:
+            return estimated_count(queryset)
+        except AttributeError:
+            return len(queryset)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        rows = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        rows = rows[: self.limit]
+        if self.has_next:
+            # the count must not end the list before the rows do
+            count = self.get_count(queryset)
+            bound = self.offset + len(rows) + 1
+            self.count = count if count >= bound else EstimatedCount(bound, True)
+        elif rows or not self.offset:
+            # the last page gives the exact count
+            self.count = self.offset + len(rows)
+        else:
+            self.count = self.get_count(queryset)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return super().get_next_link()
+
+
+class KeysetPagination(EstimatedCountPagination):
+    """
+    API pagination with the seek pagination of the `KeysetPaginator`:
+    the "next" and "previous" links of querysets that can be seeked
+    carry a cursor of the first or last row of the page instead of an
+    offset, so a deep page costs the same as the first one. Requests
+    with an offset and querysets with other orderings are paginated by
+    limit and offset. The count is estimated, except for a first page
+    that holds all rows.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = "The pagination cursor value."
+    cursor_template = "rest_framework/pagination/previous_and_next.html"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keys = None
+        token = request.query_params.get(self.cursor_query_param)
+        keys = keyset(queryset) if isinstance(queryset, QuerySet) else None
+        if keys is None or (
+            token is None and self.offset_query_param in request.query_params
+        ):
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.keys = keys
+        fields = key_fields(queryset.model, keys)
+
+        reverse = False
+        rows = order_by_keys(queryset, keys)
+        if token is not None:
+            try:
+                _, direction, values = decode_cursor(token, keys, fields)
+            except ValueError:
+                raise NotFound("Invalid cursor")
+            reverse = direction == "before"
+            rows = order_by_keys(queryset, keys, reverse)
+            rows = rows.filter(seek(keys, fields, values, reverse))
+        rows = list(rows[: self.limit + 1])
+        more = len(rows) > self.limit
+        self.rows = rows[: self.limit]
+        if reverse:
+            self.rows.reverse()
+            self.has_next, self.has_previous = True, more
+        else:
+            self.has_next, self.has_previous = more, token is not None
+        if token is None and not more:
+            self.count = len(self.rows)
+        else:
+            self.count = self.get_count(queryset)
+        if (self.has_next or self.has_previous) and self.template is not None:
+            self.display_page_controls = True
+        return self.rows
+
+    def cursor_link(self, direction, obj):
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        url = remove_query_param(url, self.offset_query_param)
+        token = encode_cursor(self.keys, direction, obj)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if self.keys is None:
+            return super().get_next_link()
+        if not self.has_next or not self.rows:
+            return None
+        return self.cursor_link("after", self.rows[-1])
+
+    def get_previous_link(self):
+        if self.keys is None:
+            return super().get_previous_link()
+        if not self.has_previous or not self.rows:
+            return None
+        return self.cursor_link("before", self.rows[0])
+
+    def get_html_context(self):
+        if self.keys is None:
+            return super().get_html_context()
+        return {
+            "previous_url": self.get_previous_link(),
+            "next_url": self.get_next_link(),
+        }
+
+    def to_html(self):
+        if self.keys is None:
+            return super().to_html()
+        return loader.get_template(self.cursor_template).render(self.get_html_context())
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            }
+        ]
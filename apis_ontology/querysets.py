@@ -1,15 +1,29 @@
-from apis_core.uris.models import Uri
-from django.db.models import OuterRef
-from django.contrib.postgres.expressions import ArraySubquery
+import functools
+import operator
+from urllib.parse import urlsplit
 
+from apis_core.utils.settings import internal_uris
+from django.db.models import F, Q
 
-uris = (
-    Uri.objects.filter(object_id=OuterRef("pk"))
-    .exclude(uri__contains="vocabs-oeai")
-    .values_list("uri", flat=True)
+
+def internal_uri_prefixes():
+    """
+    The prefixes of the uris of our own vocabulary: the hosts of
+    `APIS_BASE_URI` and `APIS_FORMER_BASE_URIS`, with either scheme.
+    """
+    hosts = sorted({urlsplit(uri).netloc for uri in internal_uris()})
+    return tuple(
+        f"{scheme}://{host}/" for host in hosts for scheme in ("https", "http")
+    )
+
+
+INTERNAL_URI_PREFIXES = internal_uri_prefixes()
+INTERNAL_URIS = functools.reduce(
+    operator.or_, (Q(uri__startswith=prefix) for prefix in INTERNAL_URI_PREFIXES)
 )
 
 
 def OeaiBaseEntityListViewQueryset(*args):
-    qs = args[0].annotate(uris=ArraySubquery(uris))
+    # the external uris are cached in `ExternalUris`, which is a plain join
+    qs = args[0].annotate(uris=F("external_uris__uris"))
     return qs
@@ -15,3 +15,8 @@ INSTALLED_APPS.remove("apis_ontology")
 INSTALLED_APPS.insert(0, "apis_ontology")
 
 APIS_BASE_URI = "https://vocabs-oeai.acdh-ch-dev.oeaw.ac.at"
+
+# count large lists without scanning them, see `apis_ontology.pagination`
+REST_FRAMEWORK["DEFAULT_PAGINATION_CLASS"] = (  # noqa: F405
+    "apis_ontology.pagination.EstimatedCountPagination"
+)
@@ -1,9 +1,14 @@
 import os
 
+from apis_core.uris.models import Uri
 from django.contrib.auth.models import Group
 from django.contrib.auth.signals import user_logged_in
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from apis_ontology.uricache import is_cached, is_internal, schedule_refresh
+
 
 @receiver(user_logged_in)
 def add_to_group(sender, user, request, **kwargs):
@@ -11,3 +16,36 @@ def add_to_group(sender, user, request, **kwargs):
     g1, _ = Group.objects.get_or_create(name="editors")
     if user.username in user_list:
         g1.user_set.add(user)
+
+
+def uri_owner(content_type_id, object_id):
+    if content_type_id is None or object_id is None:
+        return None
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    return (model, object_id) if is_cached(model) else None
+
+
+@receiver(pre_save, sender=Uri)
+def remember_uri_owner(sender, instance, raw=False, **kwargs):
+    # a changed uri may have moved to another entity, which loses it
+    if instance.pk and not raw:
+        instance._previous_owner = (
+            Uri.objects.filter(pk=instance.pk)
+            .values_list("content_type_id", "object_id")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Uri)
+@receiver(post_delete, sender=Uri)
+def update_external_uris(sender, instance, using=None, **kwargs):
+    """Keep the `ExternalUris` of the entities a uri belongs to up to date"""
+    owners = {uri_owner(instance.content_type_id, instance.object_id)}
+    if previous := getattr(instance, "_previous_owner", None):
+        owners.add(uri_owner(*previous))
+    elif is_internal(instance.uri):
+        # internal uris are not cached
+        return
+    for owner in owners - {None}:
+        model, pk = owner
+        schedule_refresh(model, pk, using)
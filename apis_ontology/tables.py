@@ -1,7 +1,23 @@
 from apis_core.apis_entities.tables import AbstractEntityTable
-from django.utils.html import format_html
+from django.utils.html import format_html_join
+from django_interval.fields import FuzzyDateParserField
+from django_tables2.utils import OrderByTuple
+
+from apis_ontology.pagination import KeysetPaginator
 
 
 class OeaiBaseEntityTable(AbstractEntityTable):
+    table_pagination = {"paginator_class": KeysetPaginator}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # sort fuzzy dates by their sort date, which pages can be seeked on
+        for field in self._meta.model._meta.get_fields():
+            if isinstance(field, FuzzyDateParserField) and field.name in self.columns:
+                self.columns[field.name].column.order_by = OrderByTuple(
+                    [f"{field.name}_date_sort"]
+                )
+
     def render_uris(self, value):
-        return format_html(", ".join([f'<a href="{v}">{v}</a>' for v in value]))
+        # format_html_join escapes the uris
+        return format_html_join(", ", '<a href="{}">{}</a>', ((v, v) for v in value))
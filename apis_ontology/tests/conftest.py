@@ -0,0 +1,12 @@
+import pytest
+from django.db import connection
+
+
+@pytest.fixture(autouse=True)
+def _postgres_only(request):
+    """Skip the tests marked `postgres` on other databases"""
+    if (
+        request.node.get_closest_marker("postgres")
+        and connection.vendor != "postgresql"
+    ):
+        pytest.skip("needs PostgreSQL")
@@ -0,0 +1,58 @@
+import csv
+
+import pytest
+from apis_core.uris.models import Uri
+from django.core.management import call_command
+
+from apis_ontology.models import Person
+
+pytestmark = pytest.mark.django_db
+
+HEADER = ["skos:prefLabel @de", "skos:broader occupation", "skos:exactMatch"]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_batches_like_single_rows(tmp_path):
+    rows = [
+        [f"Person {i}", ["Maler", "Kaiser", ""][i % 3], f"https://d-nb.info/gnd/{i}"]
+        for i in range(7)
+    ]
+    call_command(
+        "import_persons", write_csv(tmp_path / "a.csv", rows), batch_size=3, verbosity=0
+    )
+    batched = list(
+        Person.objects.order_by("label").values_list("label", "profession__label")
+    )
+    assert len(batched) == 7
+    assert Uri.objects.filter(uri__startswith="https://d-nb.info/gnd/").count() == 7
+
+    Person.objects.all().delete()
+    Uri.objects.filter(uri__startswith="https://d-nb.info/gnd/").delete()
+    call_command("import_persons", write_csv(tmp_path / "b.csv", rows), verbosity=0)
+    single = list(
+        Person.objects.order_by("label").values_list("label", "profession__label")
+    )
+    assert single == batched
+
+
+def test_failed_batch_is_retried_row_by_row(tmp_path):
+    rows = [
+        ["Person 1", "", "https://d-nb.info/gnd/1"],
+        ["Person 2", "", "https://d-nb.info/gnd/1"],
+        ["Person 3", "", "https://d-nb.info/gnd/3"],
+    ]
+    call_command(
+        "import_persons", write_csv(tmp_path / "a.csv", rows), batch_size=3, verbosity=0
+    )
+    # the duplicate uri fails the batch, only its second row is lost
+    assert sorted(Person.objects.values_list("label", flat=True)) == [
+        "Person 1",
+        "Person 3",
+    ]
@@ -0,0 +1,37 @@
+import pytest
+
+from apis_ontology.imports.cache import LookupCache
+from apis_ontology.models import Profession
+
+pytestmark = pytest.mark.django_db
+
+
+def test_preloaded_entries_match_normalized_labels():
+    existing = Profession.objects.create(label="Foo Bar")
+    cache = LookupCache(Profession).preload()
+    obj, created = cache.get_or_create("foo  BAR")
+    assert (obj, created) == (existing, False)
+    assert Profession.objects.count() == 1
+
+
+def test_miss_matches_collapsed_whitespace(django_assert_num_queries):
+    existing = Profession.objects.create(label="Foo Bar")
+    cache = LookupCache(Profession)
+    # one exact lookup, no insert
+    with django_assert_num_queries(1):
+        obj, created = cache.get_or_create(" Foo  Bar")
+    assert (obj, created) == (existing, False)
+
+
+def test_get_or_create_many(django_assert_num_queries):
+    existing = Profession.objects.create(label="Foo Bar")
+    cache = LookupCache(Profession)
+    # one query for the misses, one bulk insert
+    with django_assert_num_queries(2):
+        objects = cache.get_or_create_many(["Foo  Bar", "Maler", "maler ", "Kaiser"])
+    assert objects["Foo  Bar"] == existing
+    assert objects["Maler"] == objects["maler "]
+    assert Profession.objects.count() == 3
+    # now they are all cached
+    with django_assert_num_queries(0):
+        assert cache.get_or_create_many(["kaiser"])["kaiser"] == objects["Kaiser"]
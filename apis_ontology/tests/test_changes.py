@@ -0,0 +1,30 @@
+import datetime
+
+import pytest
+from django.db import connections
+from django.utils import timezone
+
+from apis_ontology.exports.changes import settled_until
+
+
+@pytest.mark.django_db
+def test_window_ends_before_the_lag():
+    before = timezone.now()
+    until = settled_until(datetime.timedelta(seconds=30))
+    assert until <= before - datetime.timedelta(seconds=29)
+
+
+@pytest.mark.postgres
+@pytest.mark.django_db(transaction=True)
+def test_open_transactions_hold_back_the_window():
+    other = connections.create_connection("default")
+    try:
+        other.set_autocommit(False)
+        with other.cursor() as cursor:
+            cursor.execute("SELECT now()")
+            (started,) = cursor.fetchone()
+        assert settled_until(datetime.timedelta()) <= started
+        other.rollback()
+        assert settled_until(datetime.timedelta()) > started
+    finally:
+        other.close()
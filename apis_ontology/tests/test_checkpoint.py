@@ -0,0 +1,38 @@
+import json
+import os
+
+import pytest
+
+from apis_ontology.imports.checkpoint import Checkpoint
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "persons.csv"
+    path.write_text("skos:prefLabel @de\nPerson 1\nPerson 2\n", encoding="utf-8")
+    return str(path)
+
+
+def test_writes_are_throttled(tmp_path, csv_file):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path, csv_file, interval=3600)
+    checkpoint.save(1, 20)
+    assert not os.path.exists(path)
+    checkpoint.flush()
+    with open(path, encoding="utf-8") as fh:
+        assert json.load(fh)["row"] == 1
+
+    checkpoint = Checkpoint(path, csv_file)
+    assert checkpoint.load()
+    assert (checkpoint.row, checkpoint.offset) == (1, 20)
+
+
+def test_changed_file_is_refused(tmp_path, csv_file):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path, csv_file)
+    checkpoint.save(1, 20)
+    checkpoint.flush()
+    with open(csv_file, "a", encoding="utf-8") as fh:
+        fh.write("Person 3\n")
+    with pytest.raises(ValueError):
+        Checkpoint(path, csv_file).load()
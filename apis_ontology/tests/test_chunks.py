@@ -0,0 +1,34 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+from apis_ontology.models import Person, Profession
+
+pytestmark = pytest.mark.django_db
+
+HEADER = ["skos:prefLabel @de", "skos:broader occupation", "skos:exactMatch"]
+
+
+def test_failing_row_rolls_back_only_itself(tmp_path):
+    path = tmp_path / "persons.csv"
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADER)
+        writer.writerows(
+            [
+                ["Person 1", "Maler", "https://d-nb.info/gnd/1"],
+                # the uri exists, the row and the profession it created are lost
+                ["Person 2", "Kaiser", "https://d-nb.info/gnd/1"],
+                ["Person 3", "Kaiser", ""],
+                ["Person 4", "Maler", ""],
+            ]
+        )
+    call_command("import_persons", str(path), chunk_size=2, verbosity=0)
+
+    persons = {p.label: p for p in Person.objects.select_related("profession")}
+    assert sorted(persons) == ["Person 1", "Person 3", "Person 4"]
+    # the cache did not keep the profession of the rolled back row
+    assert persons["Person 3"].profession.label == "Kaiser"
+    assert persons["Person 4"].profession == persons["Person 1"].profession
+    assert Profession.objects.count() == 2
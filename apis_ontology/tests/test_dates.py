@@ -0,0 +1,20 @@
+import pytest
+from django_interval.utils import defaultdateparser
+
+from apis_ontology.dates import cached_dateparser, date_cache_stats
+from apis_ontology.models import Person
+
+pytestmark = pytest.mark.django_db
+
+
+def test_parsed_once_per_date_string():
+    cached_dateparser.cache_clear()
+    since = cached_dateparser.cache_info()
+    person = Person.objects.create(label="Person 1", date_of_birth="1900")
+    Person.objects.create(label="Person 2", date_of_birth="1900")
+    # three dates of two persons from one parsed string
+    assert date_cache_stats(since) == (5, 1)
+    sort, start, end = defaultdateparser("1900")
+    assert person.date_of_birth_date_sort == sort
+    assert person.date_of_birth_date_from == start
+    assert person.date_of_birth_date_to == end
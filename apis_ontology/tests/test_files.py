@@ -0,0 +1,37 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apis_ontology.models import Person, Profession
+
+pytestmark = pytest.mark.django_db
+
+
+def test_directory_is_imported_in_one_session(tmp_path, capsys):
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a.csv").write_text(
+        "skos:prefLabel @de,skos:broader occupation\nPerson 1,Maler\n,Maler\n",
+        encoding="utf-8",
+    )
+    # the files have their own columns
+    (tmp_path / "b" / "b.csv").write_text(
+        "skos:broader occupation,skos:prefLabel @de,skos:scope\n"
+        "Maler,Person 2,1900-1950\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "notes.txt").write_text("not a CSV file", encoding="utf-8")
+    call_command("import_persons", str(tmp_path), pattern="**/*.csv", verbosity=0)
+
+    persons = Person.objects.order_by("label").select_related("profession")
+    assert [p.label for p in persons] == ["Person 1", "Person 2"]
+    assert persons[1].date_of_birth == "1900"
+    assert Profession.objects.count() == 1
+    # errors name the file of the row
+    assert "Error processing row 2 of a.csv" in capsys.readouterr().err
+
+
+def test_missing_file_is_refused(tmp_path):
+    with pytest.raises(CommandError, match="File does not exist"):
+        call_command("import_persons", str(tmp_path / "missing.csv"), verbosity=0)
+    with pytest.raises(CommandError, match="No files matching"):
+        call_command("import_persons", str(tmp_path), verbosity=0)
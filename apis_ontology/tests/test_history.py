@@ -0,0 +1,39 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+from apis_ontology.models import Person
+
+pytestmark = pytest.mark.django_db
+
+HEADER = ["skos:prefLabel @de", "skos:exactMatch", "skos:scope"]
+
+
+def test_deferred_history_like_direct(tmp_path):
+    path = tmp_path / "persons.csv"
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADER)
+        writer.writerows(
+            [
+                ["Person 1", "https://d-nb.info/gnd/1", "1900-1950"],
+                # the uri exists, the row is rolled back with its history entry
+                ["Person 2", "https://d-nb.info/gnd/1", ""],
+                ["Person 3", "", ""],
+            ]
+        )
+    call_command(
+        "import_persons", str(path), chunk_size=2, defer_history=True, verbosity=0
+    )
+
+    history = Person.history.order_by("label")
+    assert [(h.label, h.history_type) for h in history] == [
+        ("Person 1", "+"),
+        ("Person 3", "+"),
+    ]
+    for entry in history:
+        person = entry.instance
+        saved = Person.objects.get(pk=person.pk)
+        assert person.date_of_birth == saved.date_of_birth
+        assert person.date_of_birth_date_sort == saved.date_of_birth_date_sort
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from apis_ontology.imports.logs import error_class
+
+pytestmark = pytest.mark.django_db
+
+
+def test_error_classes_mask_values():
+    first = ValueError("Expected 'birth-death', got: 1-2-3")
+    second = ValueError("Expected 'birth-death', got: 1900-2-30")
+    assert error_class(first) == error_class(second)
+    try:
+        raise RuntimeError("Error importing person") from KeyError("label")
+    except RuntimeError as e:
+        assert error_class(e) == "KeyError: '…'"
+
+
+def test_json_log_lines(tmp_path):
+    path = tmp_path / "persons.csv"
+    path.write_text(
+        "skos:prefLabel @de,skos:scope\nPerson 1,\n,\nPerson 3,1-2-3\n,\n",
+        encoding="utf-8",
+    )
+    log_file = tmp_path / "import.log"
+    call_command(
+        "import_persons",
+        str(path),
+        log_file=str(log_file),
+        log_format="json",
+        progress_interval=0,
+        verbosity=0,
+    )
+    with open(log_file, encoding="utf-8") as fh:
+        entries = [json.loads(line) for line in fh]
+    errors = [e for e in entries if e.get("event") == "row_error"]
+    assert [e["row"] for e in errors] == [2, 3, 4]
+    assert errors[0]["error_class"] == errors[2]["error_class"]
+    assert errors[1]["error_class"] != errors[0]["error_class"]
+    progress = [e for e in entries if e.get("event") == "progress"]
+    assert [e["row"] for e in progress] == [1, 2, 3, 4]
+    assert progress[-1]["progress"] == 1.0
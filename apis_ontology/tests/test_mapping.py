@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from apis_core.uris.models import Uri
+from django.core.management import call_command
+
+from apis_ontology.imports.mapping import RowMapping
+from apis_ontology.models import Institution
+
+MAPPING = RowMapping(
+    required=["name"],
+    fields={"label": "name", "hierarchy": "level"},
+    labels=[("name_en", "en", "pref"), ("name_fr", "fr", "pref")],
+    uris=["geonames", "wikidata"],
+)
+
+
+def test_missing_columns_are_ignored():
+    compiled = MAPPING.compile(["name", "name_en", "wikidata"])
+    row = {"name": "Wien", "name_en": "Vienna", "wikidata": ""}
+    assert compiled.values(row) == {"label": "Wien"}
+    assert compiled.alternative_labels(row) == [
+        {"label": "Vienna", "lang": "en", "typ": "pref"}
+    ]
+    assert compiled.external_uris(row) == []
+    assert compiled.field_names() == ["label", "alternative_labels"]
+    with pytest.raises(ValueError, match="Missing required field: name"):
+        compiled.values({**row, "name": ""})
+
+
+@pytest.mark.django_db
+def test_import_with_a_mapping_file(tmp_path):
+    mapping = tmp_path / "mapping.json"
+    mapping.write_text(
+        json.dumps(
+            {
+                "model": "apis_ontology.institution",
+                "fields": MAPPING.fields,
+                "labels": MAPPING.labels,
+                "uris": MAPPING.uris,
+                "required": MAPPING.required,
+            }
+        ),
+        encoding="utf-8",
+    )
+    path = tmp_path / "institutions.csv"
+    path.write_text(
+        "name,level,name_fr,geonames\n"
+        "Universitaet Wien,1,Universite de Vienne,https://www.geonames.org/2761369\n",
+        encoding="utf-8",
+    )
+    call_command("import_mapped", str(path), mapping=str(mapping), verbosity=0)
+
+    inst = Institution.objects.get(label="Universitaet Wien")
+    assert inst.hierarchy == "1"
+    assert inst.alternative_labels == [
+        {"label": "Universite de Vienne", "lang": "fr", "typ": "pref"}
+    ]
+    assert Uri.objects.filter(object_id=inst.pk, uri__contains="geonames").exists()
@@ -0,0 +1,165 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.db import connection
+from django_tables2 import RequestConfig
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apis_ontology.models import Person, Profession
+from apis_ontology.pagination import (
+    EstimatedCount,
+    KeysetPagination,
+    KeysetPaginator,
+    estimated_count,
+)
+from apis_ontology.tables import OeaiBaseEntityTable
+
+pytestmark = pytest.mark.django_db
+
+
+class PersonTable(OeaiBaseEntityTable):
+    class Meta(OeaiBaseEntityTable.Meta):
+        model = Person
+        fields = ["label"]
+
+
+@pytest.fixture
+def persons():
+    # repeated labels are told apart by the primary key
+    for i in range(20):
+        Person.objects.create(label=f"Person {i % 7}")
+    return list(Person.objects.order_by("label", "pk").values_list("pk", flat=True))
+
+
+def table_page(rf, page=None):
+    table = PersonTable(Person.objects.order_by("label"))
+    request = rf.get("/", {"page": page} if page else {})
+    paginate = {"paginator_class": KeysetPaginator, "per_page": 6}
+    RequestConfig(request, paginate=paginate).configure(table)
+    return table.page
+
+
+def pks(page):
+    return [row.record.pk for row in page.object_list]
+
+
+def test_table_pages_seek_both_ways(rf, persons):
+    page = table_page(rf)
+    pages = [pks(page)]
+    while page.has_next():
+        page = table_page(rf, page.next_page_number())
+        pages.append(pks(page))
+    assert sum(pages, []) == persons
+    assert [len(p) for p in pages] == [6, 6, 6, 2]
+    assert page.number == 4
+
+    backwards = [pks(page)]
+    while page.has_previous():
+        page = table_page(rf, page.previous_page_number())
+        backwards.append(pks(page))
+    assert backwards[::-1] == pages
+    assert page.number == 1
+
+
+def test_table_invalid_cursor_shows_first_page(rf, persons):
+    page = table_page(rf, "not-a-cursor")
+    assert page.number == 1
+    assert pks(page) == persons[:6]
+
+
+def api_page(params):
+    request = Request(APIRequestFactory().get("/api/", params))
+    paginator = KeysetPagination()
+    rows = paginator.paginate_queryset(Person.objects.order_by("label"), request)
+    return paginator, [row.pk for row in rows]
+
+
+def query(link):
+    return {key: value[0] for key, value in parse_qs(urlparse(link).query).items()}
+
+
+def test_api_pages_seek_both_ways(persons):
+    paginator, rows = api_page({"limit": 6})
+    assert paginator.count == 20
+    assert paginator.get_previous_link() is None
+    pages = [rows]
+    while link := paginator.get_next_link():
+        assert "offset" not in query(link)
+        paginator, rows = api_page(query(link))
+        pages.append(rows)
+    assert sum(pages, []) == persons
+
+    backwards = [rows]
+    while link := paginator.get_previous_link():
+        paginator, rows = api_page(query(link))
+        backwards.append(rows)
+    assert backwards[::-1] == pages
+
+
+def test_api_offset_pages(persons):
+    paginator, rows = api_page({"limit": 6, "offset": 6})
+    assert rows == persons[6:12]
+    assert query(paginator.get_next_link())["offset"] == "12"
+
+
+def test_api_invalid_cursor():
+    with pytest.raises(NotFound):
+        api_page({"cursor": "not-a-cursor"})
+
+
+def api_next(client, model, params):
+    response = client.get(
+        f"/apis/api/apis_ontology.{model}/", params, HTTP_ACCEPT="application/json"
+    )
+    assert response.status_code == 200
+    return query(response.json()["next"])
+
+
+def test_entity_api_pages_with_cursors(admin_client, persons):
+    assert "cursor" in api_next(admin_client, "person", {"limit": 6})
+
+
+def test_other_apis_page_with_offsets(admin_client):
+    for i in range(3):
+        Profession.objects.create(label=f"Profession {i}")
+    assert api_next(admin_client, "profession", {"limit": 2})["offset"] == "2"
+
+
+def list_page(client, params):
+    response = client.get("/apis/apis_ontology.person/", {"per_page": 6, **params})
+    assert response.status_code == 200
+    return response.context["table"].page
+
+
+@pytest.mark.parametrize("sort", ["", "-id"])
+def test_list_view_pages_with_cursors(admin_client, persons, sort):
+    params = {"sort": sort} if sort else {}
+    page = list_page(admin_client, params)
+    rows = pks(page)
+    while page.has_next():
+        cursor = page.next_page_number()
+        assert not str(cursor).isdigit()
+        page = list_page(admin_client, {**params, "page": cursor})
+        rows += pks(page)
+    assert page.number == 4
+    assert rows == sorted(persons, reverse=bool(sort))
+
+
+def test_counts_up_to_the_limit(monkeypatch, persons):
+    assert type(estimated_count(Person.objects.all())) is int
+    monkeypatch.setattr(Person, "count_limit", 5)
+    count = estimated_count(Person.objects.filter(label__startswith="Person"))
+    assert isinstance(count, EstimatedCount)
+    assert str(count) == "5+"
+
+
+@pytest.mark.postgres
+def test_unfiltered_count_is_estimated(monkeypatch, persons):
+    monkeypatch.setattr(Person, "count_limit", 5)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE "{Person._meta.db_table}"')
+    count = estimated_count(Person.objects.all())
+    assert isinstance(count, EstimatedCount)
+    assert str(count) == "~20"
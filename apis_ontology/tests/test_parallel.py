@@ -0,0 +1,26 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+from apis_ontology.models import Person, Profession
+
+HEADER = ["skos:prefLabel @de", "skos:broader occupation", "skos:exactMatch"]
+OCCUPATIONS = ["Maler", "Kaiser", "Bildhauer", "Goldschmied"]
+
+
+@pytest.mark.postgres
+@pytest.mark.django_db(transaction=True)
+def test_workers_share_professions(tmp_path):
+    path = tmp_path / "persons.csv"
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADER)
+        for i in range(200):
+            writer.writerow([f"Person {i}", OCCUPATIONS[i % len(OCCUPATIONS)], ""])
+
+    call_command("import_persons", str(path), workers=2, chunk_size=10, verbosity=0)
+
+    assert Person.objects.count() == 200
+    labels = list(Profession.objects.values_list("label", flat=True))
+    assert sorted(labels) == sorted(OCCUPATIONS)
@@ -0,0 +1,212 @@
+import csv
+
+import pytest
+from AcdhArcheAssets.uri_norm_rules import get_normalized_uri
+from apis_core.uris.models import Uri
+from django.core.management import call_command
+from django.utils import timezone
+
+from apis_ontology.models import (
+    Contains,
+    ExternalUris,
+    Institution,
+    LocatedIn,
+    Person,
+)
+from apis_ontology.querysets import INTERNAL_URIS
+
+pytestmark = [pytest.mark.postgres, pytest.mark.django_db]
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_copy_persons(tmp_path):
+    path = write_csv(
+        tmp_path / "persons.csv",
+        ["skos:prefLabel @de", "skos:broader occupation", "skos:exactMatch"],
+        [
+            ["Person 1", "Maler", "https://www.wikidata.org/entity/Q1"],
+            ["Person 2", "Maler", ""],
+            ["Person 3", "", ""],
+        ],
+    )
+    # the test transaction starts with its first query, before the import
+    assert not Person.objects.exists()
+    started = timezone.now()
+    call_command("import_persons", path, copy=True, verbosity=0)
+
+    persons = {p.label: p for p in Person.objects.select_related("profession")}
+    assert sorted(persons) == ["Person 1", "Person 2", "Person 3"]
+    assert persons["Person 1"].profession == persons["Person 2"].profession
+    assert persons["Person 3"].profession is None
+
+    uris = Uri.objects.filter(object_id__in=[p.pk for p in persons.values()])
+    # the default uri of every person and the external one
+    assert uris.count() == 4
+    wikidata = get_normalized_uri("https://www.wikidata.org/entity/Q1")
+    assert uris.filter(uri=wikidata, object_id=persons["Person 1"].pk).exists()
+    assert ExternalUris.objects.get(entity_id=persons["Person 1"].pk).uris == [wikidata]
+
+    history = Person.history.all()
+    assert sorted(history.values_list("label", flat=True)) == sorted(persons)
+    assert set(history.values_list("history_type", flat=True)) == {"+"}
+    # the time the row was written, not the start of the test transaction
+    assert all(entry.history_date >= started for entry in history)
+
+
+def test_copy_institutions_with_relations(tmp_path):
+    path = write_csv(
+        tmp_path / "institutions.csv",
+        ["skos:prefLabel @de", "Land", "skos:broader name1", "skos:broader name2"],
+        [
+            ["Institut 1", "Frankreich", "Paris", "Paris"],
+            ["Institut 2", "Frankreich", "Museum Graz", "Graz"],
+        ],
+    )
+    call_command("import_institutions", path, copy=True, verbosity=0)
+
+    assert Institution.objects.filter(label__startswith="Institut").count() == 2
+    relations = LocatedIn.objects.count()
+    assert relations > 0
+    assert LocatedIn.history.filter(history_type="+").count() == relations
+
+
+# every import drops its staging table when it commits
+@pytest.mark.django_db(transaction=True)
+def test_copy_parquet_like_csv(tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+
+    header = [
+        "skos:prefLabel @de",
+        "skos:broader occupation",
+        "skos:exactMatch",
+        "skos:scope",
+        "skos:altLabel @de",
+        "skos:prefLabel @en",
+        "skos:broader",
+    ]
+
+    def rows(prefix, uri):
+        return [
+            [f"{prefix} 1", "Maler", uri, "100-200", 'Alt "1"\n', "One", "person"],
+            [f"{prefix} 2", "", "", "", "", "", "historical person"],
+            [f"{prefix} 3", "", "", "1-2-3", "", "", ""],
+            ["", "Maler", "", "", "", "", ""],
+        ]
+
+    csv_path = write_csv(
+        tmp_path / "persons.csv",
+        header,
+        rows("Csv", "https://www.wikidata.org/entity/Q1"),
+    )
+    parquet_rows = rows("Parquet", "https://www.wikidata.org/entity/Q2")
+    # missing values of Parquet files are read as empty strings
+    parquet_rows[1][1] = None
+    parquet_path = str(tmp_path / "persons.parquet")
+    parquet.write_table(
+        pyarrow.table(
+            {name: [row[i] for row in parquet_rows] for i, name in enumerate(header)}
+        ),
+        parquet_path,
+    )
+    call_command("import_persons", csv_path, copy=True, verbosity=0)
+    call_command("import_persons", parquet_path, copy=True, verbosity=0)
+
+    def persons(prefix):
+        fields = [
+            f.attname
+            for f in Person._meta.concrete_fields
+            if f.attname not in ["id", "rootobject_ptr_id", "label"]
+        ]
+        return list(
+            Person.objects.filter(label__startswith=prefix)
+            .order_by("label")
+            .values_list("label", *fields)
+        )
+
+    csv_persons = persons("Csv")
+    parquet_persons = persons("Parquet")
+    # the rows with a malformed scope and without label are errors
+    assert [p[0] for p in parquet_persons] == ["Parquet 1", "Parquet 2"]
+    assert [p[1:] for p in parquet_persons] == [p[1:] for p in csv_persons]
+    person = Person.objects.get(label="Parquet 1")
+    assert str(person.date_of_birth_date_sort) == "0100-07-02"
+    assert person.alternative_labels == [
+        {"label": 'Alt "1"\n', "lang": "de", "typ": "alt"},
+        {"label": "One", "lang": "en", "typ": "pref"},
+    ]
+    wikidata = get_normalized_uri("https://www.wikidata.org/entity/Q2")
+    assert ExternalUris.objects.get(entity_id=person.pk).uris == [wikidata]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_copy_institutions_parquet_like_csv(tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+
+    header = [
+        "skos:prefLabel @de",
+        "Land",
+        "skos:broader name1",
+        "skos:broader name2",
+        "Link-exact",
+        "skos:altLabel @en",
+    ]
+
+    def rows(prefix, uri):
+        return [
+            [f"{prefix} 1", "Frankreich", " Paris", "paris ", uri, "One"],
+            [f"{prefix} 2", "", f"{prefix} Museum", "Graz", "", ""],
+            [f"{prefix} 3", "Italien", "", "Rom", "", ""],
+            ["", "Italien", "Rom", "", "", ""],
+        ]
+
+    csv_path = write_csv(
+        tmp_path / "institutions.csv",
+        header,
+        rows("Csv", "https://www.wikidata.org/entity/Q1"),
+    )
+    parquet_rows = rows("Parquet", "https://www.wikidata.org/entity/Q2")
+    parquet_path = str(tmp_path / "institutions.parquet")
+    parquet.write_table(
+        pyarrow.table(
+            {name: [row[i] for row in parquet_rows] for i, name in enumerate(header)}
+        ),
+        parquet_path,
+    )
+    call_command("import_institutions", csv_path, copy=True, verbosity=0)
+    call_command("import_institutions", parquet_path, copy=True, verbosity=0)
+
+    def institutions(prefix):
+        result = []
+        for inst in Institution.objects.filter(label__startswith=prefix):
+            located = LocatedIn.objects.filter(subj_object_id=inst.pk)
+            contains = Contains.objects.filter(obj_object_id=inst.pk)
+            uris = Uri.objects.filter(object_id=inst.pk).exclude(INTERNAL_URIS)
+            result.append(
+                (
+                    inst.label.removeprefix(prefix),
+                    inst.alternative_labels,
+                    sorted(str(r.obj).removeprefix(prefix) for r in located),
+                    [str(r.subj).removeprefix(prefix) for r in contains],
+                    uris.count(),
+                )
+            )
+        return sorted(result)
+
+    csv_institutions = institutions("Csv")
+    assert institutions("Parquet") == csv_institutions
+    # the row without label is an error, the museum is a parent institution
+    assert csv_institutions == [
+        (" 1", [{"label": "One", "lang": "en", "typ": "alt"}], ["Paris"], [], 1),
+        (" 2", [], [], [" Museum"], 0),
+        (" 3", [], ["Rom"], [], 0),
+        (" Museum", None, ["Graz"], [], 0),
+    ]
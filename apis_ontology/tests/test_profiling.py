@@ -0,0 +1,32 @@
+import pytest
+from django.db import connection
+
+from apis_ontology.imports.profiling import QueryProfiler
+from apis_ontology.models import Person
+
+pytestmark = pytest.mark.django_db
+
+
+def create_person(label):
+    return Person.objects.create(label=label)
+
+
+def test_queries_are_counted_per_row_and_site():
+    profiler = QueryProfiler()
+    with connection.execute_wrapper(profiler):
+        for row in [1, 2]:
+            profiler.row = row
+            create_person(f"Person {row}")
+        profiler.row = None
+        Person.objects.count()
+
+    # the first row also looks up the content type
+    assert profiler.rows[1][0] >= profiler.rows[2][0] > 0
+    assert profiler.rows[None][0] == 1
+    sites = [site for site in profiler.sites if "create_person" in site]
+    assert sites and all(site.startswith("tests/test_profiling.py") for site in sites)
+    report = list(profiler.report(top=3))
+    assert report[0].startswith(
+        f"Queries: {profiler.rows[1][0] + profiler.rows[2][0] + 1} "
+    )
+    assert "Queries outside of rows (flushes, commits): 1" in report
@@ -0,0 +1,24 @@
+from apis_ontology.imports.reader import CsvStream
+
+CONTENT = 'label,note\nPerson 1,"two\nlines"\nPérson 2,x\nPerson 3,y\n'
+
+
+def test_offsets_end_at_rows(tmp_path):
+    path = tmp_path / "persons.csv"
+    path.write_bytes(CONTENT.encode("utf-8"))
+    stream = CsvStream(str(path))
+    offsets = []
+    for row in stream:
+        offsets.append((row["label"], stream.offset))
+    data = CONTENT.encode("utf-8")
+    assert offsets == [
+        ("Person 1", data.index(b"P\xc3")),
+        ("Pérson 2", data.index(b"Person 3")),
+        ("Person 3", len(data)),
+    ]
+    assert stream.progress == 1.0
+
+    # an offset of an earlier pass resumes after its row
+    stream = CsvStream(str(path), start=offsets[0][1])
+    assert [row["label"] for row in stream] == ["Pérson 2", "Person 3"]
+    assert stream.offset == len(data)
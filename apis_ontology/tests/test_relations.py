@@ -0,0 +1,54 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+from apis_ontology.models import Contains, Includes, Institution, LocatedIn
+
+pytestmark = pytest.mark.django_db
+
+HEADER = ["skos:prefLabel @de", "Land", "skos:broader name1", "skos:broader name2"]
+
+
+def import_institutions(path, rows, **options):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    call_command("import_institutions", str(path), verbosity=0, **options)
+
+
+def relations():
+    return sorted(
+        (type(r).__name__, str(r.subj), str(r.obj))
+        for model in [Contains, LocatedIn, Includes]
+        for r in model.objects.all()
+    )
+
+
+ROWS = [
+    ["Institut 1", "Frankreich", "Paris", "Paris"],
+    ["Institut 2", "Frankreich", "Universität", "Paris"],
+    ["Institut 3", "Frankreich", "Lyon", ""],
+]
+
+
+def test_buffered_relations_like_direct(tmp_path):
+    import_institutions(tmp_path / "direct.csv", ROWS)
+    direct = relations()
+    for model in [Contains, LocatedIn, Includes, Institution]:
+        model.objects.all().delete()
+
+    import_institutions(tmp_path / "buffered.csv", ROWS, chunk_size=2)
+    assert relations() == direct
+    assert ("Includes", "Frankreich", "Paris") in direct
+
+
+def test_existing_includes_are_not_duplicated(tmp_path):
+    import_institutions(tmp_path / "first.csv", ROWS[:1], chunk_size=2)
+    import_institutions(tmp_path / "second.csv", ROWS, chunk_size=2)
+    includes = [r for r in relations() if r[0] == "Includes"]
+    assert includes == [
+        ("Includes", "Frankreich", "Lyon"),
+        ("Includes", "Frankreich", "Paris"),
+    ]
@@ -0,0 +1,64 @@
+import pytest
+from apis_core.uris.models import Uri
+from django.core.management import call_command
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import SKOS
+
+from apis_ontology.exports.skos import uri_template
+from apis_ontology.models import Includes, Institution, Place
+
+pytestmark = pytest.mark.django_db
+
+
+# the rdflib names of the formats
+FORMATS = {"turtle": "turtle", "ntriples": "nt"}
+
+
+def export(tmp_path, output_format):
+    path = tmp_path / f"export.{FORMATS[output_format]}"
+    call_command(
+        "export_skos",
+        "institution",
+        "place",
+        format=output_format,
+        output=str(path),
+        chunk_size=1,
+        verbosity=0,
+    )
+    return Graph().parse(str(path), format=FORMATS[output_format])
+
+
+def test_turtle_like_ntriples(tmp_path):
+    land = Place.objects.create(label="Frankreich")
+    city = Place.objects.create(label="Paris")
+    Includes.objects.create(subj=land, obj=city)
+    inst = Institution.objects.create(
+        label="Institut 1",
+        alternative_labels=[
+            {"label": "Institute 1", "lang": "en", "typ": "pref"},
+            {"label": "Institut A", "lang": "de", "typ": "pref"},
+        ],
+    )
+    uri = Uri.objects.create(
+        content_object=inst, uri="https://www.wikidata.org/entity/Q1"
+    )
+    uri.refresh_from_db()
+
+    graph = export(tmp_path, "turtle")
+    assert graph.isomorphic(export(tmp_path, "ntriples"))
+
+    concept = URIRef(uri_template(Institution).format(pk=inst.pk))
+    assert set(graph.objects(concept, SKOS.prefLabel)) == {
+        Literal("Institut 1", lang="de"),
+        Literal("Institute 1", lang="en"),
+    }
+    # there is already a preferred label in German
+    assert set(graph.objects(concept, SKOS.altLabel)) == {
+        Literal("Institut A", lang="de")
+    }
+    # the default uri of the concept is its subject, not a match
+    assert set(graph.objects(concept, SKOS.exactMatch)) == {URIRef(uri.uri)}
+    places = uri_template(Place)
+    land, city = URIRef(places.format(pk=land.pk)), URIRef(places.format(pk=city.pk))
+    assert (land, SKOS.narrower, city) in graph
+    assert (city, SKOS.broader, land) in graph
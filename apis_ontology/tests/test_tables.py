@@ -0,0 +1,18 @@
+from apis_ontology.models import Person
+from apis_ontology.tables import OeaiBaseEntityTable
+
+
+class PersonTable(OeaiBaseEntityTable):
+    class Meta(OeaiBaseEntityTable.Meta):
+        model = Person
+        fields = ["label"]
+
+
+def test_uris_are_escaped():
+    table = PersonTable([])
+    html = table.render_uris(
+        ['https://example.org/"><script>', "https://example.org/1"]
+    )
+    assert "<script>" not in html
+    assert html.count("<a href=") == 2
+    assert 'href="https://example.org/&quot;&gt;&lt;script&gt;"' in html
@@ -0,0 +1,68 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+from apis_ontology.models import Person
+
+pytestmark = pytest.mark.django_db
+
+HEADER = ["skos:prefLabel @de", "skos:exactMatch", "skos:scope"]
+
+
+def write_csv(path, rows, header=HEADER):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def upsert(path):
+    call_command("import_persons", path, upsert=True, verbosity=0)
+
+
+def test_unmapped_fields_survive(tmp_path):
+    path = write_csv(
+        tmp_path / "persons.csv",
+        [["Person 1", "https://www.wikidata.org/entity/Q1", "1900-1950"]],
+    )
+    upsert(path)
+    person = Person.objects.get()
+    person.notes = "curated"
+    person.save()
+
+    # the file without the dates changes the label and leaves the rest alone
+    path = write_csv(
+        tmp_path / "labels.csv",
+        [["Person 1a", "https://www.wikidata.org/entity/Q1"]],
+        header=HEADER[:2],
+    )
+    upsert(path)
+    person = Person.objects.get()
+    assert person.label == "Person 1a"
+    assert person.notes == "curated"
+    assert person.date_of_birth == "1900"
+    assert person.date_of_birth_date_sort is not None
+
+
+def test_rerun_creates_nothing(tmp_path):
+    path = write_csv(
+        tmp_path / "persons.csv",
+        [
+            ["Person 1", "https://www.wikidata.org/entity/Q1", "1900-1950"],
+            ["Person 2", "https://www.wikidata.org/entity/Q2", ""],
+            ["Person 3", "", ""],
+        ],
+    )
+    upsert(path)
+    assert sorted(Person.objects.values_list("label", flat=True)) == [
+        "Person 1",
+        "Person 2",
+    ]
+    history = Person.history.count()
+
+    upsert(path)
+    assert Person.objects.count() == 2
+    # nothing changed, so nothing was written
+    assert Person.history.count() == history
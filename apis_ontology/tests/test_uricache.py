@@ -0,0 +1,130 @@
+import importlib
+
+import pytest
+from apis_core.uris.models import Uri
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+
+from apis_ontology.models import ExternalUris, Person
+from apis_ontology.querysets import internal_uri_prefixes
+from apis_ontology.uricache import deferred_refresh, refresh_deferred
+
+pytestmark = pytest.mark.django_db
+
+URIS = ["https://example.org/1", "https://example.org/2"]
+
+
+def cached_uris(person):
+    return ExternalUris.objects.get(entity_id=person.pk).uris
+
+
+def add_uris(person):
+    content_type = ContentType.objects.get_for_model(Person)
+    for uri in URIS:
+        Uri.objects.create(uri=uri, content_type=content_type, object_id=person.pk)
+
+
+def test_refreshed_once_per_transaction(django_capture_on_commit_callbacks):
+    person = Person.objects.create(label="Person 1")
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        add_uris(person)
+    assert len(callbacks) == 1
+    assert cached_uris(person) == URIS
+
+
+def test_refreshed_at_the_end_of_the_block():
+    person = Person.objects.create(label="Person 1")
+    with deferred_refresh():
+        add_uris(person)
+        assert not ExternalUris.objects.filter(entity_id=person.pk).exists()
+    assert cached_uris(person) == URIS
+
+
+def add_failing_row(person):
+    """Add a uri and then fail on adding it a second time"""
+    content_type = ContentType.objects.get_for_model(Person)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        for _ in range(2):
+            Uri.objects.create(
+                uri="https://example.org/3",
+                content_type=content_type,
+                object_id=person.pk,
+            )
+
+
+def test_failing_row_keeps_the_earlier_refreshes():
+    first, failing = [Person.objects.create(label=f"Person {i}") for i in (1, 2)]
+    with deferred_refresh(batch_size=2):
+        with transaction.atomic():
+            add_uris(first)
+        # the batch is full now, but the failing row is rolled back
+        add_failing_row(failing)
+        refresh_deferred()
+        assert cached_uris(first) == URIS
+    assert cached_uris(failing) == []
+
+
+def test_rolled_back_savepoint_keeps_the_earlier_refreshes(
+    django_capture_on_commit_callbacks,
+):
+    first, failing = [Person.objects.create(label=f"Person {i}") for i in (1, 2)]
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with transaction.atomic():
+            add_uris(first)
+        add_failing_row(failing)
+    assert len(callbacks) == 1
+    assert cached_uris(first) == URIS
+
+
+def test_refresh_registered_in_a_rolled_back_savepoint(
+    django_capture_on_commit_callbacks,
+):
+    failing, last = [Person.objects.create(label=f"Person {i}") for i in (1, 2)]
+    with django_capture_on_commit_callbacks(execute=True):
+        add_failing_row(failing)
+        add_uris(last)
+    assert cached_uris(last) == URIS
+
+
+def test_saves_and_deletes_update_the_cache(django_capture_on_commit_callbacks):
+    first, second = [Person.objects.create(label=f"Person {i}") for i in (1, 2)]
+    with django_capture_on_commit_callbacks(execute=True):
+        add_uris(first)
+    assert cached_uris(first) == URIS
+
+    # a uri that moves to another entity is removed from the first one
+    uri = Uri.objects.get(uri=URIS[0])
+    uri.object_id = second.pk
+    with django_capture_on_commit_callbacks(execute=True):
+        uri.save()
+    assert cached_uris(first) == URIS[1:]
+    assert cached_uris(second) == URIS[:1]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Uri.objects.get(uri=URIS[1]).delete()
+    assert cached_uris(first) == []
+
+
+def test_internal_prefixes_follow_the_settings(settings):
+    settings.APIS_BASE_URI = "https://vocabs.example.org"
+    settings.APIS_FORMER_BASE_URIS = ["http://old.example.org/entity/"]
+    assert internal_uri_prefixes() == (
+        "https://old.example.org/",
+        "http://old.example.org/",
+        "https://vocabs.example.org/",
+        "http://vocabs.example.org/",
+    )
+
+
+def test_backfill_skips_internal_uris():
+    migration = importlib.import_module(
+        "apis_ontology.migrations.0014_backfill_external_uris"
+    )
+    person = Person.objects.create(label="Person 1")
+    add_uris(person)
+    ExternalUris.objects.all().delete()
+    migration.backfill_external_uris(apps, None)
+    # the default uri apis_core created for the person is internal
+    assert Uri.objects.filter(object_id=person.pk).count() == 3
+    assert cached_uris(person) == URIS
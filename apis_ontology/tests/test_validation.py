@@ -0,0 +1,10 @@
+from apis_ontology.imports.validation import validate_instance
+from apis_ontology.models import Person
+
+
+def test_unparsable_dates_are_errors(capsys):
+    person = Person(label="Person 1", date_of_birth="abc", date_of_death="1900")
+    assert validate_instance(person) == [
+        ("date_of_birth", "Could not parse date string: abc")
+    ]
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,142 @@
+import contextlib
+import threading
+import weakref
+from collections import defaultdict
+
+from apis_core.apis_metainfo.models import RootObject
+from apis_core.uris.models import Uri
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from apis_ontology.models import ExternalUris
+from apis_ontology.querysets import INTERNAL_URI_PREFIXES, INTERNAL_URIS
+
+BATCH_SIZE = 1000
+
+
+def is_cached(model):
+    """Only entities, which all share the primary keys of `RootObject`, are cached"""
+    return model is not None and issubclass(model, RootObject)
+
+
+def is_internal(uri):
+    return bool(uri) and uri.startswith(INTERNAL_URI_PREFIXES)
+
+
+def refresh_external_uris(model, pks):
+    """
+    Recompute the cached external uris of the instances `pks` of `model`,
+    with one query for the uris and one upsert per batch. Instances that
+    no longer exist are skipped.
+    """
+    if not is_cached(model):
+        return
+    content_type = ContentType.objects.get_for_model(model)
+    pks = list(pks)
+    for i in range(0, len(pks), BATCH_SIZE):
+        batch = pks[i : i + BATCH_SIZE]
+        uris = defaultdict(list)
+        for object_id, uri in (
+            Uri.objects.filter(content_type=content_type, object_id__in=batch)
+            .exclude(INTERNAL_URIS)
+            .order_by("pk")
+            .values_list("object_id", "uri")
+        ):
+            uris[object_id].append(uri)
+        ExternalUris.objects.bulk_create(
+            [
+                ExternalUris(entity_id=pk, uris=uris[pk])
+                for pk in model.objects.filter(pk__in=batch).values_list(
+                    "pk", flat=True
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=["entity"],
+            update_fields=["uris"],
+        )
+
+
+class PendingRefresh:
+    """The entities whose cached external uris are refreshed together"""
+
+    def __init__(self):
+        self.pks = defaultdict(set)
+        self.called = False
+
+    def __len__(self):
+        return sum(len(pks) for pks in self.pks.values())
+
+    def add(self, model, pk):
+        self.pks[model].add(pk)
+
+    def __call__(self):
+        self.called = True
+        pks, self.pks = self.pks, defaultdict(set)
+        for model, batch in pks.items():
+            refresh_external_uris(model, sorted(batch))
+
+
+# the refreshes collected by `deferred_refresh` in this thread
+_deferred = threading.local()
+
+# the refresh each connection registered with `on_commit` for its current
+# transaction, by weak reference: Django drops the callbacks of a rolled
+# back transaction or savepoint, which frees them and ends the reference
+_registered = weakref.WeakKeyDictionary()
+
+
+@contextlib.contextmanager
+def deferred_refresh(batch_size=BATCH_SIZE):
+    """
+    Collect the refreshes the `Uri` signals ask for while the block
+    runs and do them at its end and whenever `refresh_deferred` finds a
+    batch of `batch_size` entities, instead of one per saved uri.
+    Entities whose uris were rolled back are refreshed as well, which
+    does not change them.
+    """
+    if getattr(_deferred, "pending", None) is not None:
+        yield
+        return
+    _deferred.pending = PendingRefresh()
+    _deferred.batch_size = batch_size
+    try:
+        yield
+    finally:
+        pending, _deferred.pending = _deferred.pending, None
+        pending()
+
+
+def refresh_deferred():
+    """
+    Do the refreshes collected by the current `deferred_refresh` block
+    once they fill a batch. Call it between transactions, e.g. after a
+    chunk of rows was committed: the refreshes are written in the active
+    transaction and would be lost with a savepoint of a failing row.
+    """
+    pending = getattr(_deferred, "pending", None)
+    if pending is not None and len(pending) >= _deferred.batch_size:
+        pending()
+
+
+def schedule_refresh(model, pk, using=None):
+    """
+    Refresh the cached external uris of an entity: in a
+    `deferred_refresh` block with the next batch, in a transaction once
+    it is committed, together with the other entities it changed, and
+    otherwise right away.
+    """
+    pending = getattr(_deferred, "pending", None)
+    if pending is not None:
+        pending.add(model, pk)
+        return
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        refresh_external_uris(model, [pk])
+        return
+    registered = _registered.get(connection)
+    pending = registered and registered()
+    if pending is None or pending.called:
+        pending = PendingRefresh()
+        _registered[connection] = weakref.ref(pending)
+        transaction.on_commit(pending, using=using)
+    pending.add(model, pk)
@@ -1,5 +1,22 @@
 from apis_acdhch_default_settings.urls import urlpatterns
-from django.urls import path
-from django.urls import include
+from apis_core.generic.urls import ContenttypeConverter
+from django.urls import include, path, register_converter
+from rest_framework import routers
 
+from apis_ontology.api_views import EntityViewSet
+
+
+class EntityConverter(ContenttypeConverter):
+    """The content types of the entities served by `EntityViewSet`"""
+
+    regex = r"apis_ontology\.(?:person|institution|place)"
+
+
+register_converter(EntityConverter, "entity")
+
+router = routers.DefaultRouter()
+router.register(r"", EntityViewSet, basename="entityapi")
+
+# the entity lists take precedence over the generic API of apis_core
+urlpatterns.insert(0, path("apis/api/<entity:contenttype>/", include(router.urls)))
 urlpatterns += [path("", include("django_interval.urls"))]